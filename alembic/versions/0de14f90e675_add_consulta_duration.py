@@ -0,0 +1,35 @@
+"""Add consulta duration
+
+Revision ID: 0de14f90e675
+Revises: 2a2bf08241d5
+Create Date: 2026-10-18 11:40:27.118604
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0de14f90e675'
+down_revision = '2a2bf08241d5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('consultas', sa.Column('duracao_minutos', sa.Integer(), server_default='30', nullable=False))
+    op.add_column('consultas', sa.Column('data_hora_fim', sa.DateTime(), nullable=True))
+
+    # Preencher o fim das consultas existentes com a duração padrão
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(
+            "UPDATE consultas SET data_hora_fim = "
+            "strftime('%Y-%m-%d %H:%M:%S', data_hora, '+' || duracao_minutos || ' minutes') || '.000000'"
+        )
+    else:
+        op.execute("UPDATE consultas SET data_hora_fim = DATE_ADD(data_hora, INTERVAL duracao_minutos MINUTE)")
+
+
+def downgrade() -> None:
+    op.drop_column('consultas', 'data_hora_fim')
+    op.drop_column('consultas', 'duracao_minutos')
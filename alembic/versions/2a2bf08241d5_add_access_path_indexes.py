@@ -0,0 +1,35 @@
+"""Add access path indexes
+
+Revision ID: 2a2bf08241d5
+Revises: bd9b6701ffe4
+Create Date: 2026-10-18 10:12:03.514211
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '2a2bf08241d5'
+down_revision = 'bd9b6701ffe4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_consultas_profissional_id_data_hora', 'consultas', ['profissional_id', 'data_hora'], unique=False)
+    op.create_index('ix_consultas_paciente_id_data_hora', 'consultas', ['paciente_id', 'data_hora'], unique=False)
+    op.create_index('ix_consultas_status_data_hora', 'consultas', ['status', 'data_hora'], unique=False)
+    op.create_index('ix_consultas_data_hora', 'consultas', ['data_hora'], unique=False)
+    op.create_index('ix_prontuarios_paciente_id_created_at', 'prontuarios', ['paciente_id', 'created_at'], unique=False)
+    op.create_index('ix_prontuarios_profissional_id_created_at', 'prontuarios', ['profissional_id', 'created_at'], unique=False)
+    op.create_index('ix_prontuarios_consulta_id', 'prontuarios', ['consulta_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_prontuarios_consulta_id', table_name='prontuarios')
+    op.drop_index('ix_prontuarios_profissional_id_created_at', table_name='prontuarios')
+    op.drop_index('ix_prontuarios_paciente_id_created_at', table_name='prontuarios')
+    op.drop_index('ix_consultas_data_hora', table_name='consultas')
+    op.drop_index('ix_consultas_status_data_hora', table_name='consultas')
+    op.drop_index('ix_consultas_paciente_id_data_hora', table_name='consultas')
+    op.drop_index('ix_consultas_profissional_id_data_hora', table_name='consultas')
@@ -0,0 +1,30 @@
+"""Add versao columns
+
+Revision ID: 5d8e3a7f1c62
+Revises: 9a5f2c1e7b34
+Create Date: 2026-10-18 23:41:27.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d8e3a7f1c62'
+down_revision = '9a5f2c1e7b34'
+branch_labels = None
+depends_on = None
+
+# Tabelas com controle de concorrência otimista (version_id_col)
+TABELAS = ('consultas', 'pacientes', 'profissionais_saude')
+
+
+def upgrade() -> None:
+    # Os registros existentes começam na versão 1
+    for tabela in TABELAS:
+        op.add_column(tabela, sa.Column('versao', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    for tabela in TABELAS:
+        op.drop_column(tabela, 'versao')
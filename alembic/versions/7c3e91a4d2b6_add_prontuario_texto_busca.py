@@ -0,0 +1,61 @@
+"""Add prontuario texto_busca
+
+Revision ID: 7c3e91a4d2b6
+Revises: 0de14f90e675
+Create Date: 2026-10-18 20:05:41.302877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.texto import texto_para_busca
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e91a4d2b6'
+down_revision = '0de14f90e675'
+branch_labels = None
+depends_on = None
+
+LOTE = 1000
+
+
+def upgrade() -> None:
+    op.add_column('prontuarios', sa.Column('texto_busca', sa.Text(), nullable=True))
+
+    # Preencher o texto normalizado dos prontuários existentes, em lotes paginados pelo id
+    # para não carregar a tabela inteira (um cursor aberto entre as escritas não é portável)
+    bind = op.get_bind()
+    prontuarios = sa.table(
+        'prontuarios',
+        sa.column('id', sa.Integer),
+        sa.column('queixa_principal', sa.Text),
+        sa.column('diagnostico', sa.Text),
+        sa.column('texto_busca', sa.Text),
+    )
+    atualizar = prontuarios.update().where(prontuarios.c.id == sa.bindparam('_id')).values(
+        texto_busca=sa.bindparam('_texto_busca'),
+    )
+    ultimo_id = 0
+    while True:
+        linhas = bind.execute(
+            sa.select(prontuarios.c.id, prontuarios.c.queixa_principal, prontuarios.c.diagnostico)
+            .where(prontuarios.c.id > ultimo_id)
+            .order_by(prontuarios.c.id)
+            .limit(LOTE)
+        ).all()
+        if not linhas:
+            break
+        bind.execute(atualizar, [
+            {'_id': id_, '_texto_busca': texto_para_busca(queixa_principal, diagnostico)}
+            for id_, queixa_principal, diagnostico in linhas
+        ])
+        ultimo_id = linhas[-1][0]
+
+    if bind.dialect.name in ('mysql', 'mariadb'):
+        op.create_index('ft_prontuarios_texto_busca', 'prontuarios', ['texto_busca'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name in ('mysql', 'mariadb'):
+        op.drop_index('ft_prontuarios_texto_busca', table_name='prontuarios')
+    op.drop_column('prontuarios', 'texto_busca')
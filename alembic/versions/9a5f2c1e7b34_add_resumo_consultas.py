@@ -0,0 +1,73 @@
+"""Add resumo_consultas
+
+Revision ID: 9a5f2c1e7b34
+Revises: e4b8d0c7a913
+Create Date: 2026-10-18 23:02:51.573104
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a5f2c1e7b34'
+down_revision = 'e4b8d0c7a913'
+branch_labels = None
+depends_on = None
+
+STATUS = sa.Enum('AGENDADA', 'CONFIRMADA', 'EM_ANDAMENTO', 'CONCLUIDA', 'CANCELADA', name='statusconsulta')
+TIPOS = sa.Enum('PRESENCIAL', 'TELEMEDICINA', name='tipoconsulta')
+
+
+def upgrade() -> None:
+    op.create_table('resumo_consultas',
+    sa.Column('dia', sa.Date(), nullable=False),
+    sa.Column('profissional_id', sa.Integer(), nullable=False),
+    sa.Column('status', STATUS, nullable=False),
+    sa.Column('tipo_consulta', TIPOS, nullable=False),
+    sa.Column('quantidade', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['profissional_id'], ['profissionais_saude.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('dia', 'profissional_id', 'status', 'tipo_consulta', name='uq_resumo_consultas_chave')
+    )
+    op.create_index(op.f('ix_resumo_consultas_id'), 'resumo_consultas', ['id'], unique=False)
+
+    # Preencher o resumo com as consultas existentes
+    consultas = sa.table(
+        'consultas',
+        sa.column('data_hora', sa.DateTime),
+        sa.column('profissional_id', sa.Integer),
+        sa.column('status', sa.String),
+        sa.column('tipo_consulta', sa.String),
+    )
+    resumo = sa.table(
+        'resumo_consultas',
+        sa.column('dia', sa.Date),
+        sa.column('profissional_id', sa.Integer),
+        sa.column('status', sa.String),
+        sa.column('tipo_consulta', sa.String),
+        sa.column('quantidade', sa.Integer),
+        sa.column('created_at', sa.DateTime),
+        sa.column('updated_at', sa.DateTime),
+    )
+    # Consultas sem status/tipo contam com os defaults do modelo
+    chave = (
+        sa.func.date(consultas.c.data_hora),
+        consultas.c.profissional_id,
+        sa.func.coalesce(consultas.c.status, 'AGENDADA'),
+        sa.func.coalesce(consultas.c.tipo_consulta, 'PRESENCIAL'),
+    )
+    agora = datetime.utcnow()
+    origem = sa.select(*chave, sa.func.count(), sa.literal(agora), sa.literal(agora)).group_by(*chave)
+    op.execute(resumo.insert().from_select(
+        ['dia', 'profissional_id', 'status', 'tipo_consulta', 'quantidade', 'created_at', 'updated_at'], origem
+    ))
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_resumo_consultas_id'), table_name='resumo_consultas')
+    op.drop_table('resumo_consultas')
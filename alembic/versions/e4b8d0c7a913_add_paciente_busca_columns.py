@@ -0,0 +1,72 @@
+"""Add paciente busca columns
+
+Revision ID: e4b8d0c7a913
+Revises: 7c3e91a4d2b6
+Create Date: 2026-10-18 21:12:09.446120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.utils.texto import normalizar_nome, somente_digitos
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d0c7a913'
+down_revision = '7c3e91a4d2b6'
+branch_labels = None
+depends_on = None
+
+LOTE = 1000
+
+
+def _texto_busca(tamanho: int):
+    # No SQLite o LIKE 'prefixo%' só usa o índice em colunas com collation NOCASE
+    return sa.String(length=tamanho).with_variant(sa.String(length=tamanho, collation='NOCASE'), 'sqlite')
+
+
+def upgrade() -> None:
+    op.add_column('pacientes', sa.Column('cpf_digitos', _texto_busca(14), nullable=True))
+    op.add_column('pacientes', sa.Column('nome_busca', _texto_busca(255), nullable=True))
+
+    # Preencher as colunas normalizadas dos pacientes existentes, em lotes paginados
+    # pelo id (como em 7c3e91a4d2b6) para não carregar a tabela inteira
+    bind = op.get_bind()
+    pacientes = sa.table(
+        'pacientes',
+        sa.column('id', sa.Integer),
+        sa.column('user_id', sa.Integer),
+        sa.column('cpf', sa.String),
+        sa.column('cpf_digitos', sa.String),
+        sa.column('nome_busca', sa.String),
+    )
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('nome', sa.String))
+    atualizar = pacientes.update().where(pacientes.c.id == sa.bindparam('_id')).values(
+        cpf_digitos=sa.bindparam('_cpf_digitos'),
+        nome_busca=sa.bindparam('_nome_busca'),
+    )
+    ultimo_id = 0
+    while True:
+        linhas = bind.execute(
+            sa.select(pacientes.c.id, pacientes.c.cpf, users.c.nome)
+            .join(users, users.c.id == pacientes.c.user_id)
+            .where(pacientes.c.id > ultimo_id)
+            .order_by(pacientes.c.id)
+            .limit(LOTE)
+        ).all()
+        if not linhas:
+            break
+        bind.execute(atualizar, [
+            {'_id': id_, '_cpf_digitos': somente_digitos(cpf), '_nome_busca': normalizar_nome(nome)}
+            for id_, cpf, nome in linhas
+        ])
+        ultimo_id = linhas[-1][0]
+
+    op.create_index(op.f('ix_pacientes_cpf_digitos'), 'pacientes', ['cpf_digitos'], unique=False)
+    op.create_index(op.f('ix_pacientes_nome_busca'), 'pacientes', ['nome_busca'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_pacientes_nome_busca'), table_name='pacientes')
+    op.drop_index(op.f('ix_pacientes_cpf_digitos'), table_name='pacientes')
+    op.drop_column('pacientes', 'nome_busca')
+    op.drop_column('pacientes', 'cpf_digitos')
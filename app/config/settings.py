@@ -3,3 +3,55 @@ from decouple import config
 SECRET_KEY = config("SECRET_KEY", default="sghss-uninter")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+DEBUG = config("DEBUG", default=False, cast=bool)
+
+# Perfil das consultas SQL por requisição (desenvolvimento e testes): registra cada
+# instrução com duração e origem, aponta possíveis N+1 (mesma instrução repetida
+# SQL_N1_THRESHOLD vezes) e, com SQL_QUERY_BUDGET_STRICT, gera erro nas requisições
+# acima de SQL_QUERY_BUDGET consultas (0 = sem orçamento)
+SQL_PROFILE = config("SQL_PROFILE", default=False, cast=bool)
+SQL_N1_THRESHOLD = config("SQL_N1_THRESHOLD", default=3, cast=int)
+SQL_QUERY_BUDGET = config("SQL_QUERY_BUDGET", default=0, cast=int)
+SQL_QUERY_BUDGET_STRICT = config("SQL_QUERY_BUDGET_STRICT", default=False, cast=bool)
+
+# Métricas no formato do Prometheus em /metrics
+METRICS_ENABLED = config("METRICS_ENABLED", default=True, cast=bool)
+
+# Custo do bcrypt e concorrência máxima das operações de hash
+BCRYPT_ROUNDS = config("BCRYPT_ROUNDS", default=12, cast=int)
+PASSWORD_HASH_WORKERS = config("PASSWORD_HASH_WORKERS", default=4, cast=int)
+
+# Cache do usuário autenticado (por worker)
+PRINCIPAL_CACHE_TTL = config("PRINCIPAL_CACHE_TTL", default=60, cast=float)
+PRINCIPAL_CACHE_SIZE = config("PRINCIPAL_CACHE_SIZE", default=10000, cast=int)
+
+# Quantidade de registros por lote na importação em massa
+IMPORT_BATCH_SIZE = config("IMPORT_BATCH_SIZE", default=500, cast=int)
+
+# Busca de horários livres: tamanho do slot, janela pré-calculada e validade do bitmap
+SLOT_MINUTOS = config("SLOT_MINUTOS", default=30, cast=int)
+DISPONIBILIDADE_JANELA_DIAS = config("DISPONIBILIDADE_JANELA_DIAS", default=28, cast=int)
+DISPONIBILIDADE_TTL = config("DISPONIBILIDADE_TTL", default=300, cast=float)
+
+# Agenda dos profissionais: dias (profissional, dia) em cache e validade de cada um
+AGENDA_CACHE_SIZE = config("AGENDA_CACHE_SIZE", default=20000, cast=int)
+AGENDA_CACHE_TTL = config("AGENDA_CACHE_TTL", default=300, cast=float)
+
+# Quantidade máxima de IDs por leitura em lote (/lote?ids=...)
+BATCH_MAX_IDS = config("BATCH_MAX_IDS", default=100, cast=int)
+
+# Linhas lidas do cursor do banco por lote na exportação de consultas
+EXPORT_BATCH_SIZE = config("EXPORT_BATCH_SIZE", default=1000, cast=int)
+
+# Cache de perfis (paciente, profissional, admin): "memory" (por processo), "redis" ou "none"
+ENTITY_CACHE_BACKEND = config("ENTITY_CACHE_BACKEND", default="memory")
+ENTITY_CACHE_TTL = config("ENTITY_CACHE_TTL", default=60, cast=int)
+ENTITY_CACHE_SIZE = config("ENTITY_CACHE_SIZE", default=10000, cast=int)
+REDIS_URL = config("REDIS_URL", default="redis://localhost:6379/0")
+
+# Tamanho máximo, em bytes, de uma página de resumos de prontuários
+PRONTUARIO_PAGE_MAX_BYTES = config("PRONTUARIO_PAGE_MAX_BYTES", default=262144, cast=int)
+
+# Anexos de prontuários: diretório do armazenamento por hash e tamanho máximo por arquivo
+ANEXOS_DIR = config("ANEXOS_DIR", default="storage/anexos")
+ANEXO_MAX_BYTES = config("ANEXO_MAX_BYTES", default=50 * 1024 * 1024, cast=int)
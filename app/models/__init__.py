@@ -6,6 +6,7 @@ from .profissional_saude import ProfissionalSaude, EspecialidadeMedica
 from .admin import Admin
 from .consulta import Consulta, StatusConsulta, TipoConsulta
 from .prontuario import Prontuario
+from .resumo_consulta import ResumoConsulta
 
 __all__ = [
     "Base",
@@ -18,5 +19,6 @@ __all__ = [
     "Consulta",
     "StatusConsulta",
     "TipoConsulta",
-    "Prontuario"
+    "Prontuario",
+    "ResumoConsulta"
 ]
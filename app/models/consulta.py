@@ -1,8 +1,13 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Text
+from datetime import timedelta
+from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Text, Index, event
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
 
+# Duração das consultas em minutos; a máxima limita a janela da busca por conflitos
+DURACAO_PADRAO_MINUTOS = 30
+DURACAO_MAXIMA_MINUTOS = 480
+
 class StatusConsulta(enum.Enum):
     AGENDADA = "agendada"
     CONFIRMADA = "confirmada"
@@ -16,15 +21,35 @@ class TipoConsulta(enum.Enum):
 
 class Consulta(BaseModel):
     __tablename__ = "consultas"
+    __table_args__ = (
+        Index("ix_consultas_profissional_id_data_hora", "profissional_id", "data_hora"),
+        Index("ix_consultas_paciente_id_data_hora", "paciente_id", "data_hora"),
+        Index("ix_consultas_status_data_hora", "status", "data_hora"),
+        Index("ix_consultas_data_hora", "data_hora"),
+    )
     
     paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
     profissional_id = Column(Integer, ForeignKey("profissionais_saude.id"), nullable=False)
     data_hora = Column(DateTime, nullable=False)
+    duracao_minutos = Column(Integer, nullable=False, default=DURACAO_PADRAO_MINUTOS, server_default=str(DURACAO_PADRAO_MINUTOS))
+    data_hora_fim = Column(DateTime)  # data_hora + duracao_minutos, usado na detecção de conflitos (ver _preencher_fim)
     tipo_consulta = Column(Enum(TipoConsulta), default=TipoConsulta.PRESENCIAL)
     status = Column(Enum(StatusConsulta), default=StatusConsulta.AGENDADA)
     observacoes = Column(Text)
     link_telemedicina = Column(String(255))  # Para consultas online
+    versao = Column(Integer, nullable=False, default=1, server_default="1")  # Controle de concorrência (ver Paciente.versao)
     
     # Relacionamentos
     paciente = relationship("Paciente", foreign_keys=[paciente_id], back_populates="consultas_paciente")
     profissional = relationship("ProfissionalSaude", foreign_keys=[profissional_id], back_populates="consultas_medico")
+    
+    __mapper_args__ = {"version_id_col": versao}
+
+
+@event.listens_for(Consulta, "before_insert")
+@event.listens_for(Consulta, "before_update")
+def _preencher_fim(mapper, connection, target: Consulta):
+    """Manter data_hora_fim em toda escrita do ORM, não só nas que passam pela verificação de conflitos"""
+    if target.duracao_minutos is None:
+        target.duracao_minutos = DURACAO_PADRAO_MINUTOS
+    target.data_hora_fim = target.data_hora + timedelta(minutes=target.duracao_minutos)
@@ -1,6 +1,9 @@
-from sqlalchemy import Column, String, Integer, Date, ForeignKey
+from sqlalchemy import Column, String, Integer, Date, ForeignKey, event, inspect, select, update
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.attributes import set_committed_value
+from app.utils.texto import normalizar_nome, somente_digitos
 from .base import BaseModel
+from .user import User
 
 class Paciente(BaseModel):
     __tablename__ = "pacientes"
@@ -14,8 +17,49 @@ class Paciente(BaseModel):
     contato_emergencia = Column(String(255))
     plano_saude = Column(String(100))
     numero_carteirinha = Column(String(50))
+    # Colunas normalizadas para a busca por prefixo (app.utils.texto), mantidas pelos
+    # eventos abaixo em toda escrita do ORM; no SQLite o LIKE 'prefixo%' só usa o
+    # índice em colunas com collation NOCASE
+    cpf_digitos = Column(String(14).with_variant(String(14, collation="NOCASE"), "sqlite"), index=True)
+    nome_busca = Column(String(255).with_variant(String(255, collation="NOCASE"), "sqlite"), index=True)
+    # Controle de concorrência otimista: cada UPDATE do ORM grava versao + 1 com
+    # "WHERE versao = <lida>", e falha (StaleDataError) se outra escrita veio antes
+    versao = Column(Integer, nullable=False, default=1, server_default="1")
     
     # Relacionamentos
     user = relationship("User", back_populates="paciente")
     consultas_paciente = relationship("Consulta", foreign_keys="Consulta.paciente_id", back_populates="paciente")
     prontuarios = relationship("Prontuario", back_populates="paciente")
+    
+    __mapper_args__ = {"version_id_col": versao}
+
+
+@event.listens_for(Paciente, "before_insert")
+def _preencher_busca(mapper, connection, target: Paciente):
+    target.cpf_digitos = somente_digitos(target.cpf)
+    user = target.__dict__.get("user")
+    if user is not None:
+        nome = user.nome
+    else:
+        # Criado só com user_id (ex.: seed_database.py)
+        nome = connection.execute(select(User.nome).where(User.id == target.user_id)).scalar()
+    target.nome_busca = normalizar_nome(nome)
+
+
+@event.listens_for(Paciente, "before_update")
+def _atualizar_cpf_busca(mapper, connection, target: Paciente):
+    target.cpf_digitos = somente_digitos(target.cpf)
+
+
+@event.listens_for(User, "after_update")
+def _atualizar_nome_busca(mapper, connection, target: User):
+    """O nome fica no usuário: qualquer renomeação reflete no paciente dele"""
+    if not inspect(target).attrs.nome.history.has_changes():
+        return
+    nome_busca = normalizar_nome(target.nome)
+    connection.execute(
+        update(Paciente.__table__).where(Paciente.__table__.c.user_id == target.id).values(nome_busca=nome_busca)
+    )
+    paciente = target.__dict__.get("paciente")
+    if paciente is not None:
+        set_committed_value(paciente, "nome_busca", nome_busca)
@@ -21,8 +21,11 @@ class ProfissionalSaude(BaseModel):
     especialidade = Column(Enum(EspecialidadeMedica), nullable=False)
     telefone = Column(String(20))
     horario_atendimento = Column(String(255))  # JSON string com horários
+    versao = Column(Integer, nullable=False, default=1, server_default="1")  # Controle de concorrência (ver Paciente.versao)
     
     # Relacionamentos
     user = relationship("User", back_populates="profissional_saude")
     consultas_medico = relationship("Consulta", foreign_keys="Consulta.profissional_id", back_populates="profissional")
     prontuarios_criados = relationship("Prontuario", back_populates="profissional")
+    
+    __mapper_args__ = {"version_id_col": versao}
@@ -1,20 +1,43 @@
-from sqlalchemy import Column, String, Integer, ForeignKey, Text, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, String, Integer, ForeignKey, Text, JSON, Index
+from sqlalchemy.orm import relationship, deferred
 from .base import BaseModel
 
+# Grupo das colunas pesadas, adiadas nas consultas que carregam Prontuario
+CONTEUDO_CLINICO = "conteudo_clinico"
+CAMPOS_CLINICOS = (
+    "queixa_principal",
+    "historia_doenca_atual",
+    "exame_fisico",
+    "diagnostico",
+    "prescricao",
+    "observacoes",
+    "anexos",
+)
+# Campos cujo texto entra na busca textual (coluna texto_busca)
+CAMPOS_BUSCA = ("queixa_principal", "diagnostico")
+
 class Prontuario(BaseModel):
     __tablename__ = "prontuarios"
+    __table_args__ = (
+        Index("ix_prontuarios_paciente_id_created_at", "paciente_id", "created_at"),
+        Index("ix_prontuarios_profissional_id_created_at", "profissional_id", "created_at"),
+        Index("ix_prontuarios_consulta_id", "consulta_id"),
+        Index("ft_prontuarios_texto_busca", "texto_busca", mysql_prefix="FULLTEXT").ddl_if(dialect=("mysql", "mariadb")),
+    )
     
     paciente_id = Column(Integer, ForeignKey("pacientes.id"), nullable=False)
     profissional_id = Column(Integer, ForeignKey("profissionais_saude.id"), nullable=False)
     consulta_id = Column(Integer, ForeignKey("consultas.id"))
-    queixa_principal = Column(Text)
-    historia_doenca_atual = Column(Text)
-    exame_fisico = Column(Text)
-    diagnostico = Column(Text)
-    prescricao = Column(Text)
-    observacoes = Column(Text)
-    anexos = Column(JSON)  # Para armazenar caminhos de arquivos/exames
+    # Conteúdo clínico: carregado só quando pedido (undefer_group(CONTEUDO_CLINICO))
+    queixa_principal = deferred(Column(Text), group=CONTEUDO_CLINICO)
+    historia_doenca_atual = deferred(Column(Text), group=CONTEUDO_CLINICO)
+    exame_fisico = deferred(Column(Text), group=CONTEUDO_CLINICO)
+    diagnostico = deferred(Column(Text), group=CONTEUDO_CLINICO)
+    prescricao = deferred(Column(Text), group=CONTEUDO_CLINICO)
+    observacoes = deferred(Column(Text), group=CONTEUDO_CLINICO)
+    anexos = deferred(Column(JSON), group=CONTEUDO_CLINICO)  # Para armazenar caminhos de arquivos/exames
+    # Termos de CAMPOS_BUSCA sem acentos e palavras vazias (app.utils.texto.texto_para_busca)
+    texto_busca = deferred(Column(Text))
     
     # Relacionamentos
     paciente = relationship("Paciente", back_populates="prontuarios")
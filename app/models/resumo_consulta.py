@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey, Enum, UniqueConstraint
+from .base import BaseModel
+from .consulta import StatusConsulta, TipoConsulta
+
+class ResumoConsulta(BaseModel):
+    """Quantidade de consultas por dia, profissional, status e tipo.
+
+    Mantida na mesma transação das escritas em ``consultas`` pelo ConsultaService,
+    para que o dashboard não precise agrupar a tabela de consultas inteira.
+    """
+    __tablename__ = "resumo_consultas"
+    __table_args__ = (
+        UniqueConstraint("dia", "profissional_id", "status", "tipo_consulta", name="uq_resumo_consultas_chave"),
+    )
+    
+    dia = Column(Date, nullable=False)
+    profissional_id = Column(Integer, ForeignKey("profissionais_saude.id"), nullable=False)
+    status = Column(Enum(StatusConsulta), nullable=False)
+    tipo_consulta = Column(Enum(TipoConsulta), nullable=False)
+    quantidade = Column(Integer, nullable=False, default=0)
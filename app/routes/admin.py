@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.config.database import get_database
+from app.models.profissional_saude import EspecialidadeMedica
 from app.schemas.admin_schemas import AdminCreate, AdminUpdate, AdminResponse
-from app.services.admin_service import AdminService
+from app.schemas.dashboard_schemas import DashboardDia, DashboardResponse
+from app.services.async_services import AsyncAdminService, AsyncDashboardService
 from app.utils.dependencies import get_current_user, require_admin
-from app.models.user import User
+from app.utils.principal import Principal
+from app.utils.pagination import set_next_cursor
 
 admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -16,11 +20,11 @@ admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 async def criar_admin(
     admin_data: AdminCreate,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_admin),
+    current_user: Principal = Depends(require_admin),
 ):
     """Criar novo administrador (apenas admin existente)"""
-    admin_service = AdminService(db)
-    admin = admin_service.create_admin(admin_data.dict())
+    admin_service = AsyncAdminService(db)
+    admin = await admin_service.create_admin(admin_data.dict())
 
     return AdminResponse(
         id=admin.id,
@@ -34,14 +38,17 @@ async def criar_admin(
 
 @admin_router.get("/", response_model=List[AdminResponse])
 async def listar_admins(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_admin),
+    current_user: Principal = Depends(require_admin),
 ):
     """Listar todos os administradores (apenas admin)"""
-    admin_service = AdminService(db)
-    admins = admin_service.get_all_admins(skip, limit)
+    admin_service = AsyncAdminService(db)
+    admins = await admin_service.get_all_admins(skip, limit, cursor)
+    set_next_cursor(response, admins, limit, lambda a: (a.id,))
 
     return [
         AdminResponse(
@@ -56,15 +63,42 @@ async def listar_admins(
     ]
 
 
+@admin_router.get("/dashboard", response_model=DashboardResponse)
+async def dashboard(
+    inicio: Optional[date] = None,
+    fim: Optional[date] = None,
+    profissional_id: Optional[int] = None,
+    especialidade: Optional[EspecialidadeMedica] = None,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_admin),
+):
+    """Consultas por status, tipo, especialidade e dia no período (apenas admin).
+
+    Sem datas, considera os últimos 30 dias até hoje.
+    """
+    dashboard_service = AsyncDashboardService(db)
+    resumo = await dashboard_service.get_dashboard(inicio, fim, profissional_id, especialidade)
+
+    return DashboardResponse(
+        inicio=resumo["inicio"],
+        fim=resumo["fim"],
+        total=resumo["total"],
+        por_status=resumo["por_status"],
+        por_tipo=resumo["por_tipo"],
+        por_especialidade=resumo["por_especialidade"],
+        por_dia=[DashboardDia(dia=dia, total=total) for dia, total in resumo["por_dia"]],
+    )
+
+
 @admin_router.get("/{admin_id}", response_model=AdminResponse)
 async def obter_admin(
     admin_id: int,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_admin),
+    current_user: Principal = Depends(require_admin),
 ):
     """Obter dados de um administrador específico (apenas admin)"""
-    admin_service = AdminService(db)
-    admin = admin_service.get_admin_by_id(admin_id)
+    admin_service = AsyncAdminService(db)
+    admin = await admin_service.get_admin_by_id(admin_id)
 
     return AdminResponse(
         id=admin.id,
@@ -2,20 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from app.config.database import get_database
 from app.schemas.user_schemas import UserLogin, Token, UserResponse
-from app.services.user_service import UserService
+from app.services.async_services import AsyncUserService
 
 auth_router = APIRouter(prefix="/auth", tags=["Autenticação"])
 
 
 @auth_router.post("/login", response_model=Token)
 async def login(user_credentials: UserLogin, db: Session = Depends(get_database)):
-    user_service = UserService(db)
+    user_service = AsyncUserService(db)
 
-    user = user_service.authenticate_user(
+    user = await user_service.authenticate_user(
         user_credentials.email, user_credentials.senha
     )
 
-    access_token = user_service.generate_token(user)
+    access_token = await user_service.generate_token(user)
 
     return Token(
         access_token=access_token,
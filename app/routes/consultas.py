@@ -1,11 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.config.database import get_database
-from app.schemas.consulta_schemas import ConsultaCreate, ConsultaUpdate, ConsultaResponse
+from app.schemas.consulta_schemas import ConsultaCreate, ConsultaUpdate, ConsultaResponse, AgendaDia, AgendaResponse
+from app.services.async_services import AsyncConsultaService
 from app.services.consulta_service import ConsultaService
-from app.utils.dependencies import get_current_user, require_profissional_or_admin
-from app.models.user import User, TipoUsuario
+from app.utils.dependencies import get_current_user, require_admin, require_profissional_or_admin
+from app.utils.principal import Principal
+from app.utils.pagination import set_next_cursor
+from app.utils.exportacao import FORMATOS_EXPORTACAO, exportar
+from app.utils.etag import (
+    check_if_match, make_etag, not_modified, set_etag_after_write, wants_precondition, wants_revalidation
+)
+from app.utils.lote import ids_do_lote
+from app.models.consulta import StatusConsulta
+from app.models.user import TipoUsuario
 
 consultas_router = APIRouter(prefix="/consultas", tags=["Consultas"])
 
@@ -13,17 +24,18 @@ consultas_router = APIRouter(prefix="/consultas", tags=["Consultas"])
 async def criar_consulta(
     consulta_data: ConsultaCreate,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_profissional_or_admin)
+    current_user: Principal = Depends(require_profissional_or_admin)
 ):
     """Criar nova consulta (apenas profissionais de saúde ou admin)"""
-    consulta_service = ConsultaService(db)
-    consulta = consulta_service.create_consulta(consulta_data)
+    consulta_service = AsyncConsultaService(db)
+    consulta = await consulta_service.create_consulta(consulta_data)
     
     return ConsultaResponse(
         id=consulta.id,
         paciente_id=consulta.paciente_id,
         profissional_id=consulta.profissional_id,
         data_hora=consulta.data_hora,
+        duracao_minutos=consulta.duracao_minutos,
         tipo_consulta=consulta.tipo_consulta,
         status=consulta.status,
         observacoes=consulta.observacoes,
@@ -36,37 +48,91 @@ async def criar_consulta(
 
 @consultas_router.get("/", response_model=List[ConsultaResponse])
 async def listar_consultas(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar consultas baseado no tipo de usuário"""
-    consulta_service = ConsultaService(db)
+    consulta_service = AsyncConsultaService(db)
     
     if current_user.tipo_usuario == TipoUsuario.PACIENTE:
         # Paciente vê apenas suas próprias consultas
-        if not current_user.paciente:
+        if current_user.paciente_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Paciente não encontrado"
             )
-        consultas = consulta_service.get_consultas_by_paciente(
-            current_user.paciente.id, skip, limit
+        consultas = await consulta_service.get_consultas_by_paciente(
+            current_user.paciente_id, skip, limit, cursor
         )
     elif current_user.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
         # Profissional vê apenas suas consultas
-        if not current_user.profissional_saude:
+        if current_user.profissional_id is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Profissional não encontrado"
             )
-        consultas = consulta_service.get_consultas_by_profissional(
-            current_user.profissional_saude.id, skip, limit
+        consultas = await consulta_service.get_consultas_by_profissional(
+            current_user.profissional_id, skip, limit, cursor
         )
     else:
         # Admin vê todas as consultas
-        consultas = consulta_service.get_all_consultas(skip, limit)
+        consultas = await consulta_service.get_all_consultas(skip, limit, cursor)
+    
+    set_next_cursor(response, consultas, limit, lambda c: (c.data_hora, c.id))
+    
+    return [
+        ConsultaResponse(
+            id=c.id,
+            paciente_id=c.paciente_id,
+            profissional_id=c.profissional_id,
+            data_hora=c.data_hora,
+            duracao_minutos=c.duracao_minutos,
+            tipo_consulta=c.tipo_consulta,
+            status=c.status,
+            observacoes=c.observacoes,
+            link_telemedicina=c.link_telemedicina,
+            created_at=c.created_at,
+            paciente_nome=c.paciente_nome,
+            profissional_nome=c.profissional_nome,
+            especialidade=c.especialidade.value
+        )
+        for c in consultas
+    ]
+
+@consultas_router.get("/exportar")
+async def exportar_consultas(
+    formato: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    status_consulta: Optional[StatusConsulta] = Query(None, alias="status"),
+    current_user: Principal = Depends(require_admin)
+):
+    """Exportar consultas em NDJSON ou CSV, em streaming (apenas admin)"""
+    stmt = ConsultaService.export_statement(inicio, fim, status_consulta)
+    
+    return StreamingResponse(
+        exportar(stmt, formato),
+        media_type=FORMATOS_EXPORTACAO[formato],
+        headers={"Content-Disposition": f'attachment; filename="consultas.{formato}"'}
+    )
+
+@consultas_router.get("/lote", response_model=List[ConsultaResponse])
+async def obter_consultas_lote(
+    ids: List[int] = Depends(ids_do_lote),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Obter várias consultas de uma vez (?ids=1,2,3), na ordem pedida; IDs inexistentes são omitidos"""
+    consulta_service = AsyncConsultaService(db)
+    consultas = await consulta_service.get_consultas_by_ids(ids)
+    
+    # Mesmas permissões de obter_consulta: uma consulta alheia nega o lote inteiro
+    for c in consultas:
+        _verificar_acesso(current_user, c.paciente_id, c.profissional_id)
     
     return [
         ConsultaResponse(
@@ -74,14 +140,15 @@ async def listar_consultas(
             paciente_id=c.paciente_id,
             profissional_id=c.profissional_id,
             data_hora=c.data_hora,
+            duracao_minutos=c.duracao_minutos,
             tipo_consulta=c.tipo_consulta,
             status=c.status,
             observacoes=c.observacoes,
             link_telemedicina=c.link_telemedicina,
             created_at=c.created_at,
-            paciente_nome=c.paciente.user.nome,
-            profissional_nome=c.profissional.user.nome,
-            especialidade=c.profissional.especialidade.value
+            paciente_nome=c.paciente_nome,
+            profissional_nome=c.profissional_nome,
+            especialidade=c.especialidade.value
         )
         for c in consultas
     ]
@@ -89,33 +156,40 @@ async def listar_consultas(
 @consultas_router.get("/{consulta_id}", response_model=ConsultaResponse)
 async def obter_consulta(
     consulta_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obter dados de uma consulta específica"""
-    consulta_service = ConsultaService(db)
-    consulta = consulta_service.get_consulta_by_id(consulta_id)
+    consulta_service = AsyncConsultaService(db)
     
-    # Verificar permissões
-    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
-        if not current_user.paciente or current_user.paciente.id != consulta.paciente_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acesso negado"
-            )
-    elif current_user.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
-        if not current_user.profissional_saude or current_user.profissional_saude.id != consulta.profissional_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Acesso negado"
-            )
-    # Admin pode ver qualquer consulta
+    # Revalidação: permissões e ETag verificados só com a versão da consulta
+    if wants_revalidation(request):
+        versao = await consulta_service.get_consulta_version(consulta_id)
+        _verificar_acesso(current_user, paciente_id=versao[1], profissional_id=versao[2])
+        nao_modificado = not_modified(request, make_etag(*versao))
+        if nao_modificado:
+            return nao_modificado
+    
+    consulta = await consulta_service.get_consulta_by_id(consulta_id)
+    _verificar_acesso(current_user, consulta.paciente_id, consulta.profissional_id)
+    response.headers["ETag"] = make_etag(
+        consulta.id,
+        consulta.paciente_id,
+        consulta.profissional_id,
+        consulta.updated_at,
+        consulta.paciente.user.updated_at,
+        consulta.profissional.user.updated_at,
+        consulta.versao
+    )
     
     return ConsultaResponse(
         id=consulta.id,
         paciente_id=consulta.paciente_id,
         profissional_id=consulta.profissional_id,
         data_hora=consulta.data_hora,
+        duracao_minutos=consulta.duracao_minutos,
         tipo_consulta=consulta.tipo_consulta,
         status=consulta.status,
         observacoes=consulta.observacoes,
@@ -130,18 +204,30 @@ async def obter_consulta(
 async def atualizar_consulta(
     consulta_id: int,
     consulta_data: ConsultaUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_profissional_or_admin)
+    current_user: Principal = Depends(require_profissional_or_admin)
 ):
     """Atualizar consulta (apenas profissionais de saúde ou admin)"""
-    consulta_service = ConsultaService(db)
-    consulta = consulta_service.update_consulta(consulta_id, consulta_data)
+    consulta_service = AsyncConsultaService(db)
+    
+    # If-Match: a atualização só vale sobre a versão que o cliente leu
+    versao = None
+    if wants_precondition(request):
+        atual = await consulta_service.get_consulta_version(consulta_id)
+        check_if_match(request, make_etag(*atual))
+        versao = atual[-1]
+    
+    consulta = await consulta_service.update_consulta(consulta_id, consulta_data, versao)
+    set_etag_after_write(response, await consulta_service.get_consulta_version(consulta_id), consulta.versao)
     
     return ConsultaResponse(
         id=consulta.id,
         paciente_id=consulta.paciente_id,
         profissional_id=consulta.profissional_id,
         data_hora=consulta.data_hora,
+        duracao_minutos=consulta.duracao_minutos,
         tipo_consulta=consulta.tipo_consulta,
         status=consulta.status,
         observacoes=consulta.observacoes,
@@ -155,17 +241,19 @@ async def atualizar_consulta(
 @consultas_router.get("/historico/paciente/{paciente_id}", response_model=List[ConsultaResponse])
 async def historico_consultas_paciente(
     paciente_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obter histórico de consultas de um paciente específico"""
-    consulta_service = ConsultaService(db)
+    consulta_service = AsyncConsultaService(db)
     
     # Verificar permissões
     if current_user.tipo_usuario == TipoUsuario.PACIENTE:
-        if not current_user.paciente or current_user.paciente.id != paciente_id:
+        if current_user.paciente_id is None or current_user.paciente_id != paciente_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Acesso negado"
@@ -175,7 +263,9 @@ async def historico_consultas_paciente(
         pass
     # Admin pode ver qualquer histórico
     
-    consultas = consulta_service.get_consultas_by_paciente(paciente_id, skip, limit)
+    consultas = await consulta_service.get_consultas_by_paciente(paciente_id, skip, limit, cursor)
+    
+    set_next_cursor(response, consultas, limit, lambda c: (c.data_hora, c.id))
     
     return [
         ConsultaResponse(
@@ -183,14 +273,15 @@ async def historico_consultas_paciente(
             paciente_id=c.paciente_id,
             profissional_id=c.profissional_id,
             data_hora=c.data_hora,
+            duracao_minutos=c.duracao_minutos,
             tipo_consulta=c.tipo_consulta,
             status=c.status,
             observacoes=c.observacoes,
             link_telemedicina=c.link_telemedicina,
             created_at=c.created_at,
-            paciente_nome=c.paciente.user.nome,
-            profissional_nome=c.profissional.user.nome,
-            especialidade=c.profissional.especialidade.value
+            paciente_nome=c.paciente_nome,
+            profissional_nome=c.profissional_nome,
+            especialidade=c.especialidade.value
         )
         for c in consultas
     ]
@@ -198,24 +289,28 @@ async def historico_consultas_paciente(
 @consultas_router.get("/historico/profissional/{profissional_id}", response_model=List[ConsultaResponse])
 async def historico_consultas_profissional(
     profissional_id: int,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obter histórico de consultas de um profissional específico"""
-    consulta_service = ConsultaService(db)
+    consulta_service = AsyncConsultaService(db)
     
     # Verificar permissões
     if current_user.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
-        if not current_user.profissional_saude or current_user.profissional_saude.id != profissional_id:
+        if current_user.profissional_id is None or current_user.profissional_id != profissional_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Acesso negado"
             )
     # Admin pode ver qualquer histórico
     
-    consultas = consulta_service.get_consultas_by_profissional(profissional_id, skip, limit)
+    consultas = await consulta_service.get_consultas_by_profissional(profissional_id, skip, limit, cursor)
+    
+    set_next_cursor(response, consultas, limit, lambda c: (c.data_hora, c.id))
     
     return [
         ConsultaResponse(
@@ -223,14 +318,87 @@ async def historico_consultas_profissional(
             paciente_id=c.paciente_id,
             profissional_id=c.profissional_id,
             data_hora=c.data_hora,
+            duracao_minutos=c.duracao_minutos,
             tipo_consulta=c.tipo_consulta,
             status=c.status,
             observacoes=c.observacoes,
             link_telemedicina=c.link_telemedicina,
             created_at=c.created_at,
-            paciente_nome=c.paciente.user.nome,
-            profissional_nome=c.profissional.user.nome,
-            especialidade=c.profissional.especialidade.value
+            paciente_nome=c.paciente_nome,
+            profissional_nome=c.profissional_nome,
+            especialidade=c.especialidade.value
         )
         for c in consultas
     ]
+
+@consultas_router.get("/agenda/profissional/{profissional_id}", response_model=AgendaResponse)
+async def agenda_profissional(
+    profissional_id: int,
+    data: Optional[date] = None,
+    visao: str = Query("dia", pattern="^(dia|semana)$"),
+    incluir_canceladas: bool = False,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_profissional_or_admin)
+):
+    """Agenda de um profissional no dia ou na semana (segunda a domingo) da data, agrupada por dia"""
+    if current_user.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
+        if current_user.profissional_id is None or current_user.profissional_id != profissional_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+    
+    data = data or date.today()
+    if visao == "semana":
+        inicio, dias = data - timedelta(days=data.weekday()), 7
+    else:
+        inicio, dias = data, 1
+    
+    consulta_service = AsyncConsultaService(db)
+    agenda = await consulta_service.get_agenda_profissional(profissional_id, inicio, dias)
+    
+    return AgendaResponse(
+        profissional_id=profissional_id,
+        inicio=inicio,
+        fim=inicio + timedelta(days=dias - 1),
+        dias=[
+            AgendaDia(
+                dia=dia,
+                consultas=[
+                    ConsultaResponse(
+                        id=c.id,
+                        paciente_id=c.paciente_id,
+                        profissional_id=c.profissional_id,
+                        data_hora=c.data_hora,
+                        duracao_minutos=c.duracao_minutos,
+                        tipo_consulta=c.tipo_consulta,
+                        status=c.status,
+                        observacoes=c.observacoes,
+                        link_telemedicina=c.link_telemedicina,
+                        created_at=c.created_at,
+                        paciente_nome=c.paciente_nome,
+                        profissional_nome=c.profissional_nome,
+                        especialidade=c.especialidade.value
+                    )
+                    for c in consultas
+                    if incluir_canceladas or c.status != StatusConsulta.CANCELADA
+                ]
+            )
+            for dia, consultas in agenda
+        ]
+    )
+
+def _verificar_acesso(current_user: Principal, paciente_id: int, profissional_id: int):
+    """Verificar se o usuário pode ver a consulta (admin pode ver qualquer uma)"""
+    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
+        if current_user.paciente_id is None or current_user.paciente_id != paciente_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+    elif current_user.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
+        if current_user.profissional_id is None or current_user.profissional_id != profissional_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
@@ -1,11 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.config.database import get_database
-from app.schemas.paciente_schemas import PacienteCreate, PacienteUpdate, PacienteResponse
-from app.services.paciente_service import PacienteService
-from app.utils.dependencies import get_current_user, require_admin
-from app.models.user import User, TipoUsuario
+from app.schemas.paciente_schemas import (
+    PacienteCreate, PacienteUpdate, PacienteResponse, PacienteBuscaResultado, PacienteImportResult
+)
+from app.services.async_services import AsyncPacienteService
+from app.utils.dependencies import get_current_user, require_admin, require_profissional_or_admin
+from app.utils.principal import Principal
+from app.utils.pagination import set_next_cursor
+from app.utils.etag import (
+    check_if_match, make_etag, not_modified, set_etag_after_write, wants_precondition, wants_revalidation
+)
+from app.utils.importacao import FORMATOS_IMPORTACAO, aiter_lines, aiter_records
+from app.utils.lote import ids_do_lote
+from app.models.user import TipoUsuario
 
 pacientes_router = APIRouter(prefix="/pacientes", tags=["Pacientes"])
 
@@ -15,8 +24,8 @@ async def criar_paciente(
     db: Session = Depends(get_database)
 ):
     """Criar novo paciente (endpoint público para auto-cadastro)"""
-    paciente_service = PacienteService(db)
-    paciente = paciente_service.create_paciente(paciente_data)
+    paciente_service = AsyncPacienteService(db)
+    paciente = await paciente_service.create_paciente(paciente_data)
     
     return PacienteResponse(
         id=paciente.id,
@@ -33,16 +42,99 @@ async def criar_paciente(
         created_at=paciente.created_at
     )
 
+@pacientes_router.post("/importar", response_model=PacienteImportResult)
+async def importar_pacientes(
+    request: Request,
+    formato: Optional[str] = None,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_admin)
+):
+    """Importar pacientes em lote a partir de CSV ou NDJSON enviado no corpo (apenas admin)"""
+    if formato is None:
+        formato = "ndjson" if "json" in request.headers.get("content-type", "") else "csv"
+    if formato not in FORMATOS_IMPORTACAO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Formato inválido. Use csv ou ndjson."
+        )
+    
+    # O corpo é lido em blocos e processado em lotes, sem carregar o arquivo inteiro
+    records = aiter_records(aiter_lines(request.stream()), formato)
+    paciente_service = AsyncPacienteService(db)
+    return await paciente_service.import_pacientes(records)
+
 @pacientes_router.get("/", response_model=List[PacienteResponse])
 async def listar_pacientes(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Listar todos os pacientes (apenas admin)"""
-    paciente_service = PacienteService(db)
-    pacientes = paciente_service.get_all_pacientes(skip, limit)
+    paciente_service = AsyncPacienteService(db)
+    pacientes = await paciente_service.get_all_pacientes(skip, limit, cursor)
+    
+    set_next_cursor(response, pacientes, limit, lambda p: (p.id,))
+    
+    return [
+        PacienteResponse(
+            id=p.id,
+            nome=p.user.nome,
+            email=p.user.email,
+            cpf=p.cpf,
+            rg=p.rg,
+            data_nascimento=p.data_nascimento,
+            telefone=p.telefone,
+            endereco=p.endereco,
+            contato_emergencia=p.contato_emergencia,
+            plano_saude=p.plano_saude,
+            numero_carteirinha=p.numero_carteirinha,
+            created_at=p.created_at
+        )
+        for p in pacientes
+    ]
+
+@pacientes_router.get("/busca", response_model=List[PacienteBuscaResultado])
+async def buscar_pacientes(
+    q: str = Query(..., min_length=2, max_length=255),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_profissional_or_admin)
+):
+    """Buscar pacientes pelo início do nome ou do CPF, com ou sem pontuação (profissionais ou admin)"""
+    paciente_service = AsyncPacienteService(db)
+    pacientes = await paciente_service.buscar_pacientes(q, limit)
+    
+    return [
+        PacienteBuscaResultado(
+            id=p.id,
+            nome=p.nome,
+            cpf=p.cpf,
+            data_nascimento=p.data_nascimento,
+            telefone=p.telefone
+        )
+        for p in pacientes
+    ]
+
+@pacientes_router.get("/lote", response_model=List[PacienteResponse])
+async def obter_pacientes_lote(
+    ids: List[int] = Depends(ids_do_lote),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Obter vários pacientes de uma vez (?ids=1,2,3), na ordem pedida; IDs inexistentes são omitidos"""
+    # Mesmas permissões de obter_paciente, para todos os IDs do lote
+    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
+        if current_user.paciente_id is not None and any(i != current_user.paciente_id for i in ids):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+    
+    paciente_service = AsyncPacienteService(db)
+    pacientes = await paciente_service.get_pacientes_by_ids(ids)
     
     return [
         PacienteResponse(
@@ -65,21 +157,31 @@ async def listar_pacientes(
 @pacientes_router.get("/{paciente_id}", response_model=PacienteResponse)
 async def obter_paciente(
     paciente_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obter dados de um paciente específico"""
     # Verificar permissões
     if current_user.tipo_usuario == TipoUsuario.PACIENTE:
         # Paciente só pode ver seus próprios dados
-        if current_user.paciente and current_user.paciente.id != paciente_id:
+        if current_user.paciente_id is not None and current_user.paciente_id != paciente_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Acesso negado"
             )
     
-    paciente_service = PacienteService(db)
-    paciente = paciente_service.get_paciente_by_id(paciente_id)
+    paciente_service = AsyncPacienteService(db)
+    
+    if wants_revalidation(request):
+        versao = await paciente_service.get_paciente_version(paciente_id)
+        nao_modificado = not_modified(request, make_etag(*versao))
+        if nao_modificado:
+            return nao_modificado
+    
+    paciente = await paciente_service.get_paciente_by_id(paciente_id)
+    response.headers["ETag"] = make_etag(paciente.id, paciente.updated_at, paciente.user.updated_at, paciente.versao)
     
     return PacienteResponse(
         id=paciente.id,
@@ -100,21 +202,32 @@ async def obter_paciente(
 async def atualizar_paciente(
     paciente_id: int,
     paciente_data: PacienteUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Atualizar dados do paciente"""
     # Verificar permissões
     if current_user.tipo_usuario == TipoUsuario.PACIENTE:
         # Paciente só pode atualizar seus próprios dados
-        if current_user.paciente and current_user.paciente.id != paciente_id:
+        if current_user.paciente_id is not None and current_user.paciente_id != paciente_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Acesso negado"
             )
     
-    paciente_service = PacienteService(db)
-    paciente = paciente_service.update_paciente(paciente_id, paciente_data)
+    paciente_service = AsyncPacienteService(db)
+    
+    # If-Match: a atualização só vale sobre a versão que o cliente leu
+    versao = None
+    if wants_precondition(request):
+        atual = await paciente_service.get_paciente_version(paciente_id)
+        check_if_match(request, make_etag(*atual))
+        versao = atual[-1]
+    
+    paciente = await paciente_service.update_paciente(paciente_id, paciente_data, versao)
+    set_etag_after_write(response, await paciente_service.get_paciente_version(paciente_id), paciente.versao)
     
     return PacienteResponse(
         id=paciente.id,
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from app.config.database import get_database
-from app.schemas.profissional_schemas import ProfissionalSaudeCreate, ProfissionalSaudeUpdate, ProfissionalSaudeResponse
-from app.services.profissional_service import ProfissionalSaudeService
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate, ProfissionalSaudeUpdate, ProfissionalSaudeResponse, HorarioLivreResponse
+from app.services.async_services import AsyncProfissionalSaudeService, AsyncDisponibilidadeService
 from app.utils.dependencies import get_current_user, require_admin
-from app.models.user import User
+from app.utils.principal import Principal
+from app.utils.pagination import set_next_cursor
+from app.utils.etag import (
+    check_if_match, make_etag, not_modified, set_etag_after_write, wants_precondition, wants_revalidation
+)
+from app.utils.lote import ids_do_lote
 
 profissionais_router = APIRouter(prefix="/profissionais", tags=["Profissionais"])
 
@@ -13,11 +20,11 @@ profissionais_router = APIRouter(prefix="/profissionais", tags=["Profissionais"]
 async def criar_profissional(
     profissional_data: ProfissionalSaudeCreate,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Criar novo profissional de saúde (apenas admin)"""
-    profissional_service = ProfissionalSaudeService(db)
-    profissional = profissional_service.create_profissional(profissional_data)
+    profissional_service = AsyncProfissionalSaudeService(db)
+    profissional = await profissional_service.create_profissional(profissional_data)
     
     return ProfissionalSaudeResponse(
         id=profissional.id,
@@ -32,14 +39,73 @@ async def criar_profissional(
 
 @profissionais_router.get("/", response_model=List[ProfissionalSaudeResponse])
 async def listar_profissionais(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Listar todos os profissionais (acesso para todos os usuários autenticados)"""
-    profissional_service = ProfissionalSaudeService(db)
-    profissionais = profissional_service.get_all_profissionais(skip, limit)
+    profissional_service = AsyncProfissionalSaudeService(db)
+    
+    # Revalidação: o ETag da página sai só das versões, sem carregar os profissionais
+    if wants_revalidation(request):
+        versoes = await profissional_service.get_profissionais_versions(skip, limit, cursor)
+        nao_modificado = not_modified(request, make_etag(*versoes))
+        if nao_modificado:
+            return nao_modificado
+    
+    profissionais = await profissional_service.get_all_profissionais(skip, limit, cursor)
+    
+    set_next_cursor(response, profissionais, limit, lambda p: (p.id,))
+    response.headers["ETag"] = make_etag(*((p.id, p.updated_at, p.user.updated_at, p.versao) for p in profissionais))
+    
+    return [
+        ProfissionalSaudeResponse(
+            id=p.id,
+            nome=p.user.nome,
+            email=p.user.email,
+            crm=p.crm,
+            especialidade=p.especialidade,
+            telefone=p.telefone,
+            horario_atendimento=p.horario_atendimento,
+            created_at=p.created_at
+        )
+        for p in profissionais
+    ]
+
+@profissionais_router.get("/horarios-livres", response_model=List[HorarioLivreResponse])
+async def buscar_horarios_livres(
+    especialidade: EspecialidadeMedica,
+    inicio: Optional[datetime] = None,
+    fim: Optional[datetime] = None,
+    limite: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Buscar os primeiros horários livres entre os profissionais de uma especialidade"""
+    if inicio is not None and fim is not None and fim <= inicio:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Período inválido"
+        )
+    
+    disponibilidade_service = AsyncDisponibilidadeService(db)
+    horarios = await disponibilidade_service.get_horarios_livres(especialidade, inicio, fim, limite)
+    
+    return [HorarioLivreResponse(**h) for h in horarios]
+
+@profissionais_router.get("/lote", response_model=List[ProfissionalSaudeResponse])
+async def obter_profissionais_lote(
+    ids: List[int] = Depends(ids_do_lote),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Obter vários profissionais de uma vez (?ids=1,2,3), na ordem pedida; IDs inexistentes são omitidos"""
+    profissional_service = AsyncProfissionalSaudeService(db)
+    profissionais = await profissional_service.get_profissionais_by_ids(ids)
     
     return [
         ProfissionalSaudeResponse(
@@ -58,12 +124,24 @@ async def listar_profissionais(
 @profissionais_router.get("/{profissional_id}", response_model=ProfissionalSaudeResponse)
 async def obter_profissional(
     profissional_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Obter dados de um profissional específico"""
-    profissional_service = ProfissionalSaudeService(db)
-    profissional = profissional_service.get_profissional_by_id(profissional_id)
+    profissional_service = AsyncProfissionalSaudeService(db)
+    
+    if wants_revalidation(request):
+        versao = await profissional_service.get_profissional_version(profissional_id)
+        nao_modificado = not_modified(request, make_etag(*versao))
+        if nao_modificado:
+            return nao_modificado
+    
+    profissional = await profissional_service.get_profissional_by_id(profissional_id)
+    response.headers["ETag"] = make_etag(
+        profissional.id, profissional.updated_at, profissional.user.updated_at, profissional.versao
+    )
     
     return ProfissionalSaudeResponse(
         id=profissional.id,
@@ -80,12 +158,25 @@ async def obter_profissional(
 async def atualizar_profissional(
     profissional_id: int,
     profissional_data: ProfissionalSaudeUpdate,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_database),
-    current_user: User = Depends(require_admin)
+    current_user: Principal = Depends(require_admin)
 ):
     """Atualizar dados do profissional (apenas admin)"""
-    profissional_service = ProfissionalSaudeService(db)
-    profissional = profissional_service.update_profissional(profissional_id, profissional_data)
+    profissional_service = AsyncProfissionalSaudeService(db)
+    
+    # If-Match: a atualização só vale sobre a versão que o cliente leu
+    versao = None
+    if wants_precondition(request):
+        atual = await profissional_service.get_profissional_version(profissional_id)
+        check_if_match(request, make_etag(*atual))
+        versao = atual[-1]
+    
+    profissional = await profissional_service.update_profissional(profissional_id, profissional_data, versao)
+    set_etag_after_write(
+        response, await profissional_service.get_profissional_version(profissional_id), profissional.versao
+    )
     
     return ProfissionalSaudeResponse(
         id=profissional.id,
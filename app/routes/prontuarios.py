@@ -0,0 +1,300 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.config.database import get_database
+from app.config.settings import PRONTUARIO_PAGE_MAX_BYTES
+from app.schemas.prontuario_schemas import (
+    ProntuarioCreate, ProntuarioUpdate, ProntuarioResponse, ProntuarioResumo, ProntuarioCampoResponse, AnexoResponse,
+    ProntuarioBuscaResultado
+)
+from app.services.async_services import AsyncProntuarioService
+from app.utils.dependencies import get_current_user, require_profissional, require_profissional_or_admin
+from app.utils.principal import Principal
+from app.utils.pagination import limit_page_bytes, set_next_cursor
+from app.utils.blob_store import blob_store
+from app.models.user import TipoUsuario
+
+prontuarios_router = APIRouter(prefix="/prontuarios", tags=["Prontuários"])
+
+@prontuarios_router.post("/", response_model=ProntuarioResponse, status_code=status.HTTP_201_CREATED)
+async def criar_prontuario(
+    prontuario_data: ProntuarioCreate,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_profissional)
+):
+    """Registrar prontuário (apenas profissionais de saúde)"""
+    prontuario_service = AsyncProntuarioService(db)
+    prontuario = await prontuario_service.create_prontuario(prontuario_data, current_user.profissional_id)
+    
+    return _resposta_completa(prontuario)
+
+@prontuarios_router.get("/", response_model=List[ProntuarioResumo])
+async def listar_prontuarios(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Listar resumos de prontuários baseado no tipo de usuário"""
+    prontuario_service = AsyncProntuarioService(db)
+    
+    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
+        # Paciente vê apenas seus próprios prontuários
+        if current_user.paciente_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Paciente não encontrado"
+            )
+        prontuarios = await prontuario_service.get_prontuarios_by_paciente(
+            current_user.paciente_id, skip, limit, cursor
+        )
+    elif current_user.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
+        # Profissional vê os prontuários que registrou
+        if current_user.profissional_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profissional não encontrado"
+            )
+        prontuarios = await prontuario_service.get_prontuarios_by_profissional(
+            current_user.profissional_id, skip, limit, cursor
+        )
+    else:
+        # Admin vê todos os prontuários
+        prontuarios = await prontuario_service.get_all_prontuarios(skip, limit, cursor)
+    
+    return _pagina_resumos(response, prontuarios, limit)
+
+@prontuarios_router.get("/paciente/{paciente_id}", response_model=List[ProntuarioResumo])
+async def linha_do_tempo_paciente(
+    paciente_id: int,
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Obter a linha do tempo de prontuários de um paciente"""
+    # Verificar permissões
+    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
+        if current_user.paciente_id is None or current_user.paciente_id != paciente_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+    # Profissionais e admin podem ver o histórico de qualquer paciente
+    
+    prontuario_service = AsyncProntuarioService(db)
+    prontuarios = await prontuario_service.get_prontuarios_by_paciente(paciente_id, skip, limit, cursor)
+    
+    return _pagina_resumos(response, prontuarios, limit)
+
+@prontuarios_router.get("/busca", response_model=List[ProntuarioBuscaResultado])
+async def buscar_prontuarios(
+    q: str = Query(..., min_length=3, max_length=200),
+    paciente_id: Optional[int] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Buscar prontuários por texto da queixa ou do diagnóstico, do mais ao menos relevante"""
+    # Paciente busca apenas nos próprios prontuários
+    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
+        if current_user.paciente_id is None or paciente_id not in (None, current_user.paciente_id):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+        paciente_id = current_user.paciente_id
+    
+    prontuario_service = AsyncProntuarioService(db)
+    resultados = await prontuario_service.buscar_prontuarios(q, paciente_id, skip, limit)
+    
+    return [
+        ProntuarioBuscaResultado(**_resumo(p).model_dump(), relevancia=relevancia)
+        for p, relevancia in resultados
+    ]
+
+@prontuarios_router.get("/{prontuario_id}", response_model=ProntuarioResponse)
+async def obter_prontuario(
+    prontuario_id: int,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Obter prontuário completo"""
+    prontuario_service = AsyncProntuarioService(db)
+    prontuario = await prontuario_service.get_prontuario_by_id(prontuario_id)
+    _verificar_acesso(current_user, prontuario.paciente_id)
+    
+    return _resposta_completa(prontuario)
+
+@prontuarios_router.get("/{prontuario_id}/campos/{campo}", response_model=ProntuarioCampoResponse)
+async def obter_campo_prontuario(
+    prontuario_id: int,
+    campo: str,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Obter um único campo clínico do prontuário, sem carregar os demais"""
+    prontuario_service = AsyncProntuarioService(db)
+    registro = await prontuario_service.get_prontuario_campo(prontuario_id, campo)
+    _verificar_acesso(current_user, registro.paciente_id)
+    
+    return ProntuarioCampoResponse(id=prontuario_id, campo=campo, valor=registro.valor)
+
+@prontuarios_router.put("/{prontuario_id}", response_model=ProntuarioResponse)
+async def atualizar_prontuario(
+    prontuario_id: int,
+    prontuario_data: ProntuarioUpdate,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_profissional_or_admin)
+):
+    """Atualizar prontuário (profissional autor ou admin)"""
+    prontuario_service = AsyncProntuarioService(db)
+    prontuario = await prontuario_service.update_prontuario(
+        prontuario_id, prontuario_data, current_user.profissional_id
+    )
+    
+    return _resposta_completa(prontuario)
+
+@prontuarios_router.post("/{prontuario_id}/anexos", response_model=AnexoResponse, status_code=status.HTTP_201_CREATED)
+async def enviar_anexo(
+    prontuario_id: int,
+    request: Request,
+    nome: str = Query(..., min_length=1, max_length=255),
+    sha256_esperado: Optional[str] = Query(None, alias="sha256", pattern=r"^[0-9a-f]{64}$"),
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_profissional_or_admin)
+):
+    """Enviar anexo (profissional autor ou admin); o corpo da requisição é o próprio arquivo.
+
+    Com ``sha256``, o arquivo só é aceito se o conteúdo recebido tiver esse hash.
+    """
+    prontuario_service = AsyncProntuarioService(db)
+    
+    # Verificar permissões antes de receber o arquivo
+    registro = await prontuario_service.get_prontuario_campo(prontuario_id, "anexos")
+    if current_user.profissional_id is not None and current_user.profissional_id != registro.profissional_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado"
+        )
+    
+    sha256, tamanho = await blob_store.save(request.stream(), expected_sha256=sha256_esperado)
+    metadados = {
+        "nome": nome,
+        "content_type": request.headers.get("content-type") or "application/octet-stream",
+        "tamanho": tamanho,
+        "enviado_em": datetime.utcnow().isoformat()
+    }
+    await prontuario_service.add_anexo(prontuario_id, sha256, metadados, current_user.profissional_id)
+    
+    return AnexoResponse(sha256=sha256, **metadados)
+
+@prontuarios_router.get("/{prontuario_id}/anexos", response_model=List[AnexoResponse])
+async def listar_anexos(
+    prontuario_id: int,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Listar os anexos de um prontuário"""
+    prontuario_service = AsyncProntuarioService(db)
+    registro = await prontuario_service.get_prontuario_campo(prontuario_id, "anexos")
+    _verificar_acesso(current_user, registro.paciente_id)
+    
+    return [AnexoResponse(sha256=sha256, **metadados) for sha256, metadados in (registro.valor or {}).items()]
+
+@prontuarios_router.get("/{prontuario_id}/anexos/{sha256}")
+async def baixar_anexo(
+    prontuario_id: int,
+    sha256: str,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(get_current_user)
+):
+    """Baixar anexo, com suporte a Range para downloads parciais e retomados"""
+    prontuario_service = AsyncProntuarioService(db)
+    registro = await prontuario_service.get_prontuario_campo(prontuario_id, "anexos")
+    _verificar_acesso(current_user, registro.paciente_id)
+    
+    metadados = (registro.valor or {}).get(sha256)
+    if metadados is None or not blob_store.exists(sha256):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Anexo não encontrado"
+        )
+    
+    # O conteúdo nunca muda para o mesmo hash, então pode ficar em cache indefinidamente
+    return FileResponse(
+        blob_store.path(sha256),
+        media_type=metadados["content_type"],
+        filename=metadados["nome"],
+        headers={"ETag": f'"{sha256}"', "Cache-Control": "private, max-age=31536000, immutable"}
+    )
+
+@prontuarios_router.delete("/{prontuario_id}/anexos/{sha256}", status_code=status.HTTP_204_NO_CONTENT)
+async def remover_anexo(
+    prontuario_id: int,
+    sha256: str,
+    db: Session = Depends(get_database),
+    current_user: Principal = Depends(require_profissional_or_admin)
+):
+    """Remover anexo do prontuário (profissional autor ou admin)"""
+    prontuario_service = AsyncProntuarioService(db)
+    await prontuario_service.remove_anexo(prontuario_id, sha256, current_user.profissional_id)
+
+def _verificar_acesso(current_user: Principal, paciente_id: int):
+    """Paciente só acessa os próprios prontuários; profissionais e admin acessam todos"""
+    if current_user.tipo_usuario == TipoUsuario.PACIENTE:
+        if current_user.paciente_id is None or current_user.paciente_id != paciente_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+
+def _pagina_resumos(response: Response, prontuarios: list, limit: int) -> List[ProntuarioResumo]:
+    """Montar os resumos, limitando a página por tamanho do corpo além da quantidade"""
+    resumos = [_resumo(p) for p in prontuarios]
+    resumos, cortada = limit_page_bytes(resumos, PRONTUARIO_PAGE_MAX_BYTES)
+    set_next_cursor(response, resumos, limit, lambda r: (r.created_at, r.id), cortada)
+    
+    return resumos
+
+def _resumo(p) -> ProntuarioResumo:
+    return ProntuarioResumo(
+        id=p.id,
+        paciente_id=p.paciente_id,
+        profissional_id=p.profissional_id,
+        consulta_id=p.consulta_id,
+        created_at=p.created_at,
+        updated_at=p.updated_at,
+        queixa_principal_resumo=p.queixa_principal_resumo,
+        diagnostico_resumo=p.diagnostico_resumo,
+        paciente_nome=p.paciente_nome,
+        profissional_nome=p.profissional_nome,
+        especialidade=p.especialidade.value
+    )
+
+def _resposta_completa(prontuario) -> ProntuarioResponse:
+    return ProntuarioResponse(
+        id=prontuario.id,
+        paciente_id=prontuario.paciente_id,
+        profissional_id=prontuario.profissional_id,
+        consulta_id=prontuario.consulta_id,
+        queixa_principal=prontuario.queixa_principal,
+        historia_doenca_atual=prontuario.historia_doenca_atual,
+        exame_fisico=prontuario.exame_fisico,
+        diagnostico=prontuario.diagnostico,
+        prescricao=prontuario.prescricao,
+        observacoes=prontuario.observacoes,
+        anexos=prontuario.anexos,
+        created_at=prontuario.created_at,
+        updated_at=prontuario.updated_at,
+        paciente_nome=prontuario.paciente.user.nome,
+        profissional_nome=prontuario.profissional.user.nome,
+        especialidade=prontuario.profissional.especialidade.value
+    )
@@ -5,6 +5,7 @@ from app.routes.admin import admin_router
 from app.routes.pacientes import pacientes_router
 from app.routes.profissionais import profissionais_router
 from app.routes.consultas import consultas_router
+from app.routes.prontuarios import prontuarios_router
 
 router = APIRouter(prefix="/api")
 
@@ -14,6 +15,7 @@ router.include_router(admin_router)
 router.include_router(pacientes_router)
 router.include_router(profissionais_router)
 router.include_router(consultas_router)
+router.include_router(prontuarios_router)
 
 
 
@@ -1,15 +1,15 @@
 from .user_schemas import UserBase, UserCreate, UserResponse, UserLogin, Token
-from .paciente_schemas import PacienteBase, PacienteCreate, PacienteUpdate, PacienteResponse
-from .profissional_schemas import ProfissionalSaudeBase, ProfissionalSaudeCreate, ProfissionalSaudeUpdate, ProfissionalSaudeResponse
+from .paciente_schemas import PacienteBase, PacienteCreate, PacienteUpdate, PacienteResponse, PacienteBuscaResultado, PacienteImportErro, PacienteImportResult
+from .profissional_schemas import ProfissionalSaudeBase, ProfissionalSaudeCreate, ProfissionalSaudeUpdate, ProfissionalSaudeResponse, HorarioLivreResponse
 from .admin_schemas import AdminCreate, AdminUpdate, AdminResponse
 from .consulta_schemas import ConsultaBase, ConsultaCreate, ConsultaUpdate, ConsultaResponse
-from .prontuario_schemas import ProntuarioBase, ProntuarioCreate, ProntuarioUpdate, ProntuarioResponse
+from .prontuario_schemas import ProntuarioBase, ProntuarioCreate, ProntuarioUpdate, ProntuarioResponse, ProntuarioResumo, ProntuarioCampoResponse, AnexoResponse, ProntuarioBuscaResultado
 
 __all__ = [
     "UserBase", "UserCreate", "UserResponse", "UserLogin", "Token",
-    "PacienteBase", "PacienteCreate", "PacienteUpdate", "PacienteResponse",
-    "ProfissionalSaudeBase", "ProfissionalSaudeCreate", "ProfissionalSaudeUpdate", "ProfissionalSaudeResponse",
+    "PacienteBase", "PacienteCreate", "PacienteUpdate", "PacienteResponse", "PacienteBuscaResultado", "PacienteImportErro", "PacienteImportResult",
+    "ProfissionalSaudeBase", "ProfissionalSaudeCreate", "ProfissionalSaudeUpdate", "ProfissionalSaudeResponse", "HorarioLivreResponse",
     "AdminCreate", "AdminUpdate", "AdminResponse",
     "ConsultaBase", "ConsultaCreate", "ConsultaUpdate", "ConsultaResponse",
-    "ProntuarioBase", "ProntuarioCreate", "ProntuarioUpdate", "ProntuarioResponse"
+    "ProntuarioBase", "ProntuarioCreate", "ProntuarioUpdate", "ProntuarioResponse", "ProntuarioResumo", "ProntuarioCampoResponse", "AnexoResponse", "ProntuarioBuscaResultado"
 ]
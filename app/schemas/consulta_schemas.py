@@ -1,12 +1,13 @@
-from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
-from app.models.consulta import StatusConsulta, TipoConsulta
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date, datetime
+from app.models.consulta import StatusConsulta, TipoConsulta, DURACAO_PADRAO_MINUTOS, DURACAO_MAXIMA_MINUTOS
 
 class ConsultaBase(BaseModel):
     paciente_id: int
     profissional_id: int
     data_hora: datetime
+    duracao_minutos: int = Field(DURACAO_PADRAO_MINUTOS, ge=5, le=DURACAO_MAXIMA_MINUTOS)
     tipo_consulta: TipoConsulta = TipoConsulta.PRESENCIAL
     observacoes: Optional[str] = None
 
@@ -15,6 +16,7 @@ class ConsultaCreate(ConsultaBase):
 
 class ConsultaUpdate(BaseModel):
     data_hora: Optional[datetime] = None
+    duracao_minutos: Optional[int] = Field(None, ge=5, le=DURACAO_MAXIMA_MINUTOS)
     status: Optional[StatusConsulta] = None
     observacoes: Optional[str] = None
     link_telemedicina: Optional[str] = None
@@ -32,3 +34,13 @@ class ConsultaResponse(ConsultaBase):
     
     class Config:
         from_attributes = True
+
+class AgendaDia(BaseModel):
+    dia: date
+    consultas: List[ConsultaResponse]
+
+class AgendaResponse(BaseModel):
+    profissional_id: int
+    inicio: date
+    fim: date
+    dias: List[AgendaDia]
@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Dict, List
+from datetime import date
+
+class DashboardDia(BaseModel):
+    dia: date
+    total: int
+
+class DashboardResponse(BaseModel):
+    inicio: date
+    fim: date
+    total: int
+    por_status: Dict[str, int]
+    por_tipo: Dict[str, int]
+    por_especialidade: Dict[str, int]
+    por_dia: List[DashboardDia]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
 
 class PacienteBase(BaseModel):
@@ -34,3 +34,19 @@ class PacienteResponse(PacienteBase):
     
     class Config:
         from_attributes = True
+
+class PacienteBuscaResultado(BaseModel):
+    id: int
+    nome: str
+    cpf: str
+    data_nascimento: Optional[date] = None
+    telefone: Optional[str] = None
+
+class PacienteImportErro(BaseModel):
+    linha: int
+    erro: str
+
+class PacienteImportResult(BaseModel):
+    total: int
+    importados: int
+    erros: List[PacienteImportErro] = []
@@ -28,3 +28,10 @@ class ProfissionalSaudeResponse(ProfissionalSaudeBase):
     
     class Config:
         from_attributes = True
+
+class HorarioLivreResponse(BaseModel):
+    profissional_id: int
+    profissional_nome: str
+    especialidade: EspecialidadeMedica
+    data_hora: datetime
+    duracao_minutos: int
@@ -22,7 +22,6 @@ class ProntuarioUpdate(BaseModel):
     diagnostico: Optional[str] = None
     prescricao: Optional[str] = None
     observacoes: Optional[str] = None
-    anexos: Optional[Dict[str, Any]] = None
 
 class ProntuarioResponse(ProntuarioBase):
     id: int
@@ -38,3 +37,35 @@ class ProntuarioResponse(ProntuarioBase):
     
     class Config:
         from_attributes = True
+
+class ProntuarioResumo(BaseModel):
+    id: int
+    paciente_id: int
+    profissional_id: int
+    consulta_id: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+    
+    # Início dos campos de texto, para a listagem e a linha do tempo
+    queixa_principal_resumo: Optional[str] = None
+    diagnostico_resumo: Optional[str] = None
+    
+    # Dados relacionados
+    paciente_nome: Optional[str] = None
+    profissional_nome: Optional[str] = None
+    especialidade: Optional[str] = None
+
+class ProntuarioCampoResponse(BaseModel):
+    id: int
+    campo: str
+    valor: Optional[Any] = None
+
+class AnexoResponse(BaseModel):
+    sha256: str
+    nome: str
+    content_type: str
+    tamanho: int
+    enviado_em: datetime
+
+class ProntuarioBuscaResultado(ProntuarioResumo):
+    relevancia: float
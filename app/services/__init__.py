@@ -4,11 +4,31 @@ from .paciente_service import PacienteService
 from .profissional_service import ProfissionalSaudeService
 from .admin_service import AdminService
 from .consulta_service import ConsultaService
+from .disponibilidade_service import DisponibilidadeService
+from .prontuario_service import ProntuarioService
+from .async_services import (
+    AsyncUserService,
+    AsyncPacienteService,
+    AsyncProfissionalSaudeService,
+    AsyncAdminService,
+    AsyncConsultaService,
+    AsyncDisponibilidadeService,
+    AsyncProntuarioService
+)
 
 __all__ = [
     "UserService",
     "PacienteService", 
     "ProfissionalSaudeService",
     "AdminService",
-    "ConsultaService"
+    "ConsultaService",
+    "DisponibilidadeService",
+    "ProntuarioService",
+    "AsyncUserService",
+    "AsyncPacienteService",
+    "AsyncProfissionalSaudeService",
+    "AsyncAdminService",
+    "AsyncConsultaService",
+    "AsyncDisponibilidadeService",
+    "AsyncProntuarioService"
 ]
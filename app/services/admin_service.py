@@ -1,49 +1,54 @@
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
+from typing import Optional
 from app.models.user import User, TipoUsuario
 from app.models.admin import Admin
 from app.schemas.user_schemas import UserCreate
 from app.services.user_service import UserService
+from app.utils.db_errors import commit_or_400
+from app.utils.entity_cache import entity_cache
+from app.utils.pagination import paginate
 
 class AdminService:
     def __init__(self, db: Session):
         self.db = db
         self.user_service = UserService(db)
     
-    def create_admin(self, admin_data: dict) -> Admin:
-        """Criar novo administrador"""
-        # Verificar se email já existe
-        existing_user = self.db.query(User).filter(User.email == admin_data["email"]).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email já cadastrado no sistema"
-            )
-        
-        # Criar usuário
+    def create_admin(self, admin_data: dict, senha_hash: Optional[str] = None) -> Admin:
+        """Criar novo administrador (usuário e perfil em uma única transação)"""
+        # Criar usuário; email duplicado é detectado pela restrição única
         user_data = UserCreate(
             nome=admin_data["nome"],
             email=admin_data["email"],
             senha=admin_data["senha"],
             tipo_usuario=TipoUsuario.ADMIN
         )
-        user = self.user_service.create_user(user_data)
+        user = self.user_service.create_user(user_data, senha_hash)
         
         # Criar admin
         admin = Admin(
-            user_id=user.id,
+            user=user,
             setor=admin_data.get("setor"),
             permissoes_especiais=admin_data.get("permissoes_especiais")
         )
         
         self.db.add(admin)
-        self.db.commit()
-        self.db.refresh(admin)
+        commit_or_400(self.db)
         
         return admin
     
     def get_admin_by_id(self, admin_id: int) -> Admin:
-        """Obter admin por ID"""
+        """Obter admin por ID (somente leitura, servido pelo cache de perfis quando possível)"""
+        admin = entity_cache.get(Admin, admin_id)
+        if admin is None:
+            geracao = entity_cache.geracao()
+            admin = self._load_admin(admin_id)
+            entity_cache.set(admin, geracao)
+        
+        return admin
+    
+    def _load_admin(self, admin_id: int) -> Admin:
+        """Carregar admin do banco com o usuário, vinculado à sessão"""
         admin = self.db.query(Admin).options(
             joinedload(Admin.user)
         ).filter(Admin.id == admin_id).first()
@@ -56,8 +61,9 @@ class AdminService:
         
         return admin
     
-    def get_all_admins(self, skip: int = 0, limit: int = 100):
+    def get_all_admins(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
         """Listar todos os administradores"""
-        return self.db.query(Admin).options(
+        query = self.db.query(Admin).options(
             joinedload(Admin.user)
-        ).offset(skip).limit(limit).all()
+        )
+        return paginate(query, (Admin.id,), skip, limit, cursor)
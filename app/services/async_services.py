@@ -0,0 +1,324 @@
+import asyncio
+from datetime import date, datetime
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config.settings import IMPORT_BATCH_SIZE
+from app.models.consulta import StatusConsulta
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.consulta_schemas import ConsultaCreate, ConsultaUpdate
+from app.schemas.paciente_schemas import PacienteCreate, PacienteUpdate, PacienteImportErro, PacienteImportResult
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate, ProfissionalSaudeUpdate
+from app.schemas.prontuario_schemas import ProntuarioCreate, ProntuarioUpdate
+from app.services.user_service import UserService
+from app.services.paciente_service import PacienteService
+from app.services.profissional_service import ProfissionalSaudeService
+from app.services.admin_service import AdminService
+from app.services.consulta_service import ConsultaService
+from app.services.dashboard_service import DashboardService
+from app.services.disponibilidade_service import DisponibilidadeService
+from app.services.prontuario_service import ProntuarioService
+from app.utils.security import get_password_hash_async, verify_and_update_password_async
+
+class AsyncService:
+    """Variante assíncrona de um serviço síncrono.
+
+    Com ``AsyncSession`` a lógica do serviço roda via ``run_sync`` sobre o
+    driver assíncrono; com ``Session`` ela é executada no threadpool. Em ambos
+    os casos o event loop não fica bloqueado durante as consultas ao banco.
+    Os serviços devolvem as entidades com os relacionamentos usados pelas rotas
+    já carregados, para que nenhum lazy load aconteça fora do serviço.
+    """
+    service_class = None
+
+    def __init__(self, db: Union[Session, AsyncSession]):
+        self.db = db
+
+    async def _run(self, fn, *args, **kwargs):
+        """Executar ``fn(servico, ...)`` sem bloquear o event loop"""
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(
+                lambda session: fn(self.service_class(session), *args, **kwargs)
+            )
+        return await run_in_threadpool(fn, self.service_class(self.db), *args, **kwargs)
+
+class AsyncUserService(AsyncService):
+    service_class = UserService
+
+    async def authenticate_user(self, email: str, senha: str):
+        """Autenticar usuário, verificando a senha no pool dedicado do bcrypt"""
+        user = await self._run(UserService.get_active_user_by_email, email)
+
+        valid, new_hash = (
+            await verify_and_update_password_async(senha, user.senha_hash) if user else (False, None)
+        )
+        if not valid:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Email ou senha incorretos"
+            )
+
+        if new_hash:
+            user = await self._run(UserService.update_password_hash, user, new_hash)
+
+        return user
+
+    async def get_active_user(self, user_id: int):
+        """Obter usuário ativo com os perfis vinculados"""
+        return await self._run(UserService.get_active_user, user_id)
+
+    async def generate_token(self, user) -> str:
+        """Gerar token para usuário"""
+        return await self._run(UserService.generate_token, user)
+
+class AsyncPacienteService(AsyncService):
+    service_class = PacienteService
+
+    async def create_paciente(self, paciente_data: PacienteCreate):
+        """Criar novo paciente"""
+        senha_hash = await get_password_hash_async(paciente_data.senha)
+        return await self._run(PacienteService.create_paciente, paciente_data, senha_hash)
+
+    async def get_paciente_by_id(self, paciente_id: int):
+        """Obter paciente por ID"""
+        return await self._run(PacienteService.get_paciente_by_id, paciente_id)
+
+    async def get_pacientes_by_ids(self, paciente_ids: List[int]):
+        """Obter vários pacientes por ID"""
+        return await self._run(PacienteService.get_pacientes_by_ids, paciente_ids)
+
+    async def get_paciente_version(self, paciente_id: int):
+        """Obter a versão do paciente para o ETag"""
+        return await self._run(PacienteService.get_paciente_version, paciente_id)
+
+    async def get_all_pacientes(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Listar todos os pacientes"""
+        return await self._run(PacienteService.get_all_pacientes, skip, limit, cursor)
+
+    async def buscar_pacientes(self, termo: str, limit: int = 10):
+        """Buscar pacientes pelo início do nome ou do CPF"""
+        return await self._run(PacienteService.buscar_pacientes, termo, limit)
+
+    async def update_paciente(self, paciente_id: int, paciente_data: PacienteUpdate, versao: Optional[int] = None):
+        """Atualizar dados do paciente"""
+        return await self._run(PacienteService.update_paciente, paciente_id, paciente_data, versao)
+
+    async def import_pacientes(self, records: AsyncIterator, batch_size: int = IMPORT_BATCH_SIZE) -> PacienteImportResult:
+        """Importar pacientes em lotes a partir de registros ``(linha, registro, erro)``"""
+        resultado = PacienteImportResult(total=0, importados=0)
+        lote: List[Tuple[int, PacienteCreate]] = []
+
+        async for linha, registro, erro in records:
+            resultado.total += 1
+            if erro is None:
+                try:
+                    lote.append((linha, PacienteCreate(**registro)))
+                except ValidationError as exc:
+                    erro = "; ".join(
+                        f"{'.'.join(str(loc) for loc in e['loc'])}: {e['msg']}" for e in exc.errors()
+                    )
+            if erro is not None:
+                resultado.erros.append(PacienteImportErro(linha=linha, erro=erro))
+
+            if len(lote) >= batch_size:
+                await self._import_batch(lote, resultado)
+                lote = []
+
+        if lote:
+            await self._import_batch(lote, resultado)
+
+        resultado.erros.sort(key=lambda e: e.linha)
+        return resultado
+
+    async def _import_batch(self, lote: List[Tuple[int, PacienteCreate]], resultado: PacienteImportResult) -> None:
+        """Validar duplicidades, gerar hashes em paralelo e inserir um lote"""
+        conflitos = await self._run(PacienteService.find_import_conflicts, lote)
+        for linha, erro in conflitos.items():
+            resultado.erros.append(PacienteImportErro(linha=linha, erro=erro))
+
+        aceitos = [(linha, p) for linha, p in lote if linha not in conflitos]
+        if not aceitos:
+            return
+
+        hashes = await asyncio.gather(*(get_password_hash_async(p.senha) for _, p in aceitos))
+        try:
+            resultado.importados += await self._run(
+                PacienteService.bulk_create_pacientes,
+                [(p, senha_hash) for (_, p), senha_hash in zip(aceitos, hashes)]
+            )
+        except IntegrityError:
+            # Cadastro concorrente entre a verificação e a inserção: o lote foi desfeito
+            # e é refeito linha a linha, recusando apenas as linhas em conflito
+            recusadas = await self._run(
+                PacienteService.create_pacientes_por_linha,
+                [(linha, p, senha_hash) for (linha, p), senha_hash in zip(aceitos, hashes)]
+            )
+            resultado.importados += len(aceitos) - len(recusadas)
+            for linha in recusadas:
+                resultado.erros.append(
+                    PacienteImportErro(linha=linha, erro="CPF ou email cadastrado durante a importação")
+                )
+
+class AsyncProfissionalSaudeService(AsyncService):
+    service_class = ProfissionalSaudeService
+
+    async def create_profissional(self, profissional_data: ProfissionalSaudeCreate):
+        """Criar novo profissional de saúde"""
+        senha_hash = await get_password_hash_async(profissional_data.senha)
+        return await self._run(ProfissionalSaudeService.create_profissional, profissional_data, senha_hash)
+
+    async def get_profissional_by_id(self, profissional_id: int):
+        """Obter profissional por ID"""
+        return await self._run(ProfissionalSaudeService.get_profissional_by_id, profissional_id)
+
+    async def get_profissionais_by_ids(self, profissional_ids: List[int]):
+        """Obter vários profissionais por ID"""
+        return await self._run(ProfissionalSaudeService.get_profissionais_by_ids, profissional_ids)
+
+    async def get_profissional_version(self, profissional_id: int):
+        """Obter a versão do profissional para o ETag"""
+        return await self._run(ProfissionalSaudeService.get_profissional_version, profissional_id)
+
+    async def get_profissionais_versions(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Obter as versões de uma página de profissionais para o ETag"""
+        return await self._run(ProfissionalSaudeService.get_profissionais_versions, skip, limit, cursor)
+
+    async def get_all_profissionais(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Listar todos os profissionais"""
+        return await self._run(ProfissionalSaudeService.get_all_profissionais, skip, limit, cursor)
+
+    async def update_profissional(self, profissional_id: int, profissional_data: ProfissionalSaudeUpdate, versao: Optional[int] = None):
+        """Atualizar dados do profissional"""
+        return await self._run(ProfissionalSaudeService.update_profissional, profissional_id, profissional_data, versao)
+
+class AsyncAdminService(AsyncService):
+    service_class = AdminService
+
+    async def create_admin(self, admin_data: dict):
+        """Criar novo administrador"""
+        senha_hash = await get_password_hash_async(admin_data["senha"])
+        return await self._run(AdminService.create_admin, admin_data, senha_hash)
+
+    async def get_admin_by_id(self, admin_id: int):
+        """Obter admin por ID"""
+        return await self._run(AdminService.get_admin_by_id, admin_id)
+
+    async def get_all_admins(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Listar todos os administradores"""
+        return await self._run(AdminService.get_all_admins, skip, limit, cursor)
+
+class AsyncConsultaService(AsyncService):
+    service_class = ConsultaService
+
+    async def create_consulta(self, consulta_data: ConsultaCreate):
+        """Criar nova consulta"""
+        return await self._run(ConsultaService.create_consulta, consulta_data)
+
+    async def get_consulta_by_id(self, consulta_id: int):
+        """Obter consulta por ID"""
+        return await self._run(ConsultaService.get_consulta_by_id, consulta_id)
+
+    async def get_consultas_by_ids(self, consulta_ids: List[int]):
+        """Obter várias consultas por ID"""
+        return await self._run(ConsultaService.get_consultas_by_ids, consulta_ids)
+
+    async def get_consulta_version(self, consulta_id: int):
+        """Obter a versão da consulta para o ETag"""
+        return await self._run(ConsultaService.get_consulta_version, consulta_id)
+
+    async def get_consultas_by_paciente(self, paciente_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Obter consultas de um paciente específico"""
+        return await self._run(ConsultaService.get_consultas_by_paciente, paciente_id, skip, limit, cursor)
+
+    async def get_consultas_by_profissional(self, profissional_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Obter consultas de um profissional específico"""
+        return await self._run(ConsultaService.get_consultas_by_profissional, profissional_id, skip, limit, cursor)
+
+    async def get_all_consultas(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Obter todas as consultas"""
+        return await self._run(ConsultaService.get_all_consultas, skip, limit, cursor)
+
+    async def update_consulta(self, consulta_id: int, consulta_data: ConsultaUpdate, versao: Optional[int] = None):
+        """Atualizar consulta"""
+        return await self._run(ConsultaService.update_consulta, consulta_id, consulta_data, versao)
+
+    async def update_status_consulta(self, consulta_id: int, novo_status: StatusConsulta):
+        """Atualizar status de uma consulta"""
+        return await self._run(ConsultaService.update_status_consulta, consulta_id, novo_status)
+
+    async def get_agenda_profissional(self, profissional_id: int, inicio: date, dias: int):
+        """Obter a agenda do profissional agrupada por dia"""
+        return await self._run(ConsultaService.get_agenda_profissional, profissional_id, inicio, dias)
+
+class AsyncDashboardService(AsyncService):
+    service_class = DashboardService
+
+    async def get_dashboard(
+        self,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        profissional_id: Optional[int] = None,
+        especialidade: Optional[EspecialidadeMedica] = None
+    ):
+        """Totais de consultas do período, lidos do resumo"""
+        return await self._run(DashboardService.get_dashboard, inicio, fim, profissional_id, especialidade)
+
+class AsyncDisponibilidadeService(AsyncService):
+    service_class = DisponibilidadeService
+
+    async def get_horarios_livres(
+        self,
+        especialidade: EspecialidadeMedica,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        limite: int = 10
+    ):
+        """Obter os primeiros horários livres de uma especialidade"""
+        return await self._run(DisponibilidadeService.get_horarios_livres, especialidade, inicio, fim, limite)
+
+class AsyncProntuarioService(AsyncService):
+    service_class = ProntuarioService
+
+    async def create_prontuario(self, prontuario_data: ProntuarioCreate, profissional_id: int):
+        """Registrar prontuário"""
+        return await self._run(ProntuarioService.create_prontuario, prontuario_data, profissional_id)
+
+    async def get_prontuario_by_id(self, prontuario_id: int):
+        """Obter prontuário completo"""
+        return await self._run(ProntuarioService.get_prontuario_by_id, prontuario_id)
+
+    async def get_prontuario_campo(self, prontuario_id: int, campo: str):
+        """Obter um único campo clínico do prontuário"""
+        return await self._run(ProntuarioService.get_prontuario_campo, prontuario_id, campo)
+
+    async def get_prontuarios_by_paciente(self, paciente_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Linha do tempo de prontuários de um paciente"""
+        return await self._run(ProntuarioService.get_prontuarios_by_paciente, paciente_id, skip, limit, cursor)
+
+    async def get_prontuarios_by_profissional(self, profissional_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Prontuários registrados por um profissional"""
+        return await self._run(ProntuarioService.get_prontuarios_by_profissional, profissional_id, skip, limit, cursor)
+
+    async def get_all_prontuarios(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Listar todos os prontuários"""
+        return await self._run(ProntuarioService.get_all_prontuarios, skip, limit, cursor)
+
+    async def update_prontuario(self, prontuario_id: int, prontuario_data: ProntuarioUpdate, profissional_id: Optional[int] = None):
+        """Atualizar prontuário"""
+        return await self._run(ProntuarioService.update_prontuario, prontuario_id, prontuario_data, profissional_id)
+
+    async def buscar_prontuarios(self, texto: str, paciente_id: Optional[int] = None, skip: int = 0, limit: int = 20):
+        """Buscar prontuários pela queixa e pelo diagnóstico"""
+        return await self._run(ProntuarioService.buscar_prontuarios, texto, paciente_id, skip, limit)
+
+    async def add_anexo(self, prontuario_id: int, sha256: str, metadados: dict, profissional_id: Optional[int] = None):
+        """Vincular anexo ao prontuário"""
+        return await self._run(ProntuarioService.add_anexo, prontuario_id, sha256, metadados, profissional_id)
+
+    async def remove_anexo(self, prontuario_id: int, sha256: str, profissional_id: Optional[int] = None):
+        """Desvincular anexo do prontuário"""
+        return await self._run(ProntuarioService.remove_anexo, prontuario_id, sha256, profissional_id)
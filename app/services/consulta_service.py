@@ -1,10 +1,68 @@
-from sqlalchemy.orm import Session, joinedload
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.orm import Session, aliased, joinedload
 from fastapi import HTTPException, status
-from app.models.consulta import Consulta, StatusConsulta
+from app.models.consulta import Consulta, StatusConsulta, DURACAO_MAXIMA_MINUTOS
 from app.models.paciente import Paciente
 from app.models.profissional_saude import ProfissionalSaude
+from app.models.user import User
 from app.schemas.consulta_schemas import ConsultaCreate, ConsultaUpdate
-from typing import List, Optional
+from app.services.dashboard_service import DashboardService, chave_resumo
+from app.services.disponibilidade_service import disponibilidade_index
+from app.utils.agenda_cache import agenda_cache
+from app.utils.db_errors import commit_versionado, registro_alterado
+from app.utils.pagination import paginate
+from typing import List, Optional, Tuple
+
+_PacienteUser = aliased(User, name="paciente_user")
+_ProfissionalUser = aliased(User, name="profissional_user")
+
+# Colunas das listagens e da exportação, com os nomes usados em ConsultaResponse
+_COLUNAS_RESUMO = (
+    Consulta.id,
+    Consulta.paciente_id,
+    _PacienteUser.nome.label("paciente_nome"),
+    Consulta.profissional_id,
+    _ProfissionalUser.nome.label("profissional_nome"),
+    ProfissionalSaude.especialidade,
+    Consulta.data_hora,
+    Consulta.duracao_minutos,
+    Consulta.tipo_consulta,
+    Consulta.status,
+    Consulta.observacoes,
+    Consulta.link_telemedicina,
+    Consulta.created_at,
+)
+
+def _com_nomes(query):
+    """Juntar paciente, profissional e seus usuários (_PacienteUser/_ProfissionalUser)"""
+    return query.join(
+        Paciente, Paciente.id == Consulta.paciente_id
+    ).join(
+        _PacienteUser, _PacienteUser.id == Paciente.user_id
+    ).join(
+        ProfissionalSaude, ProfissionalSaude.id == Consulta.profissional_id
+    ).join(
+        _ProfissionalUser, _ProfissionalUser.id == ProfissionalSaude.user_id
+    )
+
+def _agenda_ocupada(coluna, agenda_id: str):
+    """Existe consulta ativa na agenda sobrepondo [:inicio, :fim), fora a própria :consulta_id"""
+    return select(Consulta.id).where(
+        coluna == bindparam(agenda_id),
+        Consulta.data_hora > bindparam("janela"),
+        Consulta.data_hora < bindparam("fim"),
+        Consulta.data_hora_fim > bindparam("inicio"),
+        Consulta.status != StatusConsulta.CANCELADA,
+        Consulta.id != bindparam("consulta_id")
+    ).exists()
+
+# As duas agendas numa única ida ao banco (um SELECT com dois EXISTS), montado uma
+# vez só: a verificação roda a cada escrita e montar a expressão custava mais que executá-la
+_CONFLITOS = select(
+    _agenda_ocupada(Consulta.profissional_id, "profissional_id"),
+    _agenda_ocupada(Consulta.paciente_id, "paciente_id")
+)
 
 class ConsultaService:
     def __init__(self, db: Session):
@@ -12,18 +70,22 @@ class ConsultaService:
     
     def create_consulta(self, consulta_data: ConsultaCreate) -> Consulta:
         """Criar nova consulta"""
-        # Verificar se paciente existe
-        paciente = self.db.query(Paciente).filter(Paciente.id == consulta_data.paciente_id).first()
+        # Verificar se paciente e profissional existem, travando suas linhas para
+        # que agendamentos concorrentes para eles sejam verificados em sequência
+        paciente = self.db.query(Paciente).options(
+            joinedload(Paciente.user)
+        ).filter(Paciente.id == consulta_data.paciente_id).with_for_update().first()
         if not paciente:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Paciente não encontrado"
             )
         
-        # Verificar se profissional existe
-        profissional = self.db.query(ProfissionalSaude).filter(
+        profissional = self.db.query(ProfissionalSaude).options(
+            joinedload(ProfissionalSaude.user)
+        ).filter(
             ProfissionalSaude.id == consulta_data.profissional_id
-        ).first()
+        ).with_for_update().first()
         if not profissional:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -32,16 +94,22 @@ class ConsultaService:
         
         # Criar consulta
         consulta = Consulta(
-            paciente_id=consulta_data.paciente_id,
-            profissional_id=consulta_data.profissional_id,
+            paciente_id=paciente.id,
+            profissional_id=profissional.id,
+            paciente=paciente,
+            profissional=profissional,
             data_hora=consulta_data.data_hora,
+            duracao_minutos=consulta_data.duracao_minutos,
             tipo_consulta=consulta_data.tipo_consulta,
             observacoes=consulta_data.observacoes
         )
+        self._check_conflitos(consulta)
         
         self.db.add(consulta)
+        DashboardService(self.db).registrar_alteracao(None, chave_resumo(consulta))
         self.db.commit()
-        self.db.refresh(consulta)
+        self._atualizar_disponibilidade(None, consulta)
+        agenda_cache.invalidar(consulta.profissional_id, [consulta.data_hora.date()])
         
         return consulta
     
@@ -60,46 +128,230 @@ class ConsultaService:
         
         return consulta
     
-    def get_consultas_by_paciente(self, paciente_id: int, skip: int = 0, limit: int = 100):
+    def get_consultas_by_ids(self, consulta_ids: List[int]) -> list:
+        """Obter várias consultas (linhas de resumo) na ordem dos IDs, numa única consulta com ``IN``.
+
+        Os IDs inexistentes são omitidos.
+        """
+        linhas = {
+            linha.id: linha
+            for linha in self._resumo_query().filter(Consulta.id.in_(consulta_ids))
+        }
+        return [linhas[consulta_id] for consulta_id in consulta_ids if consulta_id in linhas]
+    
+    def get_consulta_version(self, consulta_id: int) -> tuple:
+        """Obter ``(id, paciente_id, profissional_id, updated_at, paciente.user.updated_at,
+        profissional.user.updated_at, versao)`` da consulta, sem carregar as entidades"""
+        versao = _com_nomes(self.db.query(
+            Consulta.id,
+            Consulta.paciente_id,
+            Consulta.profissional_id,
+            Consulta.updated_at,
+            _PacienteUser.updated_at,
+            _ProfissionalUser.updated_at,
+            Consulta.versao
+        ).select_from(Consulta)).filter(Consulta.id == consulta_id).first()
+        
+        if not versao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Consulta não encontrada"
+            )
+        
+        return tuple(versao)
+    
+    def get_consultas_by_paciente(self, paciente_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
         """Obter consultas de um paciente específico"""
-        return self.db.query(Consulta).options(
-            joinedload(Consulta.paciente).joinedload(Paciente.user),
-            joinedload(Consulta.profissional).joinedload(ProfissionalSaude.user)
-        ).filter(Consulta.paciente_id == paciente_id).offset(skip).limit(limit).all()
+        query = self._resumo_query().filter(Consulta.paciente_id == paciente_id)
+        return paginate(query, (Consulta.data_hora, Consulta.id), skip, limit, cursor)
     
-    def get_consultas_by_profissional(self, profissional_id: int, skip: int = 0, limit: int = 100):
+    def get_consultas_by_profissional(self, profissional_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
         """Obter consultas de um profissional específico"""
-        return self.db.query(Consulta).options(
-            joinedload(Consulta.paciente).joinedload(Paciente.user),
-            joinedload(Consulta.profissional).joinedload(ProfissionalSaude.user)
-        ).filter(Consulta.profissional_id == profissional_id).offset(skip).limit(limit).all()
+        query = self._resumo_query().filter(Consulta.profissional_id == profissional_id)
+        return paginate(query, (Consulta.data_hora, Consulta.id), skip, limit, cursor)
     
-    def get_all_consultas(self, skip: int = 0, limit: int = 100):
+    def get_all_consultas(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
         """Obter todas as consultas"""
-        return self.db.query(Consulta).options(
-            joinedload(Consulta.paciente).joinedload(Paciente.user),
-            joinedload(Consulta.profissional).joinedload(ProfissionalSaude.user)
-        ).offset(skip).limit(limit).all()
+        return paginate(self._resumo_query(), (Consulta.data_hora, Consulta.id), skip, limit, cursor)
+    
+    def get_agenda_profissional(self, profissional_id: int, inicio: date, dias: int) -> List[Tuple[date, tuple]]:
+        """Consultas do profissional de ``inicio`` a ``inicio + dias``, agrupadas por dia e em ordem de horário.
+
+        Os dias em cache não vão ao banco; os demais são lidos numa única busca por
+        intervalo no índice (profissional_id, data_hora).
+        """
+        datas = [inicio + timedelta(days=d) for d in range(dias)]
+        versao = agenda_cache.versao(profissional_id)
+        agenda = {dia: agenda_cache.get(profissional_id, dia) for dia in datas}
+        faltando = [dia for dia in datas if agenda[dia] is None]
+        
+        if faltando:
+            if not self.db.query(ProfissionalSaude.id).filter(ProfissionalSaude.id == profissional_id).first():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Profissional não encontrado"
+                )
+            linhas = self._resumo_query().filter(
+                Consulta.profissional_id == profissional_id,
+                Consulta.data_hora >= datetime.combine(faltando[0], time.min),
+                Consulta.data_hora < datetime.combine(faltando[-1] + timedelta(days=1), time.min)
+            ).order_by(Consulta.data_hora, Consulta.id).all()
+            
+            lidos = {dia: [] for dia in faltando}
+            for linha in linhas:
+                dia = linha.data_hora.date()
+                if dia in lidos:
+                    lidos[dia].append(linha)
+            for dia, consultas in lidos.items():
+                agenda[dia] = tuple(consultas)
+                agenda_cache.set(profissional_id, dia, consultas, versao)
+        
+        return [(dia, agenda[dia]) for dia in datas]
     
-    def update_consulta(self, consulta_id: int, consulta_data: ConsultaUpdate) -> Consulta:
-        """Atualizar consulta"""
+    def _resumo_query(self):
+        """Linhas com os campos de ConsultaResponse, sem carregar entidades do ORM.
+
+        As listagens não precisam das entidades de paciente, profissional e
+        usuários (com o hash de senha), apenas de três nomes vindos dos joins.
+        """
+        return _com_nomes(self.db.query(*_COLUNAS_RESUMO).select_from(Consulta))
+    
+    @staticmethod
+    def export_statement(
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        status_consulta: Optional[StatusConsulta] = None
+    ) -> Select:
+        """Montar a consulta da exportação: apenas as colunas exportadas, em ordem de horário"""
+        stmt = _com_nomes(select(*_COLUNAS_RESUMO).select_from(Consulta))
+        
+        if inicio is not None:
+            stmt = stmt.where(Consulta.data_hora >= inicio)
+        if fim is not None:
+            stmt = stmt.where(Consulta.data_hora < fim)
+        if status_consulta is not None:
+            stmt = stmt.where(Consulta.status == status_consulta)
+        
+        return stmt.order_by(Consulta.data_hora, Consulta.id)
+    
+    def update_consulta(self, consulta_id: int, consulta_data: ConsultaUpdate, versao: Optional[int] = None) -> Consulta:
+        """Atualizar consulta.
+
+        Sem trava de linha: o UPDATE compara a versão lida (``version_id_col``) e uma
+        escrita concorrente vira 409, ou 412 com ``versao`` vinda do If-Match.
+        """
         consulta = self.get_consulta_by_id(consulta_id)
+        if versao is not None and consulta.versao != versao:
+            raise registro_alterado(precondicao=True)
+        antes = self._intervalo_ocupado(consulta)
+        resumo_antes = chave_resumo(consulta)
+        
+        dados = consulta_data.model_dump(exclude_unset=True)
+        reagendada = (
+            "data_hora" in dados
+            or "duracao_minutos" in dados
+            or (consulta.status == StatusConsulta.CANCELADA
+                and dados.get("status", StatusConsulta.CANCELADA) != StatusConsulta.CANCELADA)
+        )
         
         # Atualizar dados da consulta
-        for field, value in consulta_data.model_dump(exclude_unset=True).items():
+        for field, value in dados.items():
             setattr(consulta, field, value)
         
-        self.db.commit()
-        self.db.refresh(consulta)
+        if reagendada:
+            self._reservar_horario(consulta)
+        
+        DashboardService(self.db).registrar_alteracao(resumo_antes, chave_resumo(consulta))
+        commit_versionado(self.db, precondicao=versao is not None)
+        self._atualizar_disponibilidade(antes, consulta)
+        agenda_cache.invalidar(consulta.profissional_id, {resumo_antes[0], consulta.data_hora.date()})
         
         return consulta
     
     def update_status_consulta(self, consulta_id: int, novo_status: StatusConsulta) -> Consulta:
         """Atualizar status de uma consulta"""
         consulta = self.get_consulta_by_id(consulta_id)
+        antes = self._intervalo_ocupado(consulta)
+        resumo_antes = chave_resumo(consulta)
+        reativada = consulta.status == StatusConsulta.CANCELADA
         consulta.status = novo_status
         
-        self.db.commit()
-        self.db.refresh(consulta)
+        if reativada:
+            self._reservar_horario(consulta)
+        
+        DashboardService(self.db).registrar_alteracao(resumo_antes, chave_resumo(consulta))
+        commit_versionado(self.db)
+        self._atualizar_disponibilidade(antes, consulta)
+        agenda_cache.invalidar(consulta.profissional_id, {resumo_antes[0], consulta.data_hora.date()})
         
         return consulta
+    
+    def _reservar_horario(self, consulta: Consulta):
+        """Travar as agendas do paciente e do profissional e verificar conflitos"""
+        self.db.query(Paciente.id).filter(Paciente.id == consulta.paciente_id).with_for_update().first()
+        self.db.query(ProfissionalSaude.id).filter(
+            ProfissionalSaude.id == consulta.profissional_id
+        ).with_for_update().first()
+        self._check_conflitos(consulta)
+    
+    def _check_conflitos(self, consulta: Consulta):
+        """Verificar sobreposição com outras consultas do profissional e do paciente.
+
+        Cada verificação é uma busca por intervalo no índice (agenda, data_hora),
+        limitada à janela da duração máxima antes do início, então o custo não
+        depende do tamanho da agenda; as duas vão numa única instrução (_CONFLITOS).
+        """
+        consulta.data_hora_fim = consulta.data_hora + timedelta(minutes=consulta.duracao_minutos)
+        if consulta.status == StatusConsulta.CANCELADA:
+            return
+        
+        profissional_ocupado, paciente_ocupado = self.db.execute(_CONFLITOS, {
+            "profissional_id": consulta.profissional_id,
+            "paciente_id": consulta.paciente_id,
+            "janela": consulta.data_hora - timedelta(minutes=DURACAO_MAXIMA_MINUTOS),
+            "inicio": consulta.data_hora,
+            "fim": consulta.data_hora_fim,
+            # Consulta nova ainda sem id: nenhuma linha tem id 0
+            "consulta_id": consulta.id or 0,
+        }).one()
+        if profissional_ocupado:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Profissional já possui consulta nesse horário"
+            )
+        if paciente_ocupado:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Paciente já possui consulta nesse horário"
+            )
+    
+    @staticmethod
+    def _intervalo_ocupado(consulta: Consulta) -> Optional[Tuple[int, datetime, datetime]]:
+        """Intervalo que a consulta ocupa na agenda do profissional, se estiver ativa"""
+        if consulta.status == StatusConsulta.CANCELADA:
+            return None
+        return consulta.profissional_id, consulta.data_hora, consulta.data_hora_fim
+    
+    def _atualizar_disponibilidade(self, antes, consulta: Consulta):
+        """Refletir a escrita confirmada nos bitmaps de horários livres em memória"""
+        depois = self._intervalo_ocupado(consulta)
+        if antes == depois:
+            return
+        
+        if antes is not None and disponibilidade_index.contem(antes[0]):
+            profissional_id, inicio, fim = antes
+            # Outras consultas podem cobrir parte do intervalo liberado
+            restantes = self.db.query(Consulta.data_hora, Consulta.data_hora_fim).filter(
+                Consulta.profissional_id == profissional_id,
+                Consulta.data_hora > inicio - timedelta(minutes=DURACAO_MAXIMA_MINUTOS),
+                Consulta.data_hora < fim,
+                Consulta.data_hora_fim > inicio,
+                Consulta.status != StatusConsulta.CANCELADA
+            ).all()
+            disponibilidade_index.liberar(profissional_id, inicio, fim, restantes)
+        elif antes is not None:
+            # Sem bitmap a atualizar, mas uma leitura em curso pode estar montando um
+            disponibilidade_index.invalidar(antes[0])
+        
+        if depois is not None:
+            disponibilidade_index.ocupar(*depois)
@@ -0,0 +1,174 @@
+from datetime import date, datetime, time, timedelta
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, insert, literal, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from app.models.consulta import Consulta, StatusConsulta, TipoConsulta
+from app.models.profissional_saude import ProfissionalSaude, EspecialidadeMedica
+from app.models.resumo_consulta import ResumoConsulta
+
+# Maior período aceito pelo dashboard, em dias
+PERIODO_MAXIMO_DIAS = 366
+PERIODO_PADRAO_DIAS = 30
+
+# (dia, profissional_id, status, tipo_consulta): a linha do resumo em que uma consulta é contada
+ChaveResumo = Tuple[date, int, StatusConsulta, TipoConsulta]
+
+_CHAVE = ("dia", "profissional_id", "status", "tipo_consulta")
+
+def chave_resumo(consulta: Consulta) -> ChaveResumo:
+    """Linha do resumo em que a consulta é contada (antes do flush, com os defaults do modelo)"""
+    return (
+        consulta.data_hora.date(),
+        consulta.profissional_id,
+        consulta.status or StatusConsulta.AGENDADA,
+        consulta.tipo_consulta or TipoConsulta.PRESENCIAL,
+    )
+
+class DashboardService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def registrar_alteracao(self, antes: Optional[ChaveResumo], depois: Optional[ChaveResumo]) -> None:
+        """Mover uma consulta da linha ``antes`` para a ``depois`` do resumo, sem commit.
+
+        Chamado pelo ConsultaService antes do commit da escrita, para que consulta e
+        resumo sejam gravados na mesma transação.
+        """
+        if antes == depois:
+            return
+        if antes is not None:
+            self._somar(antes, -1)
+        if depois is not None:
+            self._somar(depois, 1)
+
+    def _somar(self, chave: ChaveResumo, delta: int) -> None:
+        """Upsert atômico da contagem, seguro com escritas concorrentes na mesma linha"""
+        tabela = ResumoConsulta.__table__
+        agora = datetime.utcnow()
+        valores = dict(zip(_CHAVE, chave), quantidade=delta, created_at=agora, updated_at=agora)
+        dialeto = self.db.get_bind().dialect.name
+
+        if dialeto == "sqlite":
+            stmt = sqlite.insert(tabela).values(**valores).on_conflict_do_update(
+                index_elements=list(_CHAVE),
+                set_={"quantidade": tabela.c.quantidade + delta, "updated_at": agora}
+            )
+        elif dialeto in ("mysql", "mariadb"):
+            stmt = mysql.insert(tabela).values(**valores).on_duplicate_key_update(
+                quantidade=tabela.c.quantidade + delta, updated_at=agora
+            )
+        else:
+            filtro = [tabela.c[coluna] == valor for coluna, valor in zip(_CHAVE, chave)]
+            atualizado = self.db.execute(
+                tabela.update().where(*filtro).values(quantidade=tabela.c.quantidade + delta, updated_at=agora)
+            )
+            if atualizado.rowcount:
+                return
+            stmt = tabela.insert().values(**valores)
+
+        self.db.execute(stmt)
+
+    def get_dashboard(
+        self,
+        inicio: Optional[date] = None,
+        fim: Optional[date] = None,
+        profissional_id: Optional[int] = None,
+        especialidade: Optional[EspecialidadeMedica] = None
+    ) -> dict:
+        """Totais de consultas por status, tipo, especialidade e dia no período [inicio, fim].
+
+        Lê apenas o resumo (e o cadastro de profissionais, para a especialidade).
+        """
+        fim = fim or date.today()
+        inicio = inicio or fim - timedelta(days=PERIODO_PADRAO_DIAS - 1)
+        if fim < inicio or (fim - inicio).days >= PERIODO_MAXIMO_DIAS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Período inválido: o fim deve ser posterior ao início, em até {PERIODO_MAXIMO_DIAS} dias"
+            )
+
+        filtros = [ResumoConsulta.dia >= inicio, ResumoConsulta.dia <= fim]
+        if profissional_id is not None:
+            filtros.append(ResumoConsulta.profissional_id == profissional_id)
+        if especialidade is not None:
+            filtros.append(ResumoConsulta.profissional_id.in_(
+                select(ProfissionalSaude.id).where(ProfissionalSaude.especialidade == especialidade)
+            ))
+
+        # Agregar o resumo antes de juntar a especialidade: o join fica com poucas linhas
+        por_profissional = select(
+            ResumoConsulta.profissional_id,
+            ResumoConsulta.status,
+            ResumoConsulta.tipo_consulta,
+            func.sum(ResumoConsulta.quantidade).label("quantidade")
+        ).where(*filtros).group_by(
+            ResumoConsulta.profissional_id, ResumoConsulta.status, ResumoConsulta.tipo_consulta
+        ).subquery()
+        linhas = self.db.query(
+            ProfissionalSaude.especialidade,
+            por_profissional.c.status,
+            por_profissional.c.tipo_consulta,
+            por_profissional.c.quantidade
+        ).join(por_profissional, por_profissional.c.profissional_id == ProfissionalSaude.id).all()
+        # Por dia, na ordem do índice (dia, ...), sem ordenação temporária
+        dias = self.db.query(
+            ResumoConsulta.dia, func.sum(ResumoConsulta.quantidade)
+        ).filter(*filtros).group_by(ResumoConsulta.dia).all()
+
+        por_status = {s.value: 0 for s in StatusConsulta}
+        por_tipo = {t.value: 0 for t in TipoConsulta}
+        por_especialidade = {e.value: 0 for e in EspecialidadeMedica}
+        for especialidade_linha, status_consulta, tipo, quantidade in linhas:
+            quantidade = int(quantidade or 0)
+            por_status[status_consulta.value] += quantidade
+            por_tipo[tipo.value] += quantidade
+            por_especialidade[especialidade_linha.value] += quantidade
+        por_dia = {inicio + timedelta(days=d): 0 for d in range((fim - inicio).days + 1)}
+        for dia, quantidade in dias:
+            por_dia[dia] = int(quantidade or 0)
+
+        return {
+            "inicio": inicio,
+            "fim": fim,
+            "total": sum(por_status.values()),
+            "por_status": por_status,
+            "por_tipo": por_tipo,
+            "por_especialidade": por_especialidade,
+            "por_dia": sorted(por_dia.items()),
+        }
+
+    def reconstruir(self, inicio: Optional[date] = None, fim: Optional[date] = None) -> int:
+        """Recalcular o resumo a partir de ``consultas`` (inteiro ou só o período), numa transação.
+
+        Devolve o número de linhas gravadas no resumo.
+        """
+        filtros_resumo, filtros_consultas = [], []
+        if inicio is not None:
+            filtros_resumo.append(ResumoConsulta.dia >= inicio)
+            filtros_consultas.append(Consulta.data_hora >= datetime.combine(inicio, time.min))
+        if fim is not None:
+            filtros_resumo.append(ResumoConsulta.dia <= fim)
+            filtros_consultas.append(Consulta.data_hora < datetime.combine(fim + timedelta(days=1), time.min))
+
+        # Consultas sem status/tipo contam com os defaults do modelo, como em chave_resumo
+        chave = (
+            func.date(Consulta.data_hora),
+            Consulta.profissional_id,
+            func.coalesce(Consulta.status, literal(StatusConsulta.AGENDADA, Consulta.status.type)),
+            func.coalesce(Consulta.tipo_consulta, literal(TipoConsulta.PRESENCIAL, Consulta.tipo_consulta.type)),
+        )
+        agora = datetime.utcnow()
+        origem = select(*chave, func.count(), literal(agora), literal(agora)).where(
+            *filtros_consultas
+        ).group_by(*chave)
+
+        self.db.execute(delete(ResumoConsulta).where(*filtros_resumo))
+        resultado = self.db.execute(
+            insert(ResumoConsulta).from_select(
+                [*_CHAVE, "quantidade", "created_at", "updated_at"], origem
+            )
+        )
+        self.db.commit()
+        return resultado.rowcount
@@ -0,0 +1,236 @@
+import heapq
+import threading
+import time
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.config.settings import SLOT_MINUTOS, DISPONIBILIDADE_JANELA_DIAS, DISPONIBILIDADE_TTL
+from app.models.consulta import Consulta, StatusConsulta, DURACAO_MAXIMA_MINUTOS
+from app.models.profissional_saude import ProfissionalSaude, EspecialidadeMedica
+from app.models.user import User
+from app.utils.horarios import HorarioSemanal, parse_horario_atendimento
+
+Intervalo = Tuple[datetime, datetime]
+
+
+class AgendaLivre:
+    """Bitmap dos slots livres de um profissional numa janela de dias.
+
+    O bit ``i`` representa o slot que começa em ``inicio + i * slot_minutos``;
+    ele fica ligado quando o slot está dentro do expediente e sem consulta.
+    """
+
+    def __init__(self, inicio: datetime, semana: HorarioSemanal, slot_minutos: int, dias: int):
+        self.inicio = inicio
+        self.slot_minutos = slot_minutos
+        self.slots_por_dia = 24 * 60 // slot_minutos
+        self.total = dias * self.slots_por_dia
+        self.criada_em = time.monotonic()
+
+        expediente = 0
+        for dia in range(dias):
+            weekday = (inicio + timedelta(days=dia)).weekday()
+            for faixa_inicio, faixa_fim in semana.get(weekday, []):
+                primeiro = -(-faixa_inicio // slot_minutos)
+                ultimo = faixa_fim // slot_minutos
+                if primeiro < ultimo:
+                    expediente |= self._mascara(dia * self.slots_por_dia + primeiro, dia * self.slots_por_dia + ultimo)
+        self.expediente = expediente
+        self.livre = expediente
+
+    @property
+    def fim(self) -> datetime:
+        return self.inicio + timedelta(minutes=self.total * self.slot_minutos)
+
+    @staticmethod
+    def _mascara(primeiro: int, ultimo: int) -> int:
+        return ((1 << (ultimo - primeiro)) - 1) << primeiro if primeiro < ultimo else 0
+
+    def _slots(self, inicio: datetime, fim: datetime) -> Tuple[int, int]:
+        """Índices [primeiro, último) dos slots que se sobrepõem ao intervalo"""
+        de = int((inicio - self.inicio).total_seconds()) // 60
+        ate = int((fim - self.inicio).total_seconds()) // 60
+        return max(0, de // self.slot_minutos), min(self.total, -(-ate // self.slot_minutos))
+
+    def ocupar(self, inicio: datetime, fim: datetime) -> None:
+        self.livre &= ~self._mascara(*self._slots(inicio, fim))
+
+    def liberar(self, inicio: datetime, fim: datetime) -> None:
+        self.livre |= self._mascara(*self._slots(inicio, fim)) & self.expediente
+
+    def livres(self, inicio: datetime, fim: datetime) -> Iterator[datetime]:
+        """Inícios dos slots livres inteiramente contidos em [inicio, fim)"""
+        de = int((inicio - self.inicio).total_seconds()) // 60
+        ate = int((fim - self.inicio).total_seconds()) // 60
+        primeiro = max(0, -(-de // self.slot_minutos))
+        ultimo = min(self.total, ate // self.slot_minutos)
+        bits = (self.livre >> primeiro) & ((1 << max(0, ultimo - primeiro)) - 1)
+        while bits:
+            menor = bits & -bits
+            indice = primeiro + menor.bit_length() - 1
+            yield self.inicio + timedelta(minutes=indice * self.slot_minutos)
+            bits ^= menor
+
+
+class DisponibilidadeIndex:
+    """Bitmaps de horários livres por profissional, mantidos em memória.
+
+    As escritas de consultas deste processo atualizam os bitmaps já calculados;
+    o TTL limita o tempo em que alterações feitas por outros workers ficam invisíveis.
+    """
+
+    def __init__(self, slot_minutos: int, dias: int, ttl: float):
+        self.slot_minutos = slot_minutos
+        self.dias = dias
+        self.ttl = ttl
+        self._agendas: Dict[int, AgendaLivre] = {}
+        # Contador global incrementado a cada escrita, e o valor dele na última escrita
+        # de cada profissional; protege contra uma leitura que consultou o banco antes
+        # de uma escrita e grava o bitmap depois dela
+        self._versao = 0
+        self._alterado_em: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def janela(self) -> Intervalo:
+        """Janela atual: de hoje à meia-noite até ``dias`` dias depois"""
+        inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        return inicio, inicio + timedelta(days=self.dias)
+
+    def get(self, profissional_id: int) -> Optional[AgendaLivre]:
+        with self._lock:
+            agenda = self._agendas.get(profissional_id)
+        if agenda is None or agenda.inicio != self.janela()[0] or time.monotonic() - agenda.criada_em > self.ttl:
+            return None
+        return agenda
+
+    def versao(self) -> int:
+        """Versão a obter antes de consultar o banco e repassar a ``set``"""
+        return self._versao
+
+    def set(self, profissional_id: int, agenda: AgendaLivre, versao: int) -> None:
+        """Guardar um bitmap lido do banco, a menos que uma escrita no profissional tenha ocorrido depois de ``versao``"""
+        with self._lock:
+            if self._alterado_em.get(profissional_id, 0) <= versao:
+                self._agendas[profissional_id] = agenda
+
+    def _alterar(self, profissional_id: int) -> None:
+        self._versao += 1
+        self._alterado_em[profissional_id] = self._versao
+
+    def contem(self, profissional_id: int) -> bool:
+        with self._lock:
+            return profissional_id in self._agendas
+
+    def ocupar(self, profissional_id: int, inicio: datetime, fim: datetime) -> None:
+        with self._lock:
+            self._alterar(profissional_id)
+            agenda = self._agendas.get(profissional_id)
+            if agenda is not None:
+                agenda.ocupar(inicio, fim)
+
+    def liberar(self, profissional_id: int, inicio: datetime, fim: datetime, ocupados: Sequence[Intervalo] = ()) -> None:
+        """Liberar um intervalo, mantendo ocupados os trechos de outras consultas"""
+        with self._lock:
+            self._alterar(profissional_id)
+            agenda = self._agendas.get(profissional_id)
+            if agenda is not None:
+                agenda.liberar(inicio, fim)
+                for ocupado_inicio, ocupado_fim in ocupados:
+                    agenda.ocupar(ocupado_inicio, ocupado_fim)
+
+    def invalidar(self, profissional_id: int) -> None:
+        with self._lock:
+            self._alterar(profissional_id)
+            self._agendas.pop(profissional_id, None)
+
+
+disponibilidade_index = DisponibilidadeIndex(SLOT_MINUTOS, DISPONIBILIDADE_JANELA_DIAS, DISPONIBILIDADE_TTL)
+
+
+class DisponibilidadeService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_horarios_livres(
+        self,
+        especialidade: EspecialidadeMedica,
+        inicio: Optional[datetime] = None,
+        fim: Optional[datetime] = None,
+        limite: int = 10
+    ) -> List[dict]:
+        """Obter os primeiros horários livres entre os profissionais de uma especialidade"""
+        janela_inicio, janela_fim = disponibilidade_index.janela()
+        inicio = max(inicio or datetime.min, datetime.now())
+        fim = min(fim or janela_fim, janela_fim)
+
+        # Lida antes de qualquer consulta: cobre também mudanças de expediente
+        versao = disponibilidade_index.versao()
+        profissionais = self.db.query(
+            ProfissionalSaude.id, ProfissionalSaude.horario_atendimento, User.nome
+        ).join(User, User.id == ProfissionalSaude.user_id).filter(
+            ProfissionalSaude.especialidade == especialidade,
+            User.ativo == True
+        ).all()
+        agendas = self._carregar_agendas(profissionais, janela_inicio, janela_fim, versao)
+        nomes = {p.id: p.nome for p in profissionais}
+
+        # Intercalar os slots de todos os profissionais em ordem de horário
+        horarios = heapq.merge(*(
+            self._horarios(profissional_id, agenda, inicio, fim)
+            for profissional_id, agenda in agendas.items()
+        ))
+        return [
+            {
+                "profissional_id": profissional_id,
+                "profissional_nome": nomes[profissional_id],
+                "especialidade": especialidade,
+                "data_hora": data_hora,
+                "duracao_minutos": disponibilidade_index.slot_minutos
+            }
+            for data_hora, profissional_id in islice(horarios, limite)
+        ]
+
+    @staticmethod
+    def _horarios(profissional_id: int, agenda: AgendaLivre, inicio: datetime, fim: datetime):
+        for data_hora in agenda.livres(inicio, fim):
+            yield data_hora, profissional_id
+
+    def _carregar_agendas(
+        self, profissionais, janela_inicio: datetime, janela_fim: datetime, versao: int
+    ) -> Dict[int, AgendaLivre]:
+        """Obter os bitmaps em cache, calculando os ausentes com uma única consulta"""
+        agendas = {}
+        faltantes = {}
+        for profissional in profissionais:
+            agenda = disponibilidade_index.get(profissional.id)
+            if agenda is None:
+                faltantes[profissional.id] = profissional.horario_atendimento
+            else:
+                agendas[profissional.id] = agenda
+
+        if faltantes:
+            novas = {
+                profissional_id: AgendaLivre(
+                    janela_inicio,
+                    parse_horario_atendimento(horario),
+                    disponibilidade_index.slot_minutos,
+                    disponibilidade_index.dias
+                )
+                for profissional_id, horario in faltantes.items()
+            }
+            ocupados = self.db.query(
+                Consulta.profissional_id, Consulta.data_hora, Consulta.data_hora_fim
+            ).filter(
+                Consulta.profissional_id.in_(list(faltantes)),
+                Consulta.data_hora > janela_inicio - timedelta(minutes=DURACAO_MAXIMA_MINUTOS),
+                Consulta.data_hora < janela_fim,
+                Consulta.status != StatusConsulta.CANCELADA
+            )
+            for profissional_id, data_hora, data_hora_fim in ocupados:
+                novas[profissional_id].ocupar(data_hora, data_hora_fim)
+            for profissional_id, agenda in novas.items():
+                disponibilidade_index.set(profissional_id, agenda, versao)
+            agendas.update(novas)
+
+        return agendas
@@ -1,40 +1,42 @@
+import re
+from datetime import datetime
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
+from typing import Dict, List, Optional, Tuple
 from app.models.user import User, TipoUsuario
 from app.models.paciente import Paciente
 from app.schemas.paciente_schemas import PacienteCreate, PacienteUpdate
 from app.services.user_service import UserService
+from app.utils.db_errors import commit_or_400, commit_versionado, registro_alterado
+from app.utils.entity_cache import entity_cache
+from app.utils.pagination import paginate
+from app.utils.texto import normalizar_nome, somente_digitos
 from app.schemas.user_schemas import UserCreate
 
+# Termo de busca formado só por dígitos e pontuação de CPF
+_TERMO_CPF = re.compile(r"^[\d.\-/\s]+$")
+
 class PacienteService:
     def __init__(self, db: Session):
         self.db = db
         self.user_service = UserService(db)
     
-    def create_paciente(self, paciente_data: PacienteCreate) -> Paciente:
-        """Criar novo paciente"""
-        # Verificar se CPF já existe
-        existing_paciente = self.db.query(Paciente).filter(
-            Paciente.cpf == paciente_data.cpf
-        ).first()
-        if existing_paciente:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="CPF já cadastrado no sistema"
-            )
-        
-        # Criar usuário
+    def create_paciente(self, paciente_data: PacienteCreate, senha_hash: Optional[str] = None) -> Paciente:
+        """Criar novo paciente (usuário e perfil em uma única transação)"""
+        # Criar usuário; CPF e email duplicados são detectados pelas restrições únicas
         user_data = UserCreate(
             nome=paciente_data.nome,
             email=paciente_data.email,
             senha=paciente_data.senha,
             tipo_usuario=TipoUsuario.PACIENTE
         )
-        user = self.user_service.create_user(user_data)
+        user = self.user_service.create_user(user_data, senha_hash)
         
         # Criar paciente
         paciente = Paciente(
-            user_id=user.id,
+            user=user,
             cpf=paciente_data.cpf,
             rg=paciente_data.rg,
             data_nascimento=paciente_data.data_nascimento,
@@ -46,13 +48,44 @@ class PacienteService:
         )
         
         self.db.add(paciente)
-        self.db.commit()
-        self.db.refresh(paciente)
+        commit_or_400(self.db, (Paciente.cpf == paciente_data.cpf, "CPF já cadastrado no sistema"))
         
         return paciente
     
     def get_paciente_by_id(self, paciente_id: int) -> Paciente:
-        """Obter paciente por ID"""
+        """Obter paciente por ID (somente leitura, servido pelo cache de perfis quando possível)"""
+        paciente = entity_cache.get(Paciente, paciente_id)
+        if paciente is None:
+            geracao = entity_cache.geracao()
+            paciente = self._load_paciente(paciente_id)
+            entity_cache.set(paciente, geracao)
+        
+        return paciente
+    
+    def get_pacientes_by_ids(self, paciente_ids: List[int]) -> List[Paciente]:
+        """Obter vários pacientes na ordem dos IDs, omitindo os inexistentes.
+
+        Os acertos vêm do cache de perfis; os demais, de uma única consulta com ``IN``.
+        """
+        encontrados = {}
+        for paciente_id in paciente_ids:
+            paciente = entity_cache.get(Paciente, paciente_id)
+            if paciente is not None:
+                encontrados[paciente_id] = paciente
+        
+        faltando = [paciente_id for paciente_id in paciente_ids if paciente_id not in encontrados]
+        if faltando:
+            geracao = entity_cache.geracao()
+            for paciente in self.db.query(Paciente).options(
+                joinedload(Paciente.user)
+            ).filter(Paciente.id.in_(faltando)):
+                encontrados[paciente.id] = paciente
+                entity_cache.set(paciente, geracao)
+        
+        return [encontrados[paciente_id] for paciente_id in paciente_ids if paciente_id in encontrados]
+    
+    def _load_paciente(self, paciente_id: int) -> Paciente:
+        """Carregar paciente do banco com o usuário, vinculado à sessão"""
         paciente = self.db.query(Paciente).options(
             joinedload(Paciente.user)
         ).filter(Paciente.id == paciente_id).first()
@@ -65,25 +98,146 @@ class PacienteService:
         
         return paciente
     
-    def get_all_pacientes(self, skip: int = 0, limit: int = 100):
+    def get_paciente_version(self, paciente_id: int) -> tuple:
+        """Obter ``(id, updated_at, user.updated_at, versao)`` do paciente, sem carregar as entidades"""
+        versao = self.db.query(
+            Paciente.id, Paciente.updated_at, User.updated_at, Paciente.versao
+        ).join(User, User.id == Paciente.user_id).filter(Paciente.id == paciente_id).first()
+        
+        if not versao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Paciente não encontrado"
+            )
+        
+        return tuple(versao)
+    
+    def get_all_pacientes(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
         """Listar todos os pacientes"""
-        return self.db.query(Paciente).options(
+        query = self.db.query(Paciente).options(
             joinedload(Paciente.user)
-        ).offset(skip).limit(limit).all()
+        )
+        return paginate(query, (Paciente.id,), skip, limit, cursor)
     
-    def update_paciente(self, paciente_id: int, paciente_data: PacienteUpdate) -> Paciente:
-        """Atualizar dados do paciente"""
-        paciente = self.get_paciente_by_id(paciente_id)
+    def buscar_pacientes(self, termo: str, limit: int = 10) -> list:
+        """Buscar pacientes pelo início do nome ou do CPF (com ou sem pontuação).
+
+        Cada busca é uma leitura por intervalo no índice da coluna normalizada,
+        já na ordem do índice, então o custo depende só de ``limit``.
+        """
+        if _TERMO_CPF.match(termo):
+            prefixo = somente_digitos(termo)
+            coluna = Paciente.cpf_digitos
+        else:
+            prefixo = normalizar_nome(termo)
+            coluna = Paciente.nome_busca
+        
+        if not prefixo:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Termo de busca inválido"
+            )
+        
+        # O prefixo normalizado tem só letras, dígitos e espaços, sem curingas do LIKE
+        return self.db.query(
+            Paciente.id,
+            User.nome,
+            Paciente.cpf,
+            Paciente.data_nascimento,
+            Paciente.telefone
+        ).join(User, User.id == Paciente.user_id).filter(
+            coluna.like(prefixo + "%")
+        ).order_by(coluna, Paciente.id).limit(limit).all()
+    
+    def update_paciente(self, paciente_id: int, paciente_data: PacienteUpdate, versao: Optional[int] = None) -> Paciente:
+        """Atualizar dados do paciente.
+
+        Com ``versao`` (vinda do If-Match), só atualiza se o paciente ainda estiver nela.
+        """
+        paciente = self._load_paciente(paciente_id)
+        if versao is not None and paciente.versao != versao:
+            raise registro_alterado(precondicao=True)
+        dados = paciente_data.model_dump(exclude_unset=True)
         
         # Atualizar dados do paciente
-        for field, value in paciente_data.model_dump(exclude_unset=True).items():
+        for field, value in dados.items():
             if field == "nome":
                 # Atualizar nome no usuário
                 paciente.user.nome = value
             else:
                 setattr(paciente, field, value)
         
-        self.db.commit()
-        self.db.refresh(paciente)
+        if dados:
+            # Garante o UPDATE (e a troca de versão) mesmo quando só o usuário mudou
+            paciente.updated_at = datetime.utcnow()
+        commit_versionado(self.db, precondicao=versao is not None)
         
         return paciente
+    
+    def find_import_conflicts(self, pacientes: List[Tuple[int, PacienteCreate]]) -> Dict[int, str]:
+        """Verificar CPFs e emails de um lote já cadastrados ou repetidos no próprio lote"""
+        cpfs = {p.cpf for _, p in pacientes}
+        emails = {p.email for _, p in pacientes}
+        
+        # Uma consulta por coluna para o lote inteiro
+        cpfs_existentes = {
+            cpf for (cpf,) in self.db.query(Paciente.cpf).filter(Paciente.cpf.in_(cpfs))
+        }
+        emails_existentes = {
+            email.lower() for (email,) in self.db.query(User.email).filter(User.email.in_(emails))
+        }
+        
+        conflitos = {}
+        for linha, paciente_data in pacientes:
+            email = paciente_data.email.lower()
+            if paciente_data.cpf in cpfs_existentes:
+                conflitos[linha] = "CPF já cadastrado no sistema"
+            elif email in emails_existentes:
+                conflitos[linha] = "Email já cadastrado no sistema"
+            cpfs_existentes.add(paciente_data.cpf)
+            emails_existentes.add(email)
+        
+        return conflitos
+    
+    def bulk_create_pacientes(self, pacientes: List[Tuple[PacienteCreate, str]]) -> int:
+        """Inserir lote de usuários e pacientes com inserts de múltiplas linhas"""
+        try:
+            self.db.execute(insert(User), [
+                {
+                    "nome": paciente_data.nome,
+                    "email": paciente_data.email,
+                    "senha_hash": senha_hash,
+                    "tipo_usuario": TipoUsuario.PACIENTE,
+                    "ativo": True
+                }
+                for paciente_data, senha_hash in pacientes
+            ])
+            
+            emails = [paciente_data.email for paciente_data, _ in pacientes]
+            user_ids = dict(self.db.query(User.email, User.id).filter(User.email.in_(emails)).all())
+            
+            self.db.execute(insert(Paciente), [
+                {
+                    "user_id": user_ids[paciente_data.email],
+                    "cpf_digitos": somente_digitos(paciente_data.cpf),
+                    "nome_busca": normalizar_nome(paciente_data.nome),
+                    **paciente_data.model_dump(exclude={"nome", "email", "senha"})
+                }
+                for paciente_data, _ in pacientes
+            ])
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise
+        
+        return len(pacientes)
+    
+    def create_pacientes_por_linha(self, pacientes: List[Tuple[int, PacienteCreate, str]]) -> List[int]:
+        """Inserir cada paciente na própria transação; devolve as linhas recusadas por CPF ou email duplicado"""
+        recusadas = []
+        for linha, paciente_data, senha_hash in pacientes:
+            try:
+                self.bulk_create_pacientes([(paciente_data, senha_hash)])
+            except IntegrityError:
+                recusadas.append(linha)
+        return recusadas
@@ -1,9 +1,15 @@
+from datetime import datetime
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
+from typing import List, Optional
 from app.models.user import User, TipoUsuario
 from app.models.profissional_saude import ProfissionalSaude
 from app.schemas.profissional_schemas import ProfissionalSaudeCreate, ProfissionalSaudeUpdate
 from app.services.user_service import UserService
+from app.services.disponibilidade_service import disponibilidade_index
+from app.utils.db_errors import commit_or_400, commit_versionado, registro_alterado
+from app.utils.entity_cache import entity_cache
+from app.utils.pagination import paginate
 from app.schemas.user_schemas import UserCreate
 
 class ProfissionalSaudeService:
@@ -11,30 +17,20 @@ class ProfissionalSaudeService:
         self.db = db
         self.user_service = UserService(db)
     
-    def create_profissional(self, profissional_data: ProfissionalSaudeCreate) -> ProfissionalSaude:
-        """Criar novo profissional de saúde"""
-        # Verificar se CRM já existe
-        existing_profissional = self.db.query(ProfissionalSaude).filter(
-            ProfissionalSaude.crm == profissional_data.crm
-        ).first()
-        if existing_profissional:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="CRM já cadastrado no sistema"
-            )
-        
-        # Criar usuário
+    def create_profissional(self, profissional_data: ProfissionalSaudeCreate, senha_hash: Optional[str] = None) -> ProfissionalSaude:
+        """Criar novo profissional de saúde (usuário e perfil em uma única transação)"""
+        # Criar usuário; CRM e email duplicados são detectados pelas restrições únicas
         user_data = UserCreate(
             nome=profissional_data.nome,
             email=profissional_data.email,
             senha=profissional_data.senha,
             tipo_usuario=TipoUsuario.PROFISSIONAL_SAUDE
         )
-        user = self.user_service.create_user(user_data)
+        user = self.user_service.create_user(user_data, senha_hash)
         
         # Criar profissional
         profissional = ProfissionalSaude(
-            user_id=user.id,
+            user=user,
             crm=profissional_data.crm,
             especialidade=profissional_data.especialidade,
             telefone=profissional_data.telefone,
@@ -42,13 +38,44 @@ class ProfissionalSaudeService:
         )
         
         self.db.add(profissional)
-        self.db.commit()
-        self.db.refresh(profissional)
+        commit_or_400(self.db, (ProfissionalSaude.crm == profissional_data.crm, "CRM já cadastrado no sistema"))
         
         return profissional
     
     def get_profissional_by_id(self, profissional_id: int) -> ProfissionalSaude:
-        """Obter profissional por ID"""
+        """Obter profissional por ID (somente leitura, servido pelo cache de perfis quando possível)"""
+        profissional = entity_cache.get(ProfissionalSaude, profissional_id)
+        if profissional is None:
+            geracao = entity_cache.geracao()
+            profissional = self._load_profissional(profissional_id)
+            entity_cache.set(profissional, geracao)
+        
+        return profissional
+    
+    def get_profissionais_by_ids(self, profissional_ids: List[int]) -> List[ProfissionalSaude]:
+        """Obter vários profissionais na ordem dos IDs, omitindo os inexistentes.
+
+        Os acertos vêm do cache de perfis; os demais, de uma única consulta com ``IN``.
+        """
+        encontrados = {}
+        for profissional_id in profissional_ids:
+            profissional = entity_cache.get(ProfissionalSaude, profissional_id)
+            if profissional is not None:
+                encontrados[profissional_id] = profissional
+        
+        faltando = [profissional_id for profissional_id in profissional_ids if profissional_id not in encontrados]
+        if faltando:
+            geracao = entity_cache.geracao()
+            for profissional in self.db.query(ProfissionalSaude).options(
+                joinedload(ProfissionalSaude.user)
+            ).filter(ProfissionalSaude.id.in_(faltando)):
+                encontrados[profissional.id] = profissional
+                entity_cache.set(profissional, geracao)
+        
+        return [encontrados[profissional_id] for profissional_id in profissional_ids if profissional_id in encontrados]
+    
+    def _load_profissional(self, profissional_id: int) -> ProfissionalSaude:
+        """Carregar profissional do banco com o usuário, vinculado à sessão"""
         profissional = self.db.query(ProfissionalSaude).options(
             joinedload(ProfissionalSaude.user)
         ).filter(ProfissionalSaude.id == profissional_id).first()
@@ -61,25 +88,59 @@ class ProfissionalSaudeService:
         
         return profissional
     
-    def get_all_profissionais(self, skip: int = 0, limit: int = 100):
+    def get_profissional_version(self, profissional_id: int) -> tuple:
+        """Obter ``(id, updated_at, user.updated_at, versao)`` do profissional, sem carregar as entidades"""
+        versao = self._version_query().filter(ProfissionalSaude.id == profissional_id).first()
+        
+        if not versao:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profissional não encontrado"
+            )
+        
+        return tuple(versao)
+    
+    def get_profissionais_versions(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[tuple]:
+        """Versões dos profissionais da mesma página que ``get_all_profissionais`` devolveria"""
+        return [tuple(v) for v in paginate(self._version_query(), (ProfissionalSaude.id,), skip, limit, cursor)]
+    
+    def _version_query(self):
+        return self.db.query(
+            ProfissionalSaude.id, ProfissionalSaude.updated_at, User.updated_at, ProfissionalSaude.versao
+        ).join(User, User.id == ProfissionalSaude.user_id)
+    
+    def get_all_profissionais(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
         """Listar todos os profissionais"""
-        return self.db.query(ProfissionalSaude).options(
+        query = self.db.query(ProfissionalSaude).options(
             joinedload(ProfissionalSaude.user)
-        ).offset(skip).limit(limit).all()
+        )
+        return paginate(query, (ProfissionalSaude.id,), skip, limit, cursor)
     
-    def update_profissional(self, profissional_id: int, profissional_data: ProfissionalSaudeUpdate) -> ProfissionalSaude:
-        """Atualizar dados do profissional"""
-        profissional = self.get_profissional_by_id(profissional_id)
+    def update_profissional(
+        self, profissional_id: int, profissional_data: ProfissionalSaudeUpdate, versao: Optional[int] = None
+    ) -> ProfissionalSaude:
+        """Atualizar dados do profissional.
+
+        Com ``versao`` (vinda do If-Match), só atualiza se o profissional ainda estiver nela.
+        """
+        profissional = self._load_profissional(profissional_id)
+        if versao is not None and profissional.versao != versao:
+            raise registro_alterado(precondicao=True)
+        dados = profissional_data.model_dump(exclude_unset=True)
         
         # Atualizar dados do profissional
-        for field, value in profissional_data.model_dump(exclude_unset=True).items():
+        for field, value in dados.items():
             if field == "nome":
                 # Atualizar nome no usuário
                 profissional.user.nome = value
             else:
                 setattr(profissional, field, value)
         
-        self.db.commit()
-        self.db.refresh(profissional)
+        if dados:
+            # Garante o UPDATE (e a troca de versão) mesmo quando só o usuário mudou
+            profissional.updated_at = datetime.utcnow()
+        commit_versionado(self.db, precondicao=versao is not None)
+        if "horario_atendimento" in dados:
+            disponibilidade_index.invalidar(profissional.id)
         
         return profissional
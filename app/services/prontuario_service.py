@@ -0,0 +1,290 @@
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session, aliased, joinedload, undefer, undefer_group
+from fastapi import HTTPException, status
+from typing import List, Optional, Tuple
+from app.models.consulta import Consulta
+from app.models.paciente import Paciente
+from app.models.profissional_saude import ProfissionalSaude
+from app.models.prontuario import Prontuario, CONTEUDO_CLINICO, CAMPOS_CLINICOS, CAMPOS_BUSCA
+from app.models.user import User
+from app.schemas.prontuario_schemas import ProntuarioCreate, ProntuarioUpdate
+from app.utils.indice_invertido import IndiceInvertido
+from app.utils.pagination import paginate
+from app.utils.texto import texto_para_busca, tokenizar
+
+# Caracteres de queixa e diagnóstico incluídos nos resumos
+RESUMO_CARACTERES = 200
+
+_PacienteUser = aliased(User, name="paciente_user")
+_ProfissionalUser = aliased(User, name="profissional_user")
+
+# Colunas dos resumos, com os nomes usados em ProntuarioResumo
+_COLUNAS_RESUMO = (
+    Prontuario.id,
+    Prontuario.paciente_id,
+    Prontuario.profissional_id,
+    Prontuario.consulta_id,
+    Prontuario.created_at,
+    Prontuario.updated_at,
+    func.substr(Prontuario.queixa_principal, 1, RESUMO_CARACTERES).label("queixa_principal_resumo"),
+    func.substr(Prontuario.diagnostico, 1, RESUMO_CARACTERES).label("diagnostico_resumo"),
+    _PacienteUser.nome.label("paciente_nome"),
+    _ProfissionalUser.nome.label("profissional_nome"),
+    ProfissionalSaude.especialidade,
+)
+
+# Busca textual sem FULLTEXT (SQLite): índice invertido deste processo, carregado
+# na primeira busca e mantido pelas escritas de prontuários confirmadas aqui
+indice_prontuarios = IndiceInvertido()
+
+class ProntuarioService:
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def create_prontuario(self, prontuario_data: ProntuarioCreate, profissional_id: int) -> Prontuario:
+        """Registrar prontuário de um paciente pelo profissional informado"""
+        paciente = self.db.query(Paciente).options(
+            joinedload(Paciente.user)
+        ).filter(Paciente.id == prontuario_data.paciente_id).first()
+        if not paciente:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Paciente não encontrado"
+            )
+        
+        profissional = self.db.query(ProfissionalSaude).options(
+            joinedload(ProfissionalSaude.user)
+        ).filter(ProfissionalSaude.id == profissional_id).first()
+        if not profissional:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Profissional não encontrado"
+            )
+        
+        if prontuario_data.consulta_id is not None:
+            consulta = self.db.query(Consulta.paciente_id).filter(
+                Consulta.id == prontuario_data.consulta_id
+            ).first()
+            if not consulta:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Consulta não encontrada"
+                )
+            if consulta.paciente_id != paciente.id:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Consulta não pertence ao paciente"
+                )
+        
+        prontuario = Prontuario(
+            paciente_id=paciente.id,
+            profissional_id=profissional.id,
+            paciente=paciente,
+            profissional=profissional,
+            anexos=None,
+            texto_busca=texto_para_busca(*(getattr(prontuario_data, campo) for campo in CAMPOS_BUSCA)),
+            **prontuario_data.model_dump(exclude={"paciente_id"})
+        )
+        
+        self.db.add(prontuario)
+        self.db.commit()
+        self._atualizar_indice(prontuario)
+        
+        return prontuario
+    
+    def get_prontuario_by_id(self, prontuario_id: int) -> Prontuario:
+        """Obter prontuário completo, com o conteúdo clínico"""
+        prontuario = self.db.query(Prontuario).options(
+            undefer_group(CONTEUDO_CLINICO),
+            joinedload(Prontuario.paciente).joinedload(Paciente.user),
+            joinedload(Prontuario.profissional).joinedload(ProfissionalSaude.user)
+        ).filter(Prontuario.id == prontuario_id).first()
+        
+        if not prontuario:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Prontuário não encontrado"
+            )
+        
+        return prontuario
+    
+    def get_prontuario_campo(self, prontuario_id: int, campo: str):
+        """Obter um único campo clínico, com o paciente e o autor para checar o acesso"""
+        if campo not in CAMPOS_CLINICOS:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Campo não encontrado"
+            )
+        
+        registro = self.db.query(
+            Prontuario.paciente_id,
+            Prontuario.profissional_id,
+            getattr(Prontuario, campo).label("valor")
+        ).filter(Prontuario.id == prontuario_id).first()
+        
+        if not registro:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Prontuário não encontrado"
+            )
+        
+        return registro
+    
+    def get_prontuarios_by_paciente(self, paciente_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Linha do tempo de prontuários de um paciente (resumos)"""
+        query = self._resumo_query().filter(Prontuario.paciente_id == paciente_id)
+        return paginate(query, (Prontuario.created_at, Prontuario.id), skip, limit, cursor)
+    
+    def get_prontuarios_by_profissional(self, profissional_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Prontuários registrados por um profissional (resumos)"""
+        query = self._resumo_query().filter(Prontuario.profissional_id == profissional_id)
+        return paginate(query, (Prontuario.created_at, Prontuario.id), skip, limit, cursor)
+    
+    def get_all_prontuarios(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None):
+        """Listar todos os prontuários (resumos)"""
+        return paginate(self._resumo_query(), (Prontuario.created_at, Prontuario.id), skip, limit, cursor)
+    
+    def update_prontuario(
+        self,
+        prontuario_id: int,
+        prontuario_data: ProntuarioUpdate,
+        profissional_id: Optional[int] = None
+    ) -> Prontuario:
+        """Atualizar prontuário; com ``profissional_id``, apenas o autor pode alterá-lo"""
+        prontuario = self.get_prontuario_by_id(prontuario_id)
+        
+        if profissional_id is not None and prontuario.profissional_id != profissional_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+        
+        dados = prontuario_data.model_dump(exclude_unset=True)
+        for field, value in dados.items():
+            setattr(prontuario, field, value)
+        
+        reindexar = any(campo in dados for campo in CAMPOS_BUSCA)
+        if reindexar:
+            prontuario.texto_busca = texto_para_busca(*(getattr(prontuario, campo) for campo in CAMPOS_BUSCA))
+        
+        self.db.commit()
+        if reindexar:
+            self._atualizar_indice(prontuario)
+        
+        return prontuario
+    
+    def buscar_prontuarios(
+        self,
+        texto: str,
+        paciente_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 20
+    ) -> List[Tuple[object, float]]:
+        """Buscar prontuários pela queixa e pelo diagnóstico; devolve ``(resumo, relevância)``.
+
+        Todos os termos precisam aparecer (cada um também como prefixo, "cefal"
+        encontra "cefaleia"), sem diferença de acentos ou caixa. No MariaDB a busca
+        usa o índice FULLTEXT; nos demais bancos, o índice invertido em memória.
+        """
+        termos = tokenizar(texto)
+        if not termos:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Informe ao menos um termo de busca com 3 ou mais letras"
+            )
+        
+        if self.db.get_bind().dialect.name in ("mysql", "mariadb"):
+            relevancia = match(
+                Prontuario.texto_busca, against=" ".join(f"+{termo}*" for termo in termos)
+            ).in_boolean_mode()
+            query = self._resumo_query().add_columns(relevancia.label("relevancia")).filter(relevancia)
+            if paciente_id is not None:
+                query = query.filter(Prontuario.paciente_id == paciente_id)
+            linhas = query.order_by(relevancia.desc(), Prontuario.id).offset(skip).limit(limit).all()
+            return [(linha, linha.relevancia) for linha in linhas]
+        
+        indice_prontuarios.garantir_carga(self._documentos_busca)
+        filtros = {"paciente_id": paciente_id} if paciente_id is not None else None
+        pagina = indice_prontuarios.buscar(termos, filtros)[skip:skip + limit]
+        if not pagina:
+            return []
+        
+        resumos = {
+            linha.id: linha
+            for linha in self._resumo_query().filter(Prontuario.id.in_([doc_id for doc_id, _ in pagina]))
+        }
+        return [(resumos[doc_id], relevancia) for doc_id, relevancia in pagina if doc_id in resumos]
+    
+    def add_anexo(self, prontuario_id: int, sha256: str, metadados: dict, profissional_id: Optional[int] = None) -> dict:
+        """Vincular ao prontuário um arquivo já gravado no armazenamento por hash"""
+        prontuario = self._load_anexos(prontuario_id, profissional_id)
+        
+        # JSON só é detectado como alterado quando o valor é substituído
+        anexos = dict(prontuario.anexos or {})
+        anexos[sha256] = metadados
+        prontuario.anexos = anexos
+        
+        self.db.commit()
+        
+        return metadados
+    
+    def remove_anexo(self, prontuario_id: int, sha256: str, profissional_id: Optional[int] = None) -> None:
+        """Desvincular um anexo do prontuário (o arquivo pode estar em uso por outros)"""
+        prontuario = self._load_anexos(prontuario_id, profissional_id)
+        
+        anexos = dict(prontuario.anexos or {})
+        if anexos.pop(sha256, None) is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Anexo não encontrado"
+            )
+        prontuario.anexos = anexos
+        
+        self.db.commit()
+    
+    def _load_anexos(self, prontuario_id: int, profissional_id: Optional[int]) -> Prontuario:
+        """Carregar só os anexos do prontuário, travando a linha contra alterações concorrentes"""
+        prontuario = self.db.query(Prontuario).options(
+            undefer(Prontuario.anexos)
+        ).filter(Prontuario.id == prontuario_id).with_for_update().first()
+        
+        if not prontuario:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Prontuário não encontrado"
+            )
+        if profissional_id is not None and prontuario.profissional_id != profissional_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Acesso negado"
+            )
+        
+        return prontuario
+    
+    def _documentos_busca(self):
+        """Documentos para a carga do índice invertido, lidos em lotes"""
+        linhas = self.db.query(
+            Prontuario.id, Prontuario.paciente_id, Prontuario.texto_busca
+        ).execution_options(yield_per=1000)
+        for linha in linhas:
+            yield linha.id, (linha.texto_busca or "").split(), {"paciente_id": linha.paciente_id}
+    
+    @staticmethod
+    def _atualizar_indice(prontuario: Prontuario):
+        """Refletir no índice invertido em memória o texto confirmado do prontuário"""
+        indice_prontuarios.atualizar(
+            prontuario.id, (prontuario.texto_busca or "").split(), {"paciente_id": prontuario.paciente_id}
+        )
+    
+    def _resumo_query(self):
+        """Resumos sem o conteúdo clínico completo, apenas o início de queixa e diagnóstico"""
+        return self.db.query(*_COLUNAS_RESUMO).select_from(Prontuario).join(
+            Paciente, Paciente.id == Prontuario.paciente_id
+        ).join(
+            _PacienteUser, _PacienteUser.id == Paciente.user_id
+        ).join(
+            ProfissionalSaude, ProfissionalSaude.id == Prontuario.profissional_id
+        ).join(
+            _ProfissionalUser, _ProfissionalUser.id == ProfissionalSaude.user_id
+        )
@@ -1,25 +1,21 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.user_schemas import UserCreate
-from app.utils.security import get_password_hash, verify_password, create_access_token
+from app.utils.security import get_password_hash, verify_and_update_password, create_access_token
+from typing import Optional
 
 class UserService:
     def __init__(self, db: Session):
         self.db = db
     
-    def create_user(self, user_data: UserCreate) -> User:
-        """Criar novo usuário"""
-        # Verificar se email já existe
-        existing_user = self.db.query(User).filter(User.email == user_data.email).first()
-        if existing_user:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Email já cadastrado no sistema"
-            )
-        
-        # Criar usuário
-        hashed_password = get_password_hash(user_data.senha)
+    def create_user(self, user_data: UserCreate, senha_hash: Optional[str] = None) -> User:
+        """Adicionar novo usuário à unidade de trabalho atual, sem confirmá-la.
+
+        Email duplicado é detectado pela restrição única no commit do chamador.
+        ``senha_hash`` permite informar o hash já calculado.
+        """
+        hashed_password = senha_hash or get_password_hash(user_data.senha)
         user = User(
             nome=user_data.nome,
             email=user_data.email,
@@ -28,26 +24,46 @@ class UserService:
         )
         
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
         
         return user
     
-    def authenticate_user(self, email: str, senha: str) -> User:
-        """Autenticar usuário"""
-        user = self.db.query(User).filter(
+    def get_active_user_by_email(self, email: str) -> Optional[User]:
+        """Obter usuário ativo pelo email"""
+        return self.db.query(User).filter(
             User.email == email, 
             User.ativo == True
         ).first()
+    
+    def authenticate_user(self, email: str, senha: str) -> User:
+        """Autenticar usuário"""
+        user = self.get_active_user_by_email(email)
         
-        if not user or not verify_password(senha, user.senha_hash):
+        valid, new_hash = verify_and_update_password(senha, user.senha_hash) if user else (False, None)
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Email ou senha incorretos"
             )
         
+        if new_hash:
+            self.update_password_hash(user, new_hash)
+        
         return user
     
+    def update_password_hash(self, user: User, senha_hash: str) -> User:
+        """Regravar hash da senha (usado quando o custo do bcrypt muda)"""
+        user.senha_hash = senha_hash
+        self.db.commit()
+        return user
+    
+    def get_active_user(self, user_id: int) -> User:
+        """Obter usuário ativo com os perfis vinculados já carregados"""
+        return self.db.query(User).options(
+            joinedload(User.paciente),
+            joinedload(User.profissional_saude),
+            joinedload(User.admin)
+        ).filter(User.id == user_id, User.ativo == True).first()
+    
     def generate_token(self, user: User) -> str:
         """Gerar token para usuário"""
         access_token = create_access_token(data={"sub": str(user.id)})
@@ -0,0 +1,104 @@
+import threading
+from datetime import date
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NO_VALUE
+from app.config.settings import AGENDA_CACHE_SIZE, AGENDA_CACHE_TTL
+from app.models.consulta import Consulta
+from app.models.paciente import Paciente
+from app.models.profissional_saude import ProfissionalSaude
+from app.models.user import User, TipoUsuario
+from app.utils.cache import TTLCache
+
+
+class AgendaCache:
+    """Consultas de cada dia da agenda dos profissionais, em memória (LRU + TTL).
+
+    As escritas de consultas deste processo invalidam apenas os dias que tocaram, e
+    renomear um paciente ou profissional invalida a agenda inteira dos profissionais
+    afetados (as linhas guardam os nomes); o TTL limita o tempo em que escritas de
+    outros workers ficam invisíveis.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        # Cada dia removido por uma escrita fica marcado no TTLCache: uma leitura que
+        # consultou o banco antes da escrita não grava o dia depois dela
+        self._dias = TTLCache(maxsize=maxsize, ttl=ttl)
+        # Incrementada a cada renomeação que afeta o profissional; os dias guardados
+        # com uma versão anterior deixam de valer
+        self._versoes: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def versao(self, profissional_id: int) -> Tuple[int, int]:
+        """Versão a obter antes de consultar o banco e repassar a ``set``"""
+        return self._dias.geracao(), self._versoes.get(profissional_id, 0)
+
+    def get(self, profissional_id: int, dia: date) -> Optional[tuple]:
+        item = self._dias.get((profissional_id, dia))
+        if item is None or item[0] != self._versoes.get(profissional_id, 0):
+            return None
+        return item[1]
+
+    def set(self, profissional_id: int, dia: date, consultas: Sequence, versao: Tuple[int, int]) -> None:
+        """Guardar um dia lido do banco, a menos que o dia ou o profissional tenham sido invalidados depois de ``versao``"""
+        geracao, versao_profissional = versao
+        with self._lock:
+            if self._versoes.get(profissional_id, 0) == versao_profissional:
+                self._dias.set((profissional_id, dia), (versao_profissional, tuple(consultas)), geracao)
+
+    def invalidar(self, profissional_id: int, dias: Iterable[date]) -> None:
+        """Invalidar apenas os dias tocados por uma escrita de consulta"""
+        for dia in dias:
+            self._dias.delete((profissional_id, dia))
+
+    def invalidar_profissional(self, profissional_id: int) -> None:
+        """Invalidar todos os dias do profissional: os guardados com a versão anterior deixam de valer"""
+        with self._lock:
+            self._versoes[profissional_id] = self._versoes.get(profissional_id, 0) + 1
+
+
+agenda_cache = AgendaCache(AGENDA_CACHE_SIZE, AGENDA_CACHE_TTL)
+
+
+# Como no entity_cache, os profissionais afetados são anotados na sessão durante o
+# flush e invalidados só após o commit
+_PENDING = "agenda_cache_pending"
+
+
+@event.listens_for(User, "after_update")
+def _nome_alterado(mapper, connection, target):
+    session = object_session(target)
+    if session is None or not inspect(target).attrs.nome.history.has_changes():
+        return
+
+    if target.tipo_usuario == TipoUsuario.PROFISSIONAL_SAUDE:
+        loaded = inspect(target).attrs.profissional_saude.loaded_value
+        if loaded is NO_VALUE:
+            ids = connection.execute(
+                select(ProfissionalSaude.id).where(ProfissionalSaude.user_id == target.id)
+            ).scalars().all()
+        else:
+            ids = [loaded.id] if loaded is not None else []
+    elif target.tipo_usuario == TipoUsuario.PACIENTE:
+        # Profissionais com quem o paciente tem consultas (índice paciente_id, data_hora)
+        ids = connection.execute(
+            select(Consulta.profissional_id).distinct()
+            .join(Paciente, Paciente.id == Consulta.paciente_id)
+            .where(Paciente.user_id == target.id)
+        ).scalars().all()
+    else:
+        return
+
+    session.info.setdefault(_PENDING, set()).update(ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_confirmados(session):
+    for profissional_id in session.info.pop(_PENDING, ()):
+        agenda_cache.invalidar_profissional(profissional_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_pendentes(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,91 @@
+import hashlib
+import os
+import re
+import tempfile
+from typing import AsyncIterator, Optional, Tuple
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from app.config.settings import ANEXOS_DIR, ANEXO_MAX_BYTES
+
+_SHA256 = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BlobStore:
+    """Armazenamento de arquivos no sistema de arquivos endereçado pelo SHA-256 do conteúdo.
+
+    Cada conteúdo é gravado uma única vez em ``<raiz>/ab/cd/<hash>``; enviar o mesmo
+    arquivo de novo apenas reaproveita o existente. Os arquivos nunca são alterados
+    depois de gravados, então podem ser servidos diretamente do disco.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self._tmp = os.path.join(root, "tmp")
+
+    def path(self, sha256: str) -> str:
+        """Caminho do arquivo de um hash (validado, para não escapar da raiz)"""
+        if not _SHA256.match(sha256):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Anexo não encontrado"
+            )
+        return os.path.join(self.root, sha256[:2], sha256[2:4], sha256)
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.isfile(self.path(sha256))
+
+    async def save(
+        self,
+        chunks: AsyncIterator[bytes],
+        max_bytes: int = ANEXO_MAX_BYTES,
+        expected_sha256: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """Gravar um fluxo de bytes calculando o hash enquanto chega; devolve ``(sha256, tamanho)``.
+
+        O conteúdo vai para um arquivo temporário na mesma partição e só então é
+        movido atomicamente para o destino, então leitores nunca veem um arquivo parcial.
+        Com ``expected_sha256``, um conteúdo com outro hash (corrompido no envio) é descartado.
+        """
+        os.makedirs(self._tmp, exist_ok=True)
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_path = tempfile.mkstemp(dir=self._tmp)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                async for chunk in chunks:
+                    if not chunk:
+                        continue
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise HTTPException(
+                            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                            detail="Arquivo excede o tamanho máximo permitido"
+                        )
+                    digest.update(chunk)
+                    await run_in_threadpool(tmp.write, chunk)
+                await run_in_threadpool(os.fsync, tmp.fileno())
+
+            if size == 0:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Arquivo vazio"
+                )
+
+            sha256 = digest.hexdigest()
+            if expected_sha256 is not None and sha256 != expected_sha256:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Conteúdo não confere com o SHA-256 informado"
+                )
+            destino = self.path(sha256)
+            if os.path.exists(destino):
+                return sha256, size
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            os.replace(tmp_path, destino)
+            return sha256, size
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+blob_store = BlobStore(ANEXOS_DIR)
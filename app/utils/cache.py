@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Cache LRU em memória, limitado em tamanho e com expiração por TTL.
+
+    Seguro para uso concorrente entre o event loop e as threads do threadpool.
+
+    Para valores lidos de uma fonte que pode mudar durante a leitura, obtenha
+    ``geracao()`` antes de ler e repasse-a a ``set``: se a chave foi removida depois
+    disso, o valor lido pode ser anterior à remoção e não é guardado.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        # Contador de remoções e, por chave removida há menos de ``ttl``, o valor dele
+        # na remoção; uma leitura mais lenta que o TTL não é protegida
+        self._geracao = 0
+        self._remocoes: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._limpo_em = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Obter valor ainda válido, marcando-o como usado recentemente"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def geracao(self) -> int:
+        """Geração a obter antes de ler o valor da fonte e repassar a ``set``"""
+        return self._geracao
+
+    def set(self, key: Hashable, value: Any, geracao: Optional[int] = None) -> None:
+        """Armazenar valor, descartando os menos usados acima do limite.
+
+        Com ``geracao``, nada é guardado se a chave foi removida depois dela.
+        """
+        with self._lock:
+            if geracao is not None and self._removida_apos(key, geracao):
+                return
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        """Remover valor do cache, se existir"""
+        with self._lock:
+            self._data.pop(key, None)
+            self._geracao += 1
+            self._remocoes[key] = (self._geracao, time.monotonic() + self.ttl)
+            self._remocoes.move_to_end(key)
+            while len(self._remocoes) > self.maxsize:
+                # Sem a marca, uma leitura anterior a ela poderia gravar o valor antigo:
+                # leituras até essa geração passam a ser recusadas para qualquer chave
+                _, (geracao, _) = self._remocoes.popitem(last=False)
+                self._limpo_em = max(self._limpo_em, geracao)
+
+    def clear(self) -> None:
+        """Esvaziar o cache"""
+        with self._lock:
+            self._data.clear()
+            self._remocoes.clear()
+            self._geracao += 1
+            self._limpo_em = self._geracao
+
+    def _removida_apos(self, key: Hashable, geracao: int) -> bool:
+        if geracao < self._limpo_em:
+            return True
+        agora = time.monotonic()
+        # Todas as remoções têm o mesmo TTL: as expiradas estão no início
+        while self._remocoes:
+            _, (_, expira_em) = next(iter(self._remocoes.items()))
+            if expira_em > agora:
+                break
+            self._remocoes.popitem(last=False)
+        remocao = self._remocoes.get(key)
+        return remocao is not None and remocao[0] > geracao
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,73 @@
+import re
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import literal, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.exc import StaleDataError
+
+# Chave/coluna única violada -> mensagem já usada pela API
+_MENSAGENS_UNICIDADE = (
+    ("cpf", "CPF já cadastrado no sistema"),
+    ("crm", "CRM já cadastrado no sistema"),
+    ("email", "Email já cadastrado no sistema"),
+)
+
+# MariaDB: "Duplicate entry '...' for key 'ix_users_email'"; SQLite: "UNIQUE constraint failed: users.email"
+_CHAVE_VIOLADA = re.compile(r"for key '([^']+)'|constraint failed: ([\w.]+)")
+
+
+def integrity_error_detail(exc: IntegrityError) -> str:
+    """Traduzir violação de integridade para a mensagem de erro da API"""
+    message = str(exc.orig)
+    match = _CHAVE_VIOLADA.search(message)
+    chave = (match.group(1) or match.group(2)) if match else message
+    chave = chave.lower()
+    for trecho, detalhe in _MENSAGENS_UNICIDADE:
+        if trecho in chave:
+            return detalhe
+    return "Dados violam uma restrição de integridade"
+
+
+def commit_or_400(db: Session, precedente: Optional[Tuple[object, str]] = None) -> None:
+    """Confirmar a unidade de trabalho, convertendo violações de integridade em 400.
+
+    ``precedente`` é um par ``(condição, mensagem)`` verificado só quando o commit
+    falha: se a condição existir no banco, a mensagem dela é a devolvida. O usuário
+    é inserido antes do perfil, então sem isso o email duplicado encobriria o CPF
+    (ou CRM) duplicado, que sempre teve precedência na resposta.
+    """
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        detalhe = integrity_error_detail(exc)
+        if precedente is not None:
+            condicao, mensagem = precedente
+            if db.execute(select(literal(1)).where(condicao).limit(1)).first():
+                detalhe = mensagem
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detalhe
+        )
+
+
+def registro_alterado(precondicao: bool = False) -> HTTPException:
+    """Erro de escrita concorrente: 412 quando a versão esperada veio do If-Match, senão 409"""
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED if precondicao else status.HTTP_409_CONFLICT,
+        detail="Registro alterado por outra requisição; obtenha a versão atual e tente novamente"
+    )
+
+
+def commit_versionado(db: Session, precondicao: bool = False) -> None:
+    """Confirmar uma atualização de entidade versionada (``version_id_col``).
+
+    O UPDATE só grava se a versão no banco ainda for a lida; se outra requisição
+    gravou antes, a transação é desfeita e a escrita concorrente vira 409/412.
+    """
+    try:
+        db.commit()
+    except StaleDataError:
+        db.rollback()
+        raise registro_alterado(precondicao)
@@ -2,32 +2,45 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from app.config.database import get_database
-from app.models.user import User, TipoUsuario
+from app.models.user import TipoUsuario
+from app.services.async_services import AsyncUserService
+from app.utils.principal import Principal, principal_cache
 from app.utils.security import verify_token
 
 security = HTTPBearer()
 
-def get_current_user(token: str = Depends(security), db: Session = Depends(get_database)) -> User:
+async def get_current_user(token: str = Depends(security), db: Session = Depends(get_database)) -> Principal:
     """Obter usuário atual baseado no token"""
     payload = verify_token(token.credentials)
     user_id: int = payload.get("sub")
     
-    if user_id is None:
+    if user_id is None or not str(user_id).isdigit():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido"
         )
+    user_id = int(user_id)
     
-    user = db.query(User).filter(User.id == user_id, User.ativo == True).first()
+    # Caminho quente: usuário já autenticado recentemente, sem acesso ao banco
+    principal = principal_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
+    # Obtida antes da leitura: se o usuário for alterado enquanto ela ocorre, o
+    # principal lido pode ser anterior à alteração e não entra no cache
+    geracao = principal_cache.geracao()
+    user = await AsyncUserService(db).get_active_user(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuário não encontrado"
         )
     
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.set(user_id, principal, geracao)
+    return principal
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Requer que o usuário seja admin"""
     if current_user.tipo_usuario != TipoUsuario.ADMIN:
         raise HTTPException(
@@ -36,7 +49,7 @@ def require_admin(current_user: User = Depends(get_current_user)) -> User:
         )
     return current_user
 
-def require_profissional_or_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_profissional_or_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """Requer que o usuário seja profissional de saúde ou admin"""
     if current_user.tipo_usuario not in [TipoUsuario.PROFISSIONAL_SAUDE, TipoUsuario.ADMIN]:
         raise HTTPException(
@@ -44,3 +57,12 @@ def require_profissional_or_admin(current_user: User = Depends(get_current_user)
             detail="Acesso negado. Apenas profissionais de saúde ou administradores podem acessar este recurso."
         )
     return current_user
+
+def require_profissional(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """Requer que o usuário seja profissional de saúde"""
+    if current_user.tipo_usuario != TipoUsuario.PROFISSIONAL_SAUDE or current_user.profissional_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso negado. Apenas profissionais de saúde podem acessar este recurso."
+        )
+    return current_user
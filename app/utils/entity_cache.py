@@ -0,0 +1,282 @@
+import enum
+import json
+import threading
+from datetime import date, datetime
+from typing import Dict, Optional
+from sqlalchemy import Date, DateTime, Enum, event, inspect, select
+from sqlalchemy.orm import Session, object_session
+from sqlalchemy.orm.base import NO_VALUE
+from app.config.settings import ENTITY_CACHE_BACKEND, ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL, REDIS_URL
+from app.models.user import User, TipoUsuario
+from app.models.paciente import Paciente
+from app.models.profissional_saude import ProfissionalSaude
+from app.models.admin import Admin
+from app.utils.cache import TTLCache
+
+# Perfil de cada tipo de usuário e o relacionamento que leva a ele a partir de User
+PERFIS = {
+    TipoUsuario.PACIENTE: (Paciente, "paciente"),
+    TipoUsuario.PROFISSIONAL_SAUDE: (ProfissionalSaude, "profissional_saude"),
+    TipoUsuario.ADMIN: (Admin, "admin"),
+}
+
+
+class MemoryCacheBackend:
+    """Backend em memória do processo (LRU + TTL)"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: str) -> Optional[dict]:
+        return self._cache.get(key)
+
+    def geracao(self) -> int:
+        return self._cache.geracao()
+
+    def set(self, key: str, value: dict, geracao: Optional[int] = None) -> None:
+        self._cache.set(key, value, geracao)
+
+    def delete(self, key: str) -> None:
+        self._cache.delete(key)
+
+    @property
+    def evictions(self) -> int:
+        return self._cache.evictions
+
+
+class RedisCacheBackend:
+    """Backend compartilhado entre workers, em qualquer servidor do protocolo Redis.
+
+    Falhas de conexão são tratadas como miss: o cache nunca derruba a leitura. Como
+    no TTLCache, cada remoção deixa uma marca com a geração dela por ``ttl``
+    segundos, e ``set`` com uma geração anterior à marca não grava (scripts Lua,
+    atômicos no servidor).
+    """
+
+    # KEYS: chave, marca de remoção; ARGV: valor, geração lida, ttl
+    _SET_SCRIPT = """
+local removida = redis.call('GET', KEYS[2])
+if ARGV[2] ~= '' and removida and tonumber(removida) > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+    # KEYS: chave, marca de remoção, contador de gerações; ARGV: ttl
+    _DELETE_SCRIPT = """
+local geracao = redis.call('INCR', KEYS[3])
+redis.call('DEL', KEYS[1])
+redis.call('SET', KEYS[2], geracao, 'EX', ARGV[1])
+return geracao
+"""
+
+    def __init__(self, url: str, ttl: int, prefix: str = "sghss:"):
+        # Dependência opcional, exigida apenas com ENTITY_CACHE_BACKEND=redis
+        import redis
+
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._errors = (redis.RedisError, OSError)
+        self.ttl = ttl
+        self.prefix = prefix
+        self._set = self._client.register_script(self._SET_SCRIPT)
+        self._delete = self._client.register_script(self._DELETE_SCRIPT)
+
+    def get(self, key: str) -> Optional[dict]:
+        try:
+            raw = self._client.get(self.prefix + key)
+        except self._errors:
+            return None
+        return json.loads(raw) if raw is not None else None
+
+    def geracao(self) -> int:
+        # Sem o contador, 0 é a escolha segura: qualquer marca de remoção bloqueia o set
+        try:
+            return int(self._client.get(self.prefix + "geracao") or 0)
+        except self._errors:
+            return 0
+
+    def set(self, key: str, value: dict, geracao: Optional[int] = None) -> None:
+        try:
+            self._set(
+                keys=[self.prefix + key, self.prefix + "removida:" + key],
+                args=[json.dumps(value, separators=(",", ":")), "" if geracao is None else geracao, self.ttl],
+            )
+        except self._errors:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            self._delete(
+                keys=[self.prefix + key, self.prefix + "removida:" + key, self.prefix + "geracao"],
+                args=[self.ttl],
+            )
+        except self._errors:
+            pass
+
+    @property
+    def evictions(self) -> int:
+        """Chaves descartadas pelo servidor por falta de memória (INFO stats)"""
+        try:
+            return int(self._client.info("stats").get("evicted_keys", 0))
+        except self._errors:
+            return 0
+
+
+def _dump_columns(obj, exclude=()) -> dict:
+    """Colunas carregadas da entidade em tipos compatíveis com JSON"""
+    data = {}
+    for attr in inspect(type(obj)).column_attrs:
+        if attr.key in exclude:
+            continue
+        value = getattr(obj, attr.key)
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        elif isinstance(value, enum.Enum):
+            value = value.value
+        data[attr.key] = value
+    return data
+
+
+def _load_columns(model, data: dict) -> dict:
+    """Converter de volta os valores gravados por ``_dump_columns``"""
+    columns = inspect(model).columns
+    values = {}
+    for key, value in data.items():
+        column_type = columns[key].type
+        if value is not None:
+            if isinstance(column_type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif isinstance(column_type, Date):
+                value = date.fromisoformat(value)
+            elif isinstance(column_type, Enum) and column_type.enum_class is not None:
+                value = column_type.enum_class(value)
+        values[key] = value
+    return values
+
+
+class EntityCache:
+    """Cache de perfis com o usuário vinculado, usado pelas leituras por ID.
+
+    Guarda um retrato das colunas (sem o hash de senha) e devolve entidades novas,
+    fora de qualquer sessão, a cada acerto; elas servem apenas para leitura.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(model, entity_id: int) -> str:
+        return f"{model.__tablename__}:{int(entity_id)}"
+
+    def get(self, model, entity_id: int):
+        """Obter a entidade em cache com ``user`` preenchido, ou None"""
+        if self.backend is None:
+            return None
+        data = self.backend.get(self._key(model, entity_id))
+        with self._lock:
+            if data is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        if data is None:
+            return None
+
+        entity = model(**_load_columns(model, data["entity"]))
+        entity.user = User(**_load_columns(User, data["user"]))
+        return entity
+
+    def geracao(self) -> Optional[int]:
+        """Geração a obter antes de ler a entidade do banco e repassar a ``set``"""
+        return self.backend.geracao() if self.backend is not None else None
+
+    def set(self, entity, geracao: Optional[int] = None) -> None:
+        """Armazenar a entidade, que precisa estar com ``user`` carregado.
+
+        Com ``geracao``, nada é guardado se a entidade foi invalidada depois dela:
+        a leitura pode ter visto a linha anterior à escrita que a invalidou.
+        """
+        if self.backend is not None:
+            self.backend.set(self._key(type(entity), entity.id), {
+                "entity": _dump_columns(entity),
+                "user": _dump_columns(entity.user, exclude=("senha_hash",)),
+            }, geracao)
+
+    def invalidate(self, model, entity_id: int) -> None:
+        """Descartar a entidade do cache"""
+        if self.backend is not None:
+            self.backend.delete(self._key(model, entity_id))
+            with self._lock:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de acertos, faltas, descartes por capacidade e invalidações"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions if self.backend is not None else 0,
+            "invalidations": self.invalidations,
+        }
+
+
+def _create_backend():
+    if ENTITY_CACHE_BACKEND == "redis":
+        return RedisCacheBackend(REDIS_URL, ENTITY_CACHE_TTL)
+    if ENTITY_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(ENTITY_CACHE_SIZE, ENTITY_CACHE_TTL)
+    return None
+
+
+entity_cache = EntityCache(_create_backend())
+
+
+# As alterações são anotadas na sessão durante o flush e invalidadas só após o
+# commit; invalidar no flush deixaria uma leitura concorrente regravar o valor antigo
+_PENDING = "entity_cache_pending"
+
+
+def _mark_changed(session: Optional[Session], model, entity_id: int) -> None:
+    if session is not None and entity_id is not None:
+        session.info.setdefault(_PENDING, set()).add((model, entity_id))
+
+
+@event.listens_for(Paciente, "after_update")
+@event.listens_for(Paciente, "after_delete")
+@event.listens_for(ProfissionalSaude, "after_update")
+@event.listens_for(ProfissionalSaude, "after_delete")
+@event.listens_for(Admin, "after_update")
+@event.listens_for(Admin, "after_delete")
+def _profile_changed(mapper, connection, target):
+    _mark_changed(object_session(target), mapper.class_, target.id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _user_changed(mapper, connection, target):
+    perfil = PERFIS.get(target.tipo_usuario)
+    if perfil is None:
+        return
+    model, relationship = perfil
+
+    loaded = inspect(target).attrs[relationship].loaded_value
+    if loaded is NO_VALUE:
+        ids = connection.execute(select(model.id).where(model.user_id == target.id)).scalars().all()
+    else:
+        ids = [loaded.id] if loaded is not None else []
+
+    for entity_id in ids:
+        _mark_changed(object_session(target), model, entity_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for model, entity_id in session.info.pop(_PENDING, ()):
+        entity_cache.invalidate(model, entity_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
@@ -0,0 +1,56 @@
+import hashlib
+import json
+from typing import Optional
+from fastapi import Request, Response, status
+from app.utils.db_errors import registro_alterado
+
+
+def make_etag(*parts) -> str:
+    """Gerar ETag forte a partir dos valores que identificam a versão de um recurso"""
+    raw = json.dumps(parts, default=str, separators=(",", ":")).encode()
+    return '"' + hashlib.sha1(raw).hexdigest()[:20] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Verificar If-None-Match (comparação fraca, como manda a RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def wants_revalidation(request: Request) -> bool:
+    """A requisição traz If-None-Match, então vale a pena consultar só a versão"""
+    return bool(request.headers.get("if-none-match"))
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """Resposta 304 quando o cliente já tem a versão atual, senão None"""
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def wants_precondition(request: Request) -> bool:
+    """A requisição traz If-Match: a escrita só vale sobre a versão indicada"""
+    return bool(request.headers.get("if-match"))
+
+
+def check_if_match(request: Request, etag: str) -> None:
+    """Falhar com 412 se o If-Match não traz a versão atual (comparação forte, RFC 9110)"""
+    if not wants_precondition(request):
+        return
+    candidates = [tag.strip() for tag in request.headers["if-match"].split(",")]
+    if "*" not in candidates and etag not in candidates:
+        raise registro_alterado(precondicao=True)
+
+
+def set_etag_after_write(response: Response, current: tuple, written_version: int) -> None:
+    """Enviar o ETag de um recurso recém-gravado, calculado com a versão lida do banco.
+
+    Os valores em memória não servem: o banco pode arredondar ``updated_at`` (DATETIME
+    sem frações no MariaDB) e o ETag não bateria com o do GET. Se outra escrita já
+    mudou a versão, o corpo da resposta está desatualizado e o ETag é omitido.
+    """
+    if current[-1] == written_version:
+        response.headers["ETag"] = make_etag(*current)
@@ -0,0 +1,77 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Iterator, Sequence, Union
+from sqlalchemy import Select
+from app.config.database import DATABASE_ASYNC, ReadSessionLocal, AsyncReadSessionLocal
+from app.config.settings import EXPORT_BATCH_SIZE
+
+# Formato de exportação para o media type da resposta
+FORMATOS_EXPORTACAO = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _valor(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    if isinstance(valor, Enum):
+        return valor.value
+    return valor
+
+
+# O encoder em C só chama ``_valor`` para datas e enums
+_json_encode = json.JSONEncoder(ensure_ascii=False, default=_valor).encode
+
+
+def formatar_lote(campos: Sequence[str], linhas: Sequence, formato: str) -> str:
+    """Serializar um lote de linhas em CSV (sem cabeçalho) ou NDJSON"""
+    if formato == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows([_valor(v) for v in linha] for linha in linhas)
+        return buffer.getvalue()
+    return "".join(_json_encode(dict(zip(campos, linha))) + "\n" for linha in linhas)
+
+
+def _cabecalho(campos: Sequence[str]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(campos)
+    return buffer.getvalue()
+
+
+def _exportar_sync(stmt: Select, formato: str, batch_size: int) -> Iterator[str]:
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=batch_size))
+        campos = list(result.keys())
+        if formato == "csv":
+            yield _cabecalho(campos)
+        for lote in result.partitions():
+            yield formatar_lote(campos, lote, formato)
+    finally:
+        db.close()
+
+
+async def _exportar_async(stmt: Select, formato: str, batch_size: int) -> AsyncIterator[str]:
+    async with AsyncReadSessionLocal() as db:
+        result = await db.stream(stmt.execution_options(yield_per=batch_size))
+        campos = list(result.keys())
+        if formato == "csv":
+            yield _cabecalho(campos)
+        async for lote in result.partitions():
+            yield formatar_lote(campos, lote, formato)
+
+
+def exportar(stmt: Select, formato: str, batch_size: int = EXPORT_BATCH_SIZE) -> Union[Iterator[str], AsyncIterator[str]]:
+    """Gerar o conteúdo da exportação em blocos, lendo o resultado por cursor no servidor.
+
+    A exportação abre a própria sessão (na réplica, se configurada) porque a sessão
+    da requisição é fechada antes de o corpo de uma ``StreamingResponse`` ser enviado.
+    No modo síncrono o ``StreamingResponse`` consome o gerador no threadpool, um lote por vez.
+    """
+    if DATABASE_ASYNC:
+        return _exportar_async(stmt, formato, batch_size)
+    return _exportar_sync(stmt, formato, batch_size)
@@ -0,0 +1,52 @@
+import json
+import unicodedata
+from typing import Dict, List, Tuple
+
+# Dia da semana (datetime.weekday()) para cada chave aceita em horario_atendimento
+DIAS_SEMANA = {
+    "segunda": 0, "terca": 1, "quarta": 2, "quinta": 3,
+    "sexta": 4, "sabado": 5, "domingo": 6,
+}
+
+HorarioSemanal = Dict[int, List[Tuple[int, int]]]
+
+
+def _normalizar(texto: str) -> str:
+    """Minúsculas e sem acentos"""
+    texto = unicodedata.normalize("NFKD", texto.strip().lower())
+    return "".join(c for c in texto if not unicodedata.combining(c))
+
+
+def _minutos(hora: str) -> int:
+    horas, minutos = hora.strip().split(":")
+    return int(horas) * 60 + int(minutos)
+
+
+def parse_horario_atendimento(texto: str) -> HorarioSemanal:
+    """Converter o JSON de horario_atendimento em faixas de minutos por dia da semana.
+
+    Formato: ``{"segunda": "08:00-12:00, 14:00-18:00", "terca": ["08:00-12:00"], ...}``.
+    Dias ou faixas inválidos são ignorados; texto ilegível resulta em agenda vazia.
+    """
+    try:
+        dados = json.loads(texto) if texto else {}
+    except ValueError:
+        return {}
+    if not isinstance(dados, dict):
+        return {}
+
+    semana: HorarioSemanal = {}
+    for dia, faixas in dados.items():
+        weekday = DIAS_SEMANA.get(_normalizar(str(dia)).split("-")[0])
+        if weekday is None:
+            continue
+        if isinstance(faixas, str):
+            faixas = faixas.split(",")
+        for faixa in faixas if isinstance(faixas, list) else []:
+            try:
+                inicio, fim = (_minutos(h) for h in str(faixa).split("-"))
+            except ValueError:
+                continue
+            if 0 <= inicio < fim <= 24 * 60:
+                semana.setdefault(weekday, []).append((inicio, fim))
+    return semana
@@ -0,0 +1,55 @@
+import codecs
+import csv
+import json
+from typing import AsyncIterator, Optional, Tuple
+
+FORMATOS_IMPORTACAO = ("csv", "ndjson")
+
+
+async def aiter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Quebrar um fluxo de bytes UTF-8 em linhas, sem carregar o corpo inteiro"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer.rstrip("\r")
+
+
+async def aiter_records(lines: AsyncIterator[str], formato: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Produzir ``(linha, registro, erro)`` para cada linha de um CSV ou NDJSON.
+
+    No CSV a primeira linha é o cabeçalho e cada registro ocupa uma linha.
+    Campos vazios são omitidos para que os valores padrão do schema se apliquem.
+    """
+    header = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+
+        if formato == "ndjson":
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_no, None, "JSON inválido"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Cada linha deve conter um objeto JSON"
+                continue
+            yield line_no, record, None
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [value.strip() for value in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, None, "Quantidade de colunas diferente do cabeçalho"
+            continue
+        yield line_no, {key: value for key, value in zip(header, values) if value != ""}, None
@@ -0,0 +1,130 @@
+import bisect
+import math
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Parâmetros usuais do BM25
+K1 = 1.2
+B = 0.75
+
+Documento = Tuple[int, Sequence[str], dict]
+
+
+class IndiceInvertido:
+    """Índice invertido em memória com ranqueamento BM25 e termos por prefixo.
+
+    Cada documento tem um ID, sua lista de termos já normalizados e atributos
+    usados como filtro (por exemplo ``paciente_id``). As escritas feitas
+    durante a carga inicial são guardadas e reaplicadas ao final dela, então a
+    carga nunca sobrescreve uma alteração mais nova.
+    """
+
+    def __init__(self):
+        self._documentos: Dict[int, Tuple[Counter, int, dict]] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._vocabulario: List[str] = []
+        self._total_termos = 0
+        self._pendentes: Optional[list] = None
+        self._lock = threading.Lock()
+        self._carga_lock = threading.Lock()
+        self.carregado = False
+
+    def __len__(self) -> int:
+        return len(self._documentos)
+
+    def garantir_carga(self, fonte: Callable[[], Iterable[Documento]]) -> None:
+        """Carregar o índice a partir de ``fonte`` se ainda não foi carregado (uma única vez)"""
+        if self.carregado:
+            return
+        with self._carga_lock:
+            if self.carregado:
+                return
+            with self._lock:
+                self._pendentes = []
+            for doc_id, termos, atributos in fonte():
+                with self._lock:
+                    self._indexar(doc_id, termos, atributos)
+            with self._lock:
+                for operacao in self._pendentes:
+                    operacao()
+                self._pendentes = None
+                self.carregado = True
+
+    def atualizar(self, doc_id: int, termos: Sequence[str], atributos: dict) -> None:
+        """Indexar (ou reindexar) um documento"""
+        with self._lock:
+            if self.carregado:
+                self._indexar(doc_id, termos, atributos)
+            elif self._pendentes is not None:
+                self._pendentes.append(lambda: self._indexar(doc_id, termos, atributos))
+
+    def remover(self, doc_id: int) -> None:
+        with self._lock:
+            if self.carregado:
+                self._remover(doc_id)
+            elif self._pendentes is not None:
+                self._pendentes.append(lambda: self._remover(doc_id))
+
+    def buscar(self, termos: Sequence[str], filtros: Optional[dict] = None) -> List[Tuple[int, float]]:
+        """Documentos com todos os termos (cada um como prefixo), do mais ao menos relevante"""
+        with self._lock:
+            total_documentos = len(self._documentos)
+            if not termos or not total_documentos:
+                return []
+            media = self._total_termos / total_documentos
+
+            # Pontuação por termo da busca, começando pelo mais seletivo
+            por_termo = sorted((self._pontuar(termo, total_documentos, media) for termo in set(termos)), key=len)
+            candidatos = por_termo[0]
+            for pontuacoes in por_termo[1:]:
+                candidatos = {doc_id: valor + pontuacoes[doc_id] for doc_id, valor in candidatos.items() if doc_id in pontuacoes}
+                if not candidatos:
+                    return []
+
+            if filtros:
+                candidatos = {
+                    doc_id: valor for doc_id, valor in candidatos.items()
+                    if all(self._documentos[doc_id][2].get(chave) == esperado for chave, esperado in filtros.items())
+                }
+
+        return sorted(candidatos.items(), key=lambda item: (-item[1], item[0]))
+
+    def _pontuar(self, prefixo: str, total_documentos: int, media: float) -> Dict[int, float]:
+        """BM25 somado sobre os termos do vocabulário que começam com ``prefixo``"""
+        pontuacoes: Dict[int, float] = {}
+        posicao = bisect.bisect_left(self._vocabulario, prefixo)
+        while posicao < len(self._vocabulario) and self._vocabulario[posicao].startswith(prefixo):
+            postings = self._postings[self._vocabulario[posicao]]
+            idf = math.log(1 + (total_documentos - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequencia in postings.items():
+                tamanho = self._documentos[doc_id][1]
+                peso = frequencia * (K1 + 1) / (frequencia + K1 * (1 - B + B * tamanho / media))
+                pontuacoes[doc_id] = pontuacoes.get(doc_id, 0.0) + idf * peso
+            posicao += 1
+        return pontuacoes
+
+    def _indexar(self, doc_id: int, termos: Sequence[str], atributos: dict) -> None:
+        self._remover(doc_id)
+        frequencias = Counter(termos)
+        self._documentos[doc_id] = (frequencias, len(termos), dict(atributos))
+        self._total_termos += len(termos)
+        for termo, frequencia in frequencias.items():
+            postings = self._postings.get(termo)
+            if postings is None:
+                postings = self._postings[termo] = {}
+                bisect.insort(self._vocabulario, termo)
+            postings[doc_id] = frequencia
+
+    def _remover(self, doc_id: int) -> None:
+        documento = self._documentos.pop(doc_id, None)
+        if documento is None:
+            return
+        frequencias, tamanho, _ = documento
+        self._total_termos -= tamanho
+        for termo in frequencias:
+            postings = self._postings[termo]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[termo]
+                del self._vocabulario[bisect.bisect_left(self._vocabulario, termo)]
@@ -0,0 +1,25 @@
+from typing import List
+from fastapi import HTTPException, Query, status
+from app.config.settings import BATCH_MAX_IDS
+
+
+def ids_do_lote(
+    ids: str = Query(..., description="IDs separados por vírgula, por exemplo 1,2,3")
+) -> List[int]:
+    """Dependência das leituras em lote: IDs distintos, na ordem em que foram pedidos"""
+    try:
+        valores = [int(valor) for valor in ids.split(",") if valor.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Lista de IDs inválida"
+        )
+    
+    valores = list(dict.fromkeys(valores))
+    if not valores or len(valores) > BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Informe de 1 a {BATCH_MAX_IDS} IDs"
+        )
+    
+    return valores
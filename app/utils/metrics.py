@@ -0,0 +1,275 @@
+import bisect
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (em segundos) dos histogramas
+LATENCIA_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LATENCIA_SQL = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+ESPERA_BCRYPT = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Labels = Tuple[str, ...]
+
+
+class _Shards:
+    """Um dicionário de valores por thread.
+
+    Cada thread só escreve no próprio dicionário, então as atualizações não
+    disputam lock nenhum; a coleta soma os dicionários de todas as threads.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._todos: List[dict] = []
+        self._lock = threading.Lock()
+
+    def local(self) -> dict:
+        try:
+            return self._local.valores
+        except AttributeError:
+            valores = self._local.valores = {}
+            with self._lock:
+                self._todos.append(valores)
+            return valores
+
+    def copias(self) -> List[dict]:
+        with self._lock:
+            todos = list(self._todos)
+        return [valores.copy() for valores in todos]
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _formatar_labels(nomes: Sequence[str], valores: Labels, extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+class Metric:
+    tipo = "untyped"
+
+    def __init__(self, nome: str, descricao: str, labels: Sequence[str] = ()):
+        self.nome = nome
+        self.descricao = descricao
+        self.labels = tuple(labels)
+
+    def amostras(self) -> Iterable[Tuple[str, str, float]]:
+        """``(sufixo, labels formatados, valor)`` de cada série"""
+        raise NotImplementedError
+
+    def render(self) -> str:
+        linhas = [f"# HELP {self.nome} {self.descricao}", f"# TYPE {self.nome} {self.tipo}"]
+        linhas.extend(
+            f"{self.nome}{sufixo}{labels} {_formatar_numero(valor)}"
+            for sufixo, labels, valor in self.amostras()
+        )
+        return "\n".join(linhas)
+
+
+class Counter(Metric):
+    tipo = "counter"
+
+    def __init__(self, nome: str, descricao: str, labels: Sequence[str] = ()):
+        super().__init__(nome, descricao, labels)
+        self._shards = _Shards()
+
+    def inc(self, labels: Labels = (), valor: float = 1) -> None:
+        valores = self._shards.local()
+        valores[labels] = valores.get(labels, 0) + valor
+
+    def _somar(self) -> Dict[Labels, float]:
+        total: Dict[Labels, float] = {}
+        for valores in self._shards.copias():
+            for labels, valor in valores.items():
+                total[labels] = total.get(labels, 0) + valor
+        return total
+
+    def amostras(self):
+        for labels, valor in sorted(self._somar().items()):
+            yield "", _formatar_labels(self.labels, labels), valor
+
+
+class Gauge(Counter):
+    """Valor que sobe e desce (``inc``/``dec``), somado entre as threads"""
+    tipo = "gauge"
+
+    def dec(self, labels: Labels = (), valor: float = 1) -> None:
+        self.inc(labels, -valor)
+
+
+class Histogram(Metric):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, descricao: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCIA_HTTP):
+        super().__init__(nome, descricao, labels)
+        self.buckets = tuple(buckets)
+        self._shards = _Shards()
+
+    def observe(self, valor: float, labels: Labels = ()) -> None:
+        valores = self._shards.local()
+        contagens = valores.get(labels)
+        if contagens is None:
+            # Uma posição por bucket, uma para +Inf e a soma no final
+            contagens = valores[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        contagens[bisect.bisect_left(self.buckets, valor)] += 1
+        contagens[-1] += valor
+
+    def amostras(self):
+        total: Dict[Labels, list] = {}
+        for valores in self._shards.copias():
+            for labels, contagens in valores.items():
+                acumulado = total.setdefault(labels, [0] * len(contagens))
+                for indice, valor in enumerate(list(contagens)):
+                    acumulado[indice] += valor
+
+        for labels, contagens in sorted(total.items()):
+            acumulado = 0
+            for limite, contagem in zip(self.buckets + (float("inf"),), contagens):
+                acumulado += contagem
+                yield "_bucket", _formatar_labels(self.labels, labels, f'le="{_formatar_numero(limite)}"'), acumulado
+            yield "_sum", _formatar_labels(self.labels, labels), contagens[-1]
+            yield "_count", _formatar_labels(self.labels, labels), acumulado
+
+
+class CallbackMetric(Metric):
+    """Métrica lida na coleta a partir de uma função que devolve ``{labels: valor}``"""
+
+    def __init__(self, nome: str, descricao: str, tipo: str, labels: Sequence[str], funcao: Callable[[], Dict[Labels, float]]):
+        super().__init__(nome, descricao, labels)
+        self.tipo = tipo
+        self.funcao = funcao
+
+    def amostras(self):
+        for labels, valor in sorted(self.funcao().items()):
+            yield "", _formatar_labels(self.labels, labels), valor
+
+
+class Registry:
+    def __init__(self):
+        self._metricas: List[Metric] = []
+
+    def register(self, metrica: Metric) -> Metric:
+        self._metricas.append(metrica)
+        return metrica
+
+    def render(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus"""
+        return "\n".join(metrica.render() for metrica in self._metricas) + "\n"
+
+
+registry = Registry()
+
+http_requests_total = registry.register(Counter(
+    "http_requests_total", "Requisições HTTP atendidas.", ("method", "route", "status")
+))
+http_request_duration_seconds = registry.register(Histogram(
+    "http_request_duration_seconds", "Duração das requisições HTTP até o fim da resposta.", ("method", "route")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requisições HTTP em andamento.", ("method",)
+))
+db_query_duration_seconds = registry.register(Histogram(
+    "db_query_duration_seconds", "Duração das instruções SQL por tipo.", ("kind",), LATENCIA_SQL
+))
+bcrypt_queue_seconds = registry.register(Histogram(
+    "bcrypt_queue_seconds", "Espera por uma thread livre do pool de bcrypt.", (), ESPERA_BCRYPT
+))
+
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede contagem, duração e concorrência das requisições HTTP.
+
+    A rota é identificada pelo template (``/api/pacientes/{paciente_id}``), não
+    pelo caminho, para manter a cardinalidade das séries limitada.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc((method,))
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duracao = time.perf_counter() - inicio
+            http_requests_in_flight.dec((method,))
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            http_requests_total.inc((method, template, str(status_code)))
+            http_request_duration_seconds.observe(duracao, (method, template))
+
+
+_TIPOS_SQL = {"select", "insert", "update", "delete"}
+
+
+def _inicio_query(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_inicio = time.perf_counter()
+
+
+def _fim_query(conn, cursor, statement, parameters, context, executemany):
+    inicio = getattr(context, "_metrics_inicio", None)
+    if inicio is None:
+        return
+    palavra = statement.lstrip()[:6].lower()
+    kind = palavra if palavra in _TIPOS_SQL else "other"
+    db_query_duration_seconds.observe(time.perf_counter() - inicio, (kind,))
+
+
+def install_query_metrics(engine: Engine) -> None:
+    """Medir a duração das instruções SQL de um engine síncrono"""
+    if not event.contains(engine, "before_cursor_execute", _inicio_query):
+        event.listen(engine, "before_cursor_execute", _inicio_query)
+        event.listen(engine, "after_cursor_execute", _fim_query)
+
+
+def register_pool_metrics(engines: Dict[str, Engine]) -> None:
+    """Expor conexões em uso, overflow e tamanho do pool de cada engine"""
+    def coletar(metodo: str):
+        def valores():
+            resultado = {}
+            for nome, engine in engines.items():
+                funcao = getattr(engine.pool, metodo, None)
+                if funcao is not None:
+                    resultado[(nome,)] = funcao()
+            return resultado
+        return valores
+
+    registry.register(CallbackMetric(
+        "db_pool_checked_out", "Conexões do pool em uso.", "gauge", ("engine",), coletar("checkedout")
+    ))
+    registry.register(CallbackMetric(
+        "db_pool_overflow", "Conexões abertas além do tamanho do pool (negativo: vagas ainda não abertas).",
+        "gauge", ("engine",), coletar("overflow")
+    ))
+    registry.register(CallbackMetric(
+        "db_pool_size", "Tamanho configurado do pool.", "gauge", ("engine",), coletar("size")
+    ))
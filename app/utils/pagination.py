@@ -0,0 +1,76 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Callable, Optional, Sequence, Tuple
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """Gerar cursor opaco a partir dos valores da chave de ordenação"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types) -> tuple:
+    """Decodificar cursor opaco, validando a quantidade e o tipo dos valores"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor com formato inesperado")
+        return tuple(
+            datetime.fromisoformat(value) if type_ is datetime else type_(value)
+            for value, type_ in zip(values, types)
+        )
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginação inválido"
+        )
+
+
+def _after(columns: Sequence, values: Sequence):
+    """Condição (a, b) > (x, y) expandida em a > x OR (a = x AND b > y)"""
+    condition = columns[-1] > values[-1]
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        condition = or_(column > value, and_(column == value, condition))
+    return condition
+
+
+def paginate(query: Query, order_by: Sequence, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> list:
+    """Paginar consulta por cursor (keyset) ou, sem cursor, por offset.
+
+    Com cursor o banco parte direto da última chave vista usando o índice,
+    então a página N custa o mesmo que a primeira.
+    """
+    query = query.order_by(*order_by)
+    if cursor is None:
+        return query.offset(skip).limit(limit).all()
+
+    values = decode_cursor(cursor, *(column.type.python_type for column in order_by))
+    return query.filter(_after(order_by, values)).limit(limit).all()
+
+
+def limit_page_bytes(items: list, max_bytes: int) -> Tuple[list, bool]:
+    """Cortar a página de modelos pydantic quando o JSON passar de ``max_bytes``.
+
+    O primeiro item é sempre mantido. Devolve os itens e se a página foi cortada.
+    """
+    total = 2
+    for index, item in enumerate(items):
+        total += len(item.model_dump_json()) + 1
+        if total > max_bytes and index > 0:
+            return items[:index], True
+    return items, False
+
+
+def set_next_cursor(response: Response, items: list, limit: int, key: Callable, truncated: bool = False) -> None:
+    """Informar o cursor da próxima página no header quando a página veio cheia ou cortada"""
+    if items and (truncated or len(items) >= limit):
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(items[-1]))
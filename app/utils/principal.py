@@ -0,0 +1,83 @@
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.config.settings import PRINCIPAL_CACHE_SIZE, PRINCIPAL_CACHE_TTL
+from app.models.user import User, TipoUsuario
+from app.models.paciente import Paciente
+from app.models.profissional_saude import ProfissionalSaude
+from app.models.admin import Admin
+from app.utils.cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Dados do usuário autenticado necessários para autorização nas rotas"""
+    id: int
+    tipo_usuario: TipoUsuario
+    ativo: bool
+    paciente_id: Optional[int] = None
+    profissional_id: Optional[int] = None
+    admin_id: Optional[int] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            tipo_usuario=user.tipo_usuario,
+            ativo=user.ativo,
+            paciente_id=user.paciente.id if user.paciente else None,
+            profissional_id=user.profissional_saude.id if user.profissional_saude else None,
+            admin_id=user.admin.id if user.admin else None
+        )
+
+
+# Cache por processo; o TTL limita o tempo em que outros workers veem dados antigos
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL)
+
+
+def invalidate_principal(user_id: Optional[int]) -> None:
+    """Descartar o principal em cache de um usuário"""
+    if user_id is not None:
+        principal_cache.delete(int(user_id))
+
+
+# Os usuários alterados são anotados na sessão durante o flush e descartados só
+# após o commit, como no cache de perfis: descartar no flush deixaria uma leitura
+# concorrente, ainda sem o commit, regravar o principal antigo por todo o TTL
+_PENDING = "principal_cache_pending"
+
+
+def _mark_changed(session: Optional[Session], user_id: Optional[int]) -> None:
+    if session is not None and user_id is not None:
+        session.info.setdefault(_PENDING, set()).add(int(user_id))
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    _mark_changed(object_session(target), target.id)
+
+
+@event.listens_for(Paciente, "after_insert")
+@event.listens_for(Paciente, "after_update")
+@event.listens_for(Paciente, "after_delete")
+@event.listens_for(ProfissionalSaude, "after_insert")
+@event.listens_for(ProfissionalSaude, "after_update")
+@event.listens_for(ProfissionalSaude, "after_delete")
+@event.listens_for(Admin, "after_insert")
+@event.listens_for(Admin, "after_update")
+@event.listens_for(Admin, "after_delete")
+def _invalidate_profile(mapper, connection, target):
+    _mark_changed(object_session(target), target.user_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    for user_id in session.info.pop(_PENDING, ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING, None)
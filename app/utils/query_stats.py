@@ -0,0 +1,171 @@
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+QUERIES_HEADER = "X-DB-Queries"
+COMMITS_HEADER = "X-DB-Commits"
+N1_HEADER = "X-DB-N1-Suspects"
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_UTILS_DIR = os.path.dirname(os.path.abspath(__file__))
+_ESTE_ARQUIVO = os.path.abspath(__file__)
+
+# Listas de parâmetros de tamanho variável (IN expandido) e espaços viram uma única forma
+_LISTA_PARAMETROS = re.compile(r"\(\s*(?:\?|%s|%\(\w+\)s|:\w+)(?:\s*,\s*(?:\?|%s|%\(\w+\)s|:\w+))*\s*\)")
+_ESPACOS = re.compile(r"\s+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Requisição ou bloco acima do orçamento de consultas configurado"""
+
+
+@dataclass
+class QueryRecord:
+    """Uma instrução executada, com a duração e o ponto do código que a originou"""
+    statement: str
+    duration: float
+    origem: Optional[str] = None
+
+    @property
+    def forma(self) -> str:
+        """Instrução sem a variação de listas de parâmetros, para agrupar repetições"""
+        return _LISTA_PARAMETROS.sub("(?)", _ESPACOS.sub(" ", self.statement).strip())
+
+
+@dataclass
+class QueryStats:
+    """Contadores de acesso ao banco de uma requisição"""
+    queries: int = 0
+    commits: int = 0
+    # Preenchido só com o perfil ativo (track_queries(profile=True))
+    statements: Optional[List[QueryRecord]] = None
+
+    def n1_suspects(self, limiar: int) -> List[Tuple[str, int, Optional[str]]]:
+        """Formas de instrução repetidas ``limiar`` vezes ou mais: ``(forma, vezes, origem)``"""
+        if not self.statements:
+            return []
+        contagem = Counter(record.forma for record in self.statements)
+        origens = {}
+        for record in self.statements:
+            origens.setdefault(record.forma, record.origem)
+        return [
+            (forma, vezes, origens[forma])
+            for forma, vezes in contagem.most_common()
+            if vezes >= limiar
+        ]
+
+    def report(self, rota: str, limiar: int) -> str:
+        """Resumo legível das instruções, com as suspeitas de N+1 primeiro"""
+        total_ms = sum(record.duration for record in self.statements or ()) * 1000
+        linhas = [f"{rota}: {self.queries} consultas, {self.commits} commits, {total_ms:.1f} ms no banco"]
+        for forma, vezes, origem in self.n1_suspects(limiar):
+            linhas.append(f"  possível N+1 ({vezes}x, {origem or 'origem desconhecida'}): {forma}")
+        for record in self.statements or ():
+            linhas.append(f"  {record.duration * 1000:7.2f} ms  {record.origem or '-'}  {record.forma}")
+        return "\n".join(linhas)
+
+
+# O objeto é compartilhado (e não copiado) com o threadpool e o run_sync,
+# então os incrementos feitos fora do event loop continuam visíveis
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+@contextmanager
+def track_queries(profile: bool = False) -> Iterator[QueryStats]:
+    """Contabilizar as consultas e commits executados dentro do bloco.
+
+    Com ``profile`` cada instrução também é registrada com a duração e a origem.
+    """
+    stats = QueryStats(statements=[] if profile else None)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def query_budget(max_queries: int, limiar_n1: Optional[int] = None) -> Iterator[QueryStats]:
+    """Falhar (``QueryBudgetExceeded``) se o bloco passar de ``max_queries`` consultas.
+
+    Com ``limiar_n1``, falhar também quando uma mesma forma de instrução se repetir
+    esse número de vezes. Feito para testes de serviços::
+
+        with query_budget(3):
+            ConsultaService(db).get_all_consultas()
+    """
+    with track_queries(profile=True) as stats:
+        yield stats
+    if stats.queries > max_queries or (limiar_n1 is not None and stats.n1_suspects(limiar_n1)):
+        raise QueryBudgetExceeded(stats.report(f"orçamento de {max_queries} consultas", limiar_n1 or max_queries + 1))
+
+
+def _origem() -> Optional[str]:
+    """Ponto do código que executou a instrução: ``arquivo:linha função``.
+
+    Prefere o primeiro quadro de serviços ou rotas; sem ele, o primeiro de ``app/``.
+    """
+    primeiro = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        arquivo = frame.f_code.co_filename
+        if arquivo.startswith(_APP_DIR) and arquivo != _ESTE_ARQUIVO:
+            if not arquivo.startswith(_UTILS_DIR):
+                primeiro = frame
+                break
+            primeiro = primeiro or frame
+        frame = frame.f_back
+    if primeiro is None:
+        return None
+    arquivo = os.path.relpath(primeiro.f_code.co_filename, os.path.dirname(_APP_DIR))
+    return f"{arquivo}:{primeiro.f_lineno} {primeiro.f_code.co_name}"
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        if stats.statements is not None and context is not None:
+            context._query_stats_inicio = time.perf_counter()
+
+
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None and stats.statements is not None:
+        inicio = getattr(context, "_query_stats_inicio", None)
+        duracao = time.perf_counter() - inicio if inicio is not None else 0.0
+        stats.statements.append(QueryRecord(statement, duracao, _origem()))
+
+
+def _count_commit(conn):
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.commits += 1
+
+
+def install_query_counter(engine: Engine) -> None:
+    """Registrar os contadores nos eventos de um engine síncrono"""
+    if not event.contains(engine, "before_cursor_execute", _count_query):
+        event.listen(engine, "before_cursor_execute", _count_query)
+        event.listen(engine, "after_cursor_execute", _record_query)
+        event.listen(engine, "commit", _count_commit)
+
+
+def log_profile(stats: QueryStats, rota: str, limiar_n1: int, orcamento: int = 0) -> None:
+    """Registrar no log o perfil da requisição; com suspeitas ou acima do orçamento, como aviso"""
+    acima = orcamento > 0 and stats.queries > orcamento
+    if acima or stats.n1_suspects(limiar_n1):
+        logger.warning(stats.report(rota, limiar_n1))
+    elif logger.isEnabledFor(logging.INFO):
+        logger.info(stats.report(rota, limiar_n1))
@@ -1,11 +1,62 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from jose.exceptions import ExpiredSignatureError
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
-from app.config.settings import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config.settings import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+)
+from app.utils.metrics import bcrypt_queue_seconds
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes com custo diferente do configurado são marcados para atualização
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+    bcrypt__max_rounds=BCRYPT_ROUNDS,
+)
+
+
+class PasswordHashPool:
+    """Pool dedicado e limitado para as operações de bcrypt.
+
+    Mantém o custo de CPU do hash fora do event loop e do threadpool usado
+    pelo banco, de modo que um pico de logins não congele as demais requisições.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._queued = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Operações aguardando uma thread livre"""
+        return self._queued
+
+    async def run(self, fn, *args):
+        """Executar ``fn(*args)`` no pool, aguardando sem bloquear o event loop"""
+        with self._lock:
+            self._queued += 1
+        enfileirado = time.perf_counter()
+
+        def task():
+            with self._lock:
+                self._queued -= 1
+            bcrypt_queue_seconds.observe(time.perf_counter() - enfileirado)
+            return fn(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self._executor, task)
+
+
+password_hash_pool = PasswordHashPool(PASSWORD_HASH_WORKERS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -18,6 +69,21 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha e devolve novo hash se o custo configurado mudou"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Gera hash da senha no pool dedicado"""
+    return await password_hash_pool.run(get_password_hash, password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verifica a senha no pool dedicado, devolvendo novo hash se necessário"""
+    return await password_hash_pool.run(verify_and_update_password, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: timedelta = None) -> str:
     """Cria token JWT"""
     to_encode = data.copy()
@@ -0,0 +1,47 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+# Termos mais curtos são ignorados (mesmo mínimo padrão do FULLTEXT do InnoDB)
+TAMANHO_MINIMO_TERMO = 3
+
+STOPWORDS = frozenset("""
+    aos apos ate com como contra das desde dos ela elas ele eles entre era essa essas esse esses
+    esta estas este estes foi isso isto mais mas mesmo nao nas nem nos numa num para pela pelas
+    pelo pelos por qual quando que quem sao sem seu seus sob sobre sua suas tambem tem ter uma umas
+    uns
+""".split())
+
+_TERMO = re.compile(r"[a-z0-9]+")
+_NAO_DIGITO = re.compile(r"\D")
+
+
+def normalizar(texto: str) -> str:
+    """Remover acentos e caixa: "Cefaléia Crônica" -> "cefaleia cronica" """
+    decomposto = unicodedata.normalize("NFKD", texto)
+    return "".join(c for c in decomposto if not unicodedata.combining(c)).casefold()
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+    """Termos pesquisáveis de um texto em português, sem acentos e sem palavras vazias"""
+    if not texto:
+        return []
+    return [
+        termo for termo in _TERMO.findall(normalizar(texto))
+        if len(termo) >= TAMANHO_MINIMO_TERMO and termo not in STOPWORDS
+    ]
+
+
+def texto_para_busca(*textos: Optional[str]) -> str:
+    """Juntar os termos dos textos numa única string, já no formato indexado"""
+    return " ".join(termo for texto in textos for termo in tokenizar(texto))
+
+
+def normalizar_nome(nome: Optional[str]) -> str:
+    """Nome sem acentos, caixa e pontuação, com um espaço entre as partes: "D'Ávila" -> "d avila" """
+    return " ".join(_TERMO.findall(normalizar(nome or "")))
+
+
+def somente_digitos(texto: Optional[str]) -> str:
+    """Apenas os dígitos do texto: "123.456.789-00" -> "12345678900" """
+    return _NAO_DIGITO.sub("", texto or "")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark da busca de pacientes por prefixo do nome ou do CPF (GET /api/pacientes/busca).
+
+Popula um banco descartável com --pacientes pacientes (padrão: 1 milhão) e mede
+PacienteService.buscar_pacientes e o endpoint completo para prefixos comuns, raros
+e sem resultado; cada busca é uma leitura por intervalo nos índices de nome_busca
+e cpf_digitos, então o tempo não deve crescer com o tamanho da tabela.
+
+Resultado de referência (SQLite, padrões): mediana entre 0,7 e 0,9 ms no serviço e
+entre 6,5 e 7,7 ms no endpoint (p95 abaixo de 9,3 ms), com ou sem resultados.
+
+    python benchmarks/busca_pacientes.py
+    python benchmarks/busca_pacientes.py --pacientes 100000
+"""
+
+import argparse
+import random
+import time
+
+from comum import banco_descartavel, formatar, medir
+
+TERMOS = (
+    ("nome comum", "ana"),
+    ("nome completo", "sofia vieira ri"),
+    ("nome com acento", "fábio"),
+    ("nome inexistente", "zzz"),
+    # load_test.semear gera CPFs sequenciais: 000.004.5xx-xx existe a partir de 450 mil pacientes
+    ("CPF com pontuação", "000.004.5"),
+    ("CPF só dígitos", "00000098"),
+    ("CPF inexistente", "999999"),
+)
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark da busca de pacientes por prefixo")
+    parser.add_argument("--database-url", help="banco vazio e descartável (padrão: SQLite temporário)")
+    parser.add_argument("--pacientes", type=int, default=1000000)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    with banco_descartavel(args.database_url):
+        from fastapi.testclient import TestClient
+        from app.config.database import SessionLocal
+        from app.services.paciente_service import PacienteService
+        from load_test import DOMINIO_EMAIL, SENHA, semear
+        from main import app
+
+        inicio = time.perf_counter()
+        semear(args.pacientes, 1, 0, random.Random(args.semente))
+        print(f"Banco populado em {time.perf_counter() - inicio:.1f}s: {args.pacientes} pacientes")
+
+        db = SessionLocal()
+        try:
+            service = PacienteService(db)
+            for rotulo, termo in TERMOS:
+                encontrados = len(service.buscar_pacientes(termo))
+                tempos = medir(lambda: service.buscar_pacientes(termo), args.repeticoes)
+                print(f"serviço  {rotulo:18} {termo!r:18} {encontrados:2} resultados: {formatar(tempos)}")
+        finally:
+            db.close()
+
+        cliente = TestClient(app)
+        resposta = cliente.post("/api/auth/login", json={"email": f"profissional1@{DOMINIO_EMAIL}", "senha": SENHA})
+        headers = {"Authorization": f"Bearer {resposta.json()['access_token']}"}
+        for rotulo, termo in TERMOS:
+            def buscar():
+                resposta = cliente.get("/api/pacientes/busca", params={"q": termo}, headers=headers)
+                assert resposta.status_code == 200, resposta.text
+            print(f"endpoint {rotulo:18} {termo!r:18}: {formatar(medir(buscar, args.repeticoes))}")
+
+
+if __name__ == "__main__":
+    main()
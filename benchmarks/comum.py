@@ -0,0 +1,55 @@
+"""
+Utilitários compartilhados pelos benchmarks: banco descartável e medição de tempo.
+
+Os benchmarks populam o banco com ``load_test.semear`` e por isso precisam de um
+banco vazio (um SQLite temporário por padrão).
+"""
+
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+
+
+@contextmanager
+def banco_descartavel(database_url: Optional[str] = None) -> Iterator[str]:
+    """Definir DATABASE_URL (antes de importar a aplicação) e apagar o SQLite temporário no fim"""
+    diretorio_temporario = None
+    if database_url is None:
+        diretorio_temporario = tempfile.mkdtemp(prefix="sghss-benchmark-")
+        database_url = f"sqlite:///{os.path.join(diretorio_temporario, 'benchmark.db')}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("SQL_PROFILE", "False")
+    try:
+        yield database_url
+    finally:
+        if diretorio_temporario:
+            shutil.rmtree(diretorio_temporario, ignore_errors=True)
+
+
+def medir(funcao: Callable[[], object], repeticoes: int, aquecimento: int = 3) -> Dict[str, float]:
+    """Mediana, p95 e máximo (ms) de ``repeticoes`` chamadas, após algumas de aquecimento"""
+    for _ in range(aquecimento):
+        funcao()
+    duracoes = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        duracoes.append((time.perf_counter() - inicio) * 1000)
+    duracoes.sort()
+    return {
+        "mediana_ms": statistics.median(duracoes),
+        "p95_ms": duracoes[max(0, int(len(duracoes) * 0.95) - 1)],
+        "max_ms": duracoes[-1],
+    }
+
+
+def formatar(tempos: Dict[str, float]) -> str:
+    return f"mediana {tempos['mediana_ms']:.2f} ms, p95 {tempos['p95_ms']:.2f} ms, máx {tempos['max_ms']:.2f} ms"
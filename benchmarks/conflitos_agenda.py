@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark da verificação de conflitos de horário (ConsultaService._check_conflitos).
+
+Popula um banco descartável com um único profissional com --consultas consultas
+(padrão: 100 mil, uma a cada 30 minutos) e mede a instrução única com as duas buscas
+por intervalo (agenda do profissional e do paciente) feita ao criar ou reagendar uma
+consulta, em horários sorteados ao longo de toda a agenda.
+
+Resultado de referência (SQLite, padrões): mediana 0.23 ms com horário ocupado e
+0.21 ms com horário livre (p95 0.28 e 0.25 ms).
+
+    python benchmarks/conflitos_agenda.py
+    python benchmarks/conflitos_agenda.py --consultas 500000 --repeticoes 1000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from comum import banco_descartavel, formatar, medir
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark da verificação de conflitos de agenda")
+    parser.add_argument("--database-url", help="banco vazio e descartável (padrão: SQLite temporário)")
+    parser.add_argument("--consultas", type=int, default=100000, help="consultas do profissional")
+    parser.add_argument("--pacientes", type=int, default=1000)
+    parser.add_argument("--repeticoes", type=int, default=500)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    with banco_descartavel(args.database_url):
+        from fastapi import HTTPException
+        from sqlalchemy import insert
+        from app.config.database import SessionLocal
+        from app.models import Consulta, StatusConsulta, TipoConsulta
+        from app.models.consulta import DURACAO_PADRAO_MINUTOS
+        from app.services.consulta_service import ConsultaService
+        from load_test import LOTE, semear
+
+        rng = random.Random(args.semente)
+        inicio = time.perf_counter()
+        semear(args.pacientes, 1, 0, rng)
+
+        # Toda a agenda num único profissional, uma consulta a cada 30 minutos
+        primeira = datetime(2020, 1, 1, 0, 0)
+        passo = timedelta(minutes=DURACAO_PADRAO_MINUTOS)
+        agora = datetime.now()
+        db = SessionLocal()
+        try:
+            for lote in range(0, args.consultas, LOTE):
+                db.execute(insert(Consulta.__table__), [
+                    dict(
+                        paciente_id=rng.randint(1, args.pacientes), profissional_id=1,
+                        data_hora=primeira + passo * indice, data_hora_fim=primeira + passo * (indice + 1),
+                        duracao_minutos=DURACAO_PADRAO_MINUTOS, tipo_consulta=TipoConsulta.PRESENCIAL,
+                        status=StatusConsulta.CONCLUIDA, created_at=agora, updated_at=agora,
+                    )
+                    for indice in range(lote, min(lote + LOTE, args.consultas))
+                ])
+            db.commit()
+        finally:
+            db.close()
+        print(f"Banco populado em {time.perf_counter() - inicio:.1f}s: {args.consultas} consultas de um profissional")
+
+        db = SessionLocal()
+        try:
+            service = ConsultaService(db)
+
+            def verificar():
+                # Horário ocupado: a busca encontra a consulta e responde 409
+                data_hora = primeira + passo * rng.randrange(args.consultas)
+                consulta = Consulta(
+                    paciente_id=rng.randint(1, args.pacientes), profissional_id=1,
+                    data_hora=data_hora, duracao_minutos=DURACAO_PADRAO_MINUTOS, status=StatusConsulta.AGENDADA,
+                )
+                try:
+                    service._check_conflitos(consulta)
+                except HTTPException:
+                    pass
+
+            def verificar_livre():
+                # Horário livre (depois da agenda): as duas buscas percorrem o intervalo sem achar nada
+                data_hora = primeira + passo * (args.consultas + rng.randrange(1000))
+                consulta = Consulta(
+                    paciente_id=rng.randint(1, args.pacientes), profissional_id=1,
+                    data_hora=data_hora, duracao_minutos=DURACAO_PADRAO_MINUTOS, status=StatusConsulta.AGENDADA,
+                )
+                service._check_conflitos(consulta)
+
+            print(f"horário ocupado (409): {formatar(medir(verificar, args.repeticoes))}")
+            print(f"horário livre: {formatar(medir(verificar_livre, args.repeticoes))}")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
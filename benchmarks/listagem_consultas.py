@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark das listagens de consultas: entidades do ORM x projeção de colunas.
+
+Popula um banco descartável com --consultas consultas (padrão: 20 mil, 2000
+pacientes e 50 profissionais) e mede, para páginas de 100 e 1000 linhas:
+
+- "entidades": a leitura anterior, com Consulta, Paciente, ProfissionalSaude e os
+  dois User carregados por joinedload;
+- "projeção": ConsultaService.get_all_consultas, só com as colunas da resposta;
+- o endpoint GET /api/consultas/ completo (TestClient, com serialização).
+
+Também mostra o pico de memória de uma página em cada leitura (tracemalloc).
+
+    python benchmarks/listagem_consultas.py
+    python benchmarks/listagem_consultas.py --consultas 100000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from comum import banco_descartavel, formatar, medir
+
+
+def pico_mb(funcao) -> float:
+    tracemalloc.start()
+    try:
+        funcao()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark das listagens de consultas")
+    parser.add_argument("--database-url", help="banco vazio e descartável (padrão: SQLite temporário)")
+    parser.add_argument("--consultas", type=int, default=20000)
+    parser.add_argument("--pacientes", type=int, default=2000)
+    parser.add_argument("--profissionais", type=int, default=50)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    with banco_descartavel(args.database_url):
+        from fastapi.testclient import TestClient
+        from sqlalchemy.orm import joinedload
+        from app.config.database import SessionLocal
+        from app.models import Consulta, Paciente, ProfissionalSaude
+        from app.services.consulta_service import ConsultaService
+        from load_test import semear
+        from main import app
+
+        inicio = time.perf_counter()
+        semear(args.pacientes, args.profissionais, args.consultas, random.Random(args.semente))
+        print(f"Banco populado em {time.perf_counter() - inicio:.1f}s: {args.consultas} consultas")
+
+        cliente = TestClient(app)
+        token = cliente.post("/api/auth/login", json={"email": "admin1@admin.com", "senha": "admin"}).json()["access_token"]
+        cabecalhos = {"Authorization": f"Bearer {token}"}
+
+        db = SessionLocal()
+        try:
+            service = ConsultaService(db)
+            for limite in (100, 1000):
+                def entidades():
+                    consultas = db.query(Consulta).options(
+                        joinedload(Consulta.paciente).joinedload(Paciente.user),
+                        joinedload(Consulta.profissional).joinedload(ProfissionalSaude.user)
+                    ).order_by(Consulta.data_hora, Consulta.id).limit(limite).all()
+                    # Sem manter as entidades no mapa de identidade entre as repetições
+                    db.expunge_all()
+                    return consultas
+
+                def projecao():
+                    return service.get_all_consultas(0, limite)
+
+                def endpoint():
+                    resposta = cliente.get("/api/consultas/", headers=cabecalhos, params={"limit": limite})
+                    assert resposta.status_code == 200, resposta.text[:200]
+
+                repeticoes = max(5, args.repeticoes * 100 // limite)
+                print(f"limit={limite}:")
+                print(f"  entidades  {formatar(medir(entidades, repeticoes))}, pico {pico_mb(entidades):.2f} MB")
+                print(f"  projeção   {formatar(medir(projecao, repeticoes))}, pico {pico_mb(projecao):.2f} MB")
+                tempos = medir(endpoint, repeticoes)
+                print(f"  endpoint   {formatar(tempos)} ({limite / tempos['mediana_ms'] * 1000:.0f} linhas/s)")
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
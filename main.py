@@ -1,5 +1,15 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
+from app.config.database import engine, async_engine, replica_engine, async_replica_engine
+from app.config.settings import (
+    DEBUG, METRICS_ENABLED, SQL_PROFILE, SQL_N1_THRESHOLD, SQL_QUERY_BUDGET, SQL_QUERY_BUDGET_STRICT
+)
 from app.routes import router
+from app.utils import metrics
+from app.utils.entity_cache import entity_cache
+from app.utils.query_stats import (
+    COMMITS_HEADER, N1_HEADER, QUERIES_HEADER, QueryBudgetExceeded, install_query_counter, log_profile, track_queries
+)
+from app.utils.security import password_hash_pool
 
 app = FastAPI(
     title="SGHSS - Sistema de Gestão Hospitalar e de Serviços de Saúde",
@@ -11,6 +21,58 @@ app = FastAPI(
 
 app.include_router(router)
 
+if DEBUG or SQL_PROFILE:
+    # Em modo debug cada resposta informa quantas consultas e commits a requisição fez;
+    # com SQL_PROFILE as instruções são registradas e analisadas (N+1 e orçamento)
+    for counted_engine in (engine, replica_engine, async_engine, async_replica_engine):
+        if counted_engine is not None:
+            install_query_counter(getattr(counted_engine, "sync_engine", counted_engine))
+
+    @app.middleware("http")
+    async def query_stats_middleware(request: Request, call_next):
+        with track_queries(profile=SQL_PROFILE) as stats:
+            response = await call_next(request)
+        response.headers[QUERIES_HEADER] = str(stats.queries)
+        response.headers[COMMITS_HEADER] = str(stats.commits)
+        
+        if SQL_PROFILE:
+            route = request.scope.get("route")
+            rota = f"{request.method} {getattr(route, 'path', request.url.path)}"
+            response.headers[N1_HEADER] = str(len(stats.n1_suspects(SQL_N1_THRESHOLD)))
+            log_profile(stats, rota, SQL_N1_THRESHOLD, SQL_QUERY_BUDGET)
+            if SQL_QUERY_BUDGET_STRICT and 0 < SQL_QUERY_BUDGET < stats.queries:
+                raise QueryBudgetExceeded(stats.report(rota, SQL_N1_THRESHOLD))
+        return response
+
+if METRICS_ENABLED:
+    # Contagem e latência por rota, pool de conexões, bcrypt e duração das consultas
+    engines = {"sync": engine}
+    if replica_engine is not None:
+        engines["replica"] = replica_engine
+    if async_engine is not None:
+        engines["async"] = async_engine.sync_engine
+    if async_replica_engine is not None:
+        engines["async_replica"] = async_replica_engine.sync_engine
+    for metric_engine in engines.values():
+        metrics.install_query_metrics(metric_engine)
+    metrics.register_pool_metrics(engines)
+    metrics.registry.register(metrics.CallbackMetric(
+        "bcrypt_queue_depth", "Operações de bcrypt aguardando uma thread livre.", "gauge", (),
+        lambda: {(): password_hash_pool.queue_depth}
+    ))
+    metrics.registry.register(metrics.CallbackMetric(
+        "entity_cache_events_total", "Acertos, faltas, descartes e invalidações do cache de perfis.", "counter",
+        ("event",), lambda: {(evento,): valor for evento, valor in entity_cache.stats().items()}
+    ))
+
+    # Registrado por último para envolver também o middleware de debug
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics_endpoint():
+        """Métricas no formato de texto do Prometheus"""
+        return Response(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
 @app.get("/", tags=["Root"])
 def root():
     """Endpoint raiz da API"""
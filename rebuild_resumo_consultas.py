@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Script para recalcular o resumo de consultas do dashboard a partir da tabela de consultas.
+
+Uso após cargas feitas fora do ConsultaService (importações, correções manuais no banco):
+    python rebuild_resumo_consultas.py
+    python rebuild_resumo_consultas.py --inicio 2026-01-01 --fim 2026-01-31
+"""
+
+import argparse
+import sys
+import os
+from datetime import date
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.config.database import SessionLocal
+from app.services.dashboard_service import DashboardService
+
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Recalcular o resumo de consultas do dashboard")
+    parser.add_argument("--inicio", type=date.fromisoformat, help="primeiro dia (AAAA-MM-DD); padrão: todo o histórico")
+    parser.add_argument("--fim", type=date.fromisoformat, help="último dia (AAAA-MM-DD); padrão: todo o histórico")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+
+    try:
+        linhas = DashboardService(db).reconstruir(args.inicio, args.fim)
+        print(f"Resumo recalculado: {linhas} linhas")
+
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
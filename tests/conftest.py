@@ -0,0 +1,111 @@
+"""
+Configuração dos testes.
+
+Os testes rodam contra um SQLite temporário, a menos que TEST_DATABASE_URL aponte
+para um banco descartável (por exemplo, um MariaDB vazio). As variáveis de
+ambiente precisam ser definidas antes de importar qualquer módulo da aplicação.
+"""
+
+import os
+import sys
+import tempfile
+from itertools import count
+
+_DIRETORIO = tempfile.mkdtemp(prefix="sghss-testes-")
+os.environ["DATABASE_URL"] = os.environ.get("TEST_DATABASE_URL") or f"sqlite:///{os.path.join(_DIRETORIO, 'testes.db')}"
+os.environ["ANEXOS_DIR"] = os.path.join(_DIRETORIO, "anexos")
+os.environ.setdefault("DATABASE_ASYNC", "False")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("SQL_PROFILE", "False")
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from fastapi.testclient import TestClient
+from app.config.database import async_engine, async_replica_engine, engine, replica_engine, SessionLocal
+from app.models import Base
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.paciente_schemas import PacienteCreate
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate
+from app.services.paciente_service import PacienteService
+from app.services.profissional_service import ProfissionalSaudeService
+from app.utils.query_stats import install_query_counter
+import seed_database
+
+# O banco é o mesmo durante toda a execução: CPF, CRM e e-mail precisam ser únicos
+_SUFIXOS = count(1)
+SENHA = "segredo"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def banco():
+    """Criar as tabelas uma vez por execução e removê-las no final"""
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def db():
+    """Sessão síncrona do banco de testes"""
+    sessao = SessionLocal()
+    try:
+        yield sessao
+    finally:
+        sessao.close()
+
+
+@pytest.fixture
+def contador_de_consultas():
+    """Contadores de query_stats em todos os engines, como em main.py (no modo assíncrono as rotas usam o async_engine)"""
+    for contado in (engine, replica_engine, async_engine, async_replica_engine):
+        if contado is not None:
+            install_query_counter(getattr(contado, "sync_engine", contado))
+
+
+@pytest.fixture
+def cliente():
+    """Cliente HTTP da aplicação"""
+    from main import app
+    return TestClient(app)
+
+
+class Contas:
+    """Cadastro de usuários com dados únicos e login pela API"""
+
+    def __init__(self, db, cliente: TestClient):
+        self.db = db
+        self.cliente = cliente
+
+    def paciente(self, nome: str = "Paciente Teste"):
+        """Paciente novo e os cabeçalhos autenticados dele"""
+        n = next(_SUFIXOS)
+        paciente = PacienteService(self.db).create_paciente(PacienteCreate(
+            cpf=f"9{n:010d}", nome=nome, email=f"paciente-{n}@teste.com", senha=SENHA
+        ))
+        return paciente, self.login(f"paciente-{n}@teste.com", SENHA)
+
+    def profissional(self, nome: str = "Profissional Teste", especialidade=EspecialidadeMedica.CLINICO_GERAL):
+        """Profissional novo e os cabeçalhos autenticados dele"""
+        n = next(_SUFIXOS)
+        profissional = ProfissionalSaudeService(self.db).create_profissional(ProfissionalSaudeCreate(
+            crm=f"CRM-TESTE-{n}", especialidade=especialidade, nome=nome,
+            email=f"profissional-{n}@teste.com", senha=SENHA
+        ))
+        return profissional, self.login(f"profissional-{n}@teste.com", SENHA)
+
+    def admin(self) -> dict:
+        """Cabeçalhos autenticados do admin de seed_database"""
+        seed_database.seed_admin(self.db)
+        return self.login("admin1@admin.com", "admin")
+
+    def login(self, email: str, senha: str) -> dict:
+        resposta = self.cliente.post("/api/auth/login", json={"email": email, "senha": senha})
+        assert resposta.status_code == 200, resposta.text
+        return {"Authorization": "Bearer " + resposta.json()["access_token"]}
+
+
+@pytest.fixture
+def contas(db, cliente):
+    """Fábrica de pacientes, profissionais e admin autenticados"""
+    return Contas(db, cliente)
@@ -0,0 +1,88 @@
+"""
+Cache da agenda: uma escrita invalida só os dias que tocou, uma leitura anterior à
+escrita não regrava o dia, e renomear o paciente ou o profissional invalida a agenda
+dos profissionais afetados após o commit.
+"""
+
+from datetime import date, datetime, timedelta
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.consulta_schemas import ConsultaCreate
+from app.schemas.paciente_schemas import PacienteCreate, PacienteUpdate
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate, ProfissionalSaudeUpdate
+from app.services.consulta_service import ConsultaService
+from app.services.paciente_service import PacienteService
+from app.services.profissional_service import ProfissionalSaudeService
+from app.utils.agenda_cache import AgendaCache
+
+DIA_1 = date(2030, 3, 4)
+DIA_2 = date(2030, 3, 5)
+
+
+def test_invalidar_descarta_apenas_os_dias_tocados():
+    cache = AgendaCache(maxsize=100, ttl=60)
+    versao = cache.versao(1)
+    cache.set(1, DIA_1, ["a"], versao)
+    cache.set(1, DIA_2, ["b"], versao)
+
+    cache.invalidar(1, [DIA_1])
+    assert cache.get(1, DIA_1) is None
+    assert cache.get(1, DIA_2) == ("b",)
+
+
+def test_leitura_anterior_a_escrita_nao_regrava_o_dia():
+    cache = AgendaCache(maxsize=100, ttl=60)
+    versao = cache.versao(1)
+
+    # A escrita confirma e invalida o dia enquanto a leitura ainda estava no banco
+    cache.invalidar(1, [DIA_1])
+    cache.set(1, DIA_1, ["antigo"], versao)
+    cache.set(1, DIA_2, ["b"], versao)
+    assert cache.get(1, DIA_1) is None
+    assert cache.get(1, DIA_2) == ("b",)
+
+    cache.set(1, DIA_1, ["novo"], cache.versao(1))
+    assert cache.get(1, DIA_1) == ("novo",)
+
+
+def test_renomear_invalida_todos_os_dias_do_profissional():
+    cache = AgendaCache(maxsize=100, ttl=60)
+    versao = cache.versao(1)
+    cache.set(1, DIA_1, ["a"], versao)
+    cache.set(2, DIA_1, ["c"], cache.versao(2))
+
+    cache.invalidar_profissional(1)
+    assert cache.get(1, DIA_1) is None
+    assert cache.get(2, DIA_1) == ("c",)
+    cache.set(1, DIA_2, ["b"], versao)
+    assert cache.get(1, DIA_2) is None
+
+
+def _agendar(db):
+    paciente = PacienteService(db).create_paciente(
+        PacienteCreate(cpf="700.000.000-01", nome="Paciente Agenda", email="agenda-paciente@teste.com", senha="segredo")
+    )
+    profissional = ProfissionalSaudeService(db).create_profissional(ProfissionalSaudeCreate(
+        crm="CRM-AGENDA", especialidade=EspecialidadeMedica.PEDIATRIA, nome="Profissional Agenda",
+        email="agenda-profissional@teste.com", senha="segredo"
+    ))
+    data_hora = (datetime.now() + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
+    ConsultaService(db).create_consulta(
+        ConsultaCreate(paciente_id=paciente.id, profissional_id=profissional.id, data_hora=data_hora)
+    )
+    return paciente, profissional, data_hora.date()
+
+
+def _nomes(db, profissional_id, dia):
+    [(_, consultas)] = ConsultaService(db).get_agenda_profissional(profissional_id, dia, 1)
+    return [(c.paciente_nome, c.profissional_nome) for c in consultas]
+
+
+def test_renomear_invalida_agenda_em_cache(db):
+    paciente, profissional, dia = _agendar(db)
+    assert _nomes(db, profissional.id, dia) == [("Paciente Agenda", "Profissional Agenda")]
+
+    PacienteService(db).update_paciente(paciente.id, PacienteUpdate(nome="Paciente Renomeado"))
+    assert _nomes(db, profissional.id, dia) == [("Paciente Renomeado", "Profissional Agenda")]
+
+    ProfissionalSaudeService(db).update_profissional(profissional.id, ProfissionalSaudeUpdate(nome="Profissional Renomeado"))
+    assert _nomes(db, profissional.id, dia) == [("Paciente Renomeado", "Profissional Renomeado")]
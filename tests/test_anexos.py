@@ -0,0 +1,118 @@
+"""
+Anexos de prontuários: conteúdo gravado uma única vez por hash, downloads parciais
+com Range, limite de tamanho e conferência do SHA-256 informado no envio.
+"""
+
+import asyncio
+import hashlib
+import os
+import pytest
+from fastapi import HTTPException
+from app.schemas.prontuario_schemas import ProntuarioCreate
+from app.services.prontuario_service import ProntuarioService
+from app.utils.blob_store import BlobStore, blob_store
+
+CONTEUDO = b"%PDF-1.4 hemograma completo " * 40
+
+
+async def _partes(conteudo: bytes, tamanho: int = 100):
+    for inicio in range(0, len(conteudo), tamanho):
+        yield conteudo[inicio:inicio + tamanho]
+
+
+def _arquivos(raiz: str) -> list:
+    return [os.path.join(pasta, nome) for pasta, _, nomes in os.walk(raiz) for nome in nomes]
+
+
+def test_mesmo_conteudo_e_gravado_uma_vez(tmp_path):
+    store = BlobStore(str(tmp_path))
+    primeiro = asyncio.run(store.save(_partes(CONTEUDO)))
+    segundo = asyncio.run(store.save(_partes(CONTEUDO, 7)))
+
+    assert primeiro == segundo == (hashlib.sha256(CONTEUDO).hexdigest(), len(CONTEUDO))
+    assert _arquivos(str(tmp_path)) == [store.path(primeiro[0])]
+
+
+def test_arquivo_acima_do_limite_e_descartado(tmp_path):
+    store = BlobStore(str(tmp_path))
+    with pytest.raises(HTTPException) as erro:
+        asyncio.run(store.save(_partes(CONTEUDO), max_bytes=len(CONTEUDO) - 1))
+    assert erro.value.status_code == 413
+    assert _arquivos(str(tmp_path)) == []
+
+
+def test_hash_diferente_do_informado_e_descartado(tmp_path):
+    store = BlobStore(str(tmp_path))
+    with pytest.raises(HTTPException) as erro:
+        asyncio.run(store.save(_partes(CONTEUDO), expected_sha256=hashlib.sha256(b"outro").hexdigest()))
+    assert erro.value.status_code == 400
+    assert _arquivos(str(tmp_path)) == []
+
+
+def test_hash_fora_do_formato_nao_vira_caminho(tmp_path):
+    with pytest.raises(HTTPException) as erro:
+        BlobStore(str(tmp_path)).path("../../etc/passwd")
+    assert erro.value.status_code == 404
+
+
+def _prontuarios(db, contas):
+    paciente, headers_paciente = contas.paciente()
+    profissional, headers_profissional = contas.profissional()
+    service = ProntuarioService(db)
+    ids = [service.create_prontuario(ProntuarioCreate(paciente_id=paciente.id), profissional.id).id for _ in range(2)]
+    return ids, headers_profissional, headers_paciente
+
+
+def test_envio_e_download_com_range(db, cliente, contas):
+    (primeiro, segundo), headers, headers_paciente = _prontuarios(db, contas)
+    sha256 = hashlib.sha256(CONTEUDO).hexdigest()
+
+    for prontuario_id in (primeiro, segundo):
+        resposta = cliente.post(
+            f"/api/prontuarios/{prontuario_id}/anexos", params={"nome": "hemograma.pdf", "sha256": sha256},
+            content=CONTEUDO, headers={**headers, "Content-Type": "application/pdf"}
+        )
+        assert resposta.status_code == 201, resposta.text
+        assert resposta.json()["sha256"] == sha256
+    assert [caminho for caminho in _arquivos(blob_store.root) if sha256 in caminho] == [blob_store.path(sha256)]
+
+    url = f"/api/prontuarios/{primeiro}/anexos/{sha256}"
+    resposta = cliente.get(url, headers=headers_paciente)
+    assert resposta.status_code == 200
+    assert resposta.content == CONTEUDO
+    assert resposta.headers["content-type"] == "application/pdf"
+
+    resposta = cliente.get(url, headers={**headers_paciente, "Range": "bytes=10-19"})
+    assert resposta.status_code == 206
+    assert resposta.content == CONTEUDO[10:20]
+    assert resposta.headers["content-range"] == f"bytes 10-19/{len(CONTEUDO)}"
+
+    resposta = cliente.get(url, headers={**headers_paciente, "Range": f"bytes={len(CONTEUDO)}-"})
+    assert resposta.status_code == 416
+
+
+def test_envio_com_hash_diferente_nao_e_anexado(db, cliente, contas):
+    (prontuario_id, _), headers, _ = _prontuarios(db, contas)
+    url = f"/api/prontuarios/{prontuario_id}/anexos"
+
+    resposta = cliente.post(
+        url, params={"nome": "exame.pdf", "sha256": hashlib.sha256(b"outro").hexdigest()},
+        content=CONTEUDO + b"corrompido", headers=headers
+    )
+    assert resposta.status_code == 400
+    assert cliente.get(url, headers=headers).json() == []
+
+    resposta = cliente.post(url, params={"nome": "exame.pdf", "sha256": "nao-e-um-hash"}, content=CONTEUDO, headers=headers)
+    assert resposta.status_code == 422
+
+
+def test_envio_acima_do_limite(db, cliente, contas, monkeypatch):
+    (prontuario_id, _), headers, _ = _prontuarios(db, contas)
+    salvar = blob_store.save
+    monkeypatch.setattr(blob_store, "save", lambda chunks, **kwargs: salvar(chunks, max_bytes=100, **kwargs))
+
+    resposta = cliente.post(
+        f"/api/prontuarios/{prontuario_id}/anexos", params={"nome": "grande.pdf"}, content=CONTEUDO, headers=headers
+    )
+    assert resposta.status_code == 413
+    assert cliente.get(f"/api/prontuarios/{prontuario_id}/anexos", headers=headers).json() == []
@@ -0,0 +1,63 @@
+"""
+Colunas de busca dos pacientes: preenchidas em toda escrita do ORM, não só pelo
+serviço, e lidas por intervalo nos índices delas.
+"""
+
+from datetime import datetime
+import pytest
+from app.config.database import engine
+from app.models.paciente import Paciente
+from app.models.user import User, TipoUsuario
+from app.services.paciente_service import PacienteService
+from tests.test_indices_consultas import capturar
+
+
+def _paciente_como_no_seed(db, email: str, nome: str, cpf: str) -> Paciente:
+    # Mesmo caminho de seed_database.py: usuário confirmado antes, perfil só com user_id
+    user = User(nome=nome, email=email, senha_hash="x", tipo_usuario=TipoUsuario.PACIENTE, ativo=True)
+    db.add(user)
+    db.commit()
+    paciente = Paciente(user_id=user.id, cpf=cpf, created_at=datetime.now(), updated_at=datetime.now())
+    db.add(paciente)
+    db.commit()
+    return paciente
+
+
+def test_paciente_criado_so_com_user_id_e_encontrado(db):
+    paciente = _paciente_como_no_seed(db, "busca-seed@teste.com", "Conceição D'Ávila", "321.654.987-00")
+    service = PacienteService(db)
+
+    assert [p.id for p in service.buscar_pacientes("conceicao d av")] == [paciente.id]
+    assert [p.id for p in service.buscar_pacientes("321.654")] == [paciente.id]
+
+
+def test_renomear_usuario_atualiza_nome_busca(db):
+    paciente = _paciente_como_no_seed(db, "busca-renomeado@teste.com", "Nome Antigo Busca", "322.654.987-01")
+    db.expunge_all()
+
+    user = db.get(User, paciente.user_id)
+    user.nome = "Nome Renovado Busca"
+    db.commit()
+
+    service = PacienteService(db)
+    assert [p.id for p in service.buscar_pacientes("nome renovado")] == [paciente.id]
+    assert service.buscar_pacientes("nome antigo busca") == []
+
+
+@pytest.mark.parametrize("termo, indice", [
+    ("maria sa", "ix_pacientes_nome_busca"),
+    ("123.45", "ix_pacientes_cpf_digitos"),
+])
+def test_busca_por_prefixo_usa_o_indice_da_coluna(db, termo, indice):
+    with capturar() as instrucoes:
+        PacienteService(db).buscar_pacientes(termo)
+    [(statement, parameters)] = instrucoes
+
+    with engine.connect() as conexao:
+        if engine.dialect.name == "sqlite":
+            plano = [linha[-1] for linha in conexao.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            acessos = [detalhe for detalhe in plano if " pacientes " in f" {detalhe} "]
+        else:
+            plano = conexao.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+            acessos = [linha["key"] or "" for linha in plano if linha["table"] == "pacientes"]
+    assert any(indice in acesso for acesso in acessos), plano
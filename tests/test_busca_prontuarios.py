@@ -0,0 +1,103 @@
+"""
+Busca textual de prontuários: termos sem acento e por prefixo, ranqueamento BM25
+do índice invertido e visibilidade dos resultados por tipo de usuário.
+"""
+
+from app.schemas.prontuario_schemas import ProntuarioCreate, ProntuarioUpdate
+from app.services.prontuario_service import ProntuarioService
+from app.utils.indice_invertido import IndiceInvertido
+from app.utils.texto import tokenizar
+
+
+def test_tokenizar_remove_acentos_caixa_e_palavras_vazias():
+    assert tokenizar("Cefaléia CRÔNICA há 3 dias, sem febre; pós-operatório") == [
+        "cefaleia", "cronica", "dias", "febre", "pos", "operatorio"
+    ]
+    assert tokenizar("de a e") == []
+    assert tokenizar(None) == []
+
+
+def test_busca_por_prefixo_exige_todos_os_termos():
+    indice = IndiceInvertido()
+    indice.garantir_carga(lambda: [
+        (1, ["cefaleia", "cronica"], {}),
+        (2, ["cefaleia", "aguda"], {}),
+        (3, ["lombalgia", "cronica"], {}),
+    ])
+
+    assert [doc_id for doc_id, _ in indice.buscar(tokenizar("Cefal"))] == [1, 2]
+    assert [doc_id for doc_id, _ in indice.buscar(tokenizar("cefaléia crôn"))] == [1]
+    assert indice.buscar(tokenizar("cefaleia lombar")) == []
+
+
+def test_ranqueamento_bm25():
+    indice = IndiceInvertido()
+    indice.garantir_carga(lambda: [
+        # Mais ocorrências do termo no mesmo tamanho de documento
+        (1, ["tosse", "tosse", "febre", "dor"], {}),
+        (2, ["tosse", "febre", "dor", "dor"], {}),
+        # Documento longo: o termo pesa menos
+        (3, ["tosse", "febre", "dor", "dor", "dor", "dor", "dor", "dor"], {}),
+        (4, ["febre", "dor"], {}),
+    ])
+
+    assert [doc_id for doc_id, _ in indice.buscar(["tosse"])] == [1, 2, 3]
+    # "tosse" é mais rara que "febre": o documento que a repete fica na frente
+    resultado = indice.buscar(["tosse", "febre"])
+    assert [doc_id for doc_id, _ in resultado] == [1, 2, 3]
+    assert resultado[0][1] > resultado[1][1] > resultado[2][1]
+
+
+def test_escritas_durante_a_carga_prevalecem():
+    indice = IndiceInvertido()
+
+    def fonte():
+        yield 1, ["antigo"], {}
+        # Escrita confirmada enquanto a carga ainda lia a linha antiga
+        indice.atualizar(1, ["novo"], {})
+        yield 2, ["outro"], {}
+
+    indice.garantir_carga(fonte)
+    assert indice.buscar(["antigo"]) == []
+    assert [doc_id for doc_id, _ in indice.buscar(["novo"])] == [1]
+
+
+def test_busca_respeita_o_acesso_de_cada_usuario(db, cliente, contas):
+    paciente, headers_paciente = contas.paciente()
+    outro, _ = contas.paciente()
+    profissional, headers_profissional = contas.profissional()
+    service = ProntuarioService(db)
+    proprio = service.create_prontuario(ProntuarioCreate(
+        paciente_id=paciente.id, queixa_principal="Xantelasma palpebral", diagnostico="Xantelasma"
+    ), profissional.id)
+    alheio = service.create_prontuario(ProntuarioCreate(
+        paciente_id=outro.id, queixa_principal="Xantelasma bilateral"
+    ), profissional.id)
+
+    resposta = cliente.get("/api/prontuarios/busca", params={"q": "xantel"}, headers=headers_profissional)
+    assert resposta.status_code == 200
+    # Profissionais veem o histórico de qualquer paciente; o termo repetido vem primeiro
+    assert [r["id"] for r in resposta.json()] == [proprio.id, alheio.id]
+
+    resposta = cliente.get("/api/prontuarios/busca", params={"q": "xantel"}, headers=headers_paciente)
+    assert resposta.status_code == 200
+    assert [r["id"] for r in resposta.json()] == [proprio.id]
+
+    resposta = cliente.get(
+        "/api/prontuarios/busca", params={"q": "xantel", "paciente_id": outro.id}, headers=headers_paciente
+    )
+    assert resposta.status_code == 403
+
+
+def test_busca_reflete_a_atualizacao_do_prontuario(db, contas):
+    paciente, _ = contas.paciente()
+    profissional, _ = contas.profissional()
+    service = ProntuarioService(db)
+    prontuario = service.create_prontuario(
+        ProntuarioCreate(paciente_id=paciente.id, diagnostico="Quelóide"), profissional.id
+    )
+    assert [r.id for r, _ in service.buscar_prontuarios("queloide")] == [prontuario.id]
+
+    service.update_prontuario(prontuario.id, ProntuarioUpdate(diagnostico="Cicatriz hipertrófica"), profissional.id)
+    assert service.buscar_prontuarios("queloide") == []
+    assert [r.id for r, _ in service.buscar_prontuarios("hipertrof")] == [prontuario.id]
@@ -0,0 +1,31 @@
+"""
+TTLCache: ``set`` com uma geração anterior à remoção da chave não grava, mesmo
+depois que a marca da remoção sai do limite de tamanho.
+"""
+
+from app.utils.cache import TTLCache
+
+
+def test_set_anterior_a_remocao_e_ignorado():
+    cache = TTLCache(maxsize=10, ttl=60)
+    geracao = cache.geracao()
+    cache.delete("a")
+
+    cache.set("a", "antigo", geracao)
+    cache.set("b", "b", geracao)
+    assert cache.get("a") is None
+    assert cache.get("b") == "b"
+
+
+def test_marcas_descartadas_por_tamanho_continuam_protegendo():
+    cache = TTLCache(maxsize=2, ttl=60)
+    geracao = cache.geracao()
+    for chave in ("a", "b", "c"):
+        cache.delete(chave)
+
+    # A marca de "a" já saiu do limite: a leitura anterior a ela é recusada assim mesmo
+    cache.set("a", "antigo", geracao)
+    assert cache.get("a") is None
+
+    cache.set("a", "novo", cache.geracao())
+    assert cache.get("a") == "novo"
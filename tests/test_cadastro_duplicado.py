@@ -0,0 +1,46 @@
+"""
+Mensagens de cadastro duplicado: CPF e CRM têm precedência sobre o email, como na
+verificação original feita antes de inserir o usuário.
+"""
+
+import pytest
+from fastapi import HTTPException
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.paciente_schemas import PacienteCreate
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate
+from app.services.paciente_service import PacienteService
+from app.services.profissional_service import ProfissionalSaudeService
+
+
+def _paciente(cpf: str, email: str) -> PacienteCreate:
+    return PacienteCreate(cpf=cpf, nome="Paciente Duplicado", email=email, senha="segredo")
+
+
+def _profissional(crm: str, email: str) -> ProfissionalSaudeCreate:
+    return ProfissionalSaudeCreate(
+        crm=crm, especialidade=EspecialidadeMedica.CARDIOLOGIA, nome="Profissional Duplicado", email=email, senha="segredo"
+    )
+
+
+def _detalhe(funcao, dados) -> str:
+    with pytest.raises(HTTPException) as erro:
+        funcao(dados)
+    assert erro.value.status_code == 400
+    return erro.value.detail
+
+
+def test_paciente_com_cpf_e_email_repetidos_reporta_cpf(db):
+    service = PacienteService(db)
+    service.create_paciente(_paciente("900.000.000-01", "dup-paciente@teste.com"))
+
+    assert _detalhe(service.create_paciente, _paciente("900.000.000-01", "dup-paciente@teste.com")) == "CPF já cadastrado no sistema"
+    assert _detalhe(service.create_paciente, _paciente("900.000.000-02", "dup-paciente@teste.com")) == "Email já cadastrado no sistema"
+    assert _detalhe(service.create_paciente, _paciente("900.000.000-01", "outro-paciente@teste.com")) == "CPF já cadastrado no sistema"
+
+
+def test_profissional_com_crm_e_email_repetidos_reporta_crm(db):
+    service = ProfissionalSaudeService(db)
+    service.create_profissional(_profissional("CRM-DUP-1", "dup-profissional@teste.com"))
+
+    assert _detalhe(service.create_profissional, _profissional("CRM-DUP-1", "dup-profissional@teste.com")) == "CRM já cadastrado no sistema"
+    assert _detalhe(service.create_profissional, _profissional("CRM-DUP-2", "dup-profissional@teste.com")) == "Email já cadastrado no sistema"
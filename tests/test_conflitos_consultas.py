@@ -0,0 +1,69 @@
+"""
+Conflitos de agenda: data_hora_fim é preenchida em toda escrita do ORM, e a
+verificação das duas agendas é uma única consulta ao banco.
+"""
+
+from datetime import datetime, timedelta
+from itertools import count
+import pytest
+from fastapi import HTTPException
+from app.config.database import engine
+from app.models.consulta import Consulta, StatusConsulta
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.consulta_schemas import ConsultaCreate
+from app.schemas.paciente_schemas import PacienteCreate
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate
+from app.services.consulta_service import ConsultaService
+from app.services.paciente_service import PacienteService
+from app.services.profissional_service import ProfissionalSaudeService
+from app.utils.query_stats import install_query_counter, query_budget
+
+_SUFIXOS = count(1)
+INICIO = (datetime.now() + timedelta(days=3)).replace(hour=14, minute=0, second=0, microsecond=0)
+
+
+@pytest.fixture
+def agendas(db):
+    n = next(_SUFIXOS)
+    pacientes = [
+        PacienteService(db).create_paciente(PacienteCreate(
+            cpf=f"500.000.00{n}-0{i}", nome=f"Paciente Conflito {i}", email=f"conflito-{n}-{i}@teste.com", senha="segredo"
+        ))
+        for i in (1, 2)
+    ]
+    profissional = ProfissionalSaudeService(db).create_profissional(ProfissionalSaudeCreate(
+        crm=f"CRM-CONFLITO-{n}", especialidade=EspecialidadeMedica.ORTOPEDIA, nome="Profissional Conflito",
+        email=f"conflito-profissional-{n}@teste.com", senha="segredo"
+    ))
+    return pacientes, profissional
+
+
+def test_consulta_gravada_fora_do_servico_tem_fim_e_conflita(db, agendas):
+    (paciente, outro), profissional = agendas
+    # Como em seed_database.py: gravada direto pelo ORM, sem passar por _check_conflitos
+    consulta = Consulta(paciente_id=paciente.id, profissional_id=profissional.id, data_hora=INICIO)
+    db.add(consulta)
+    db.commit()
+    assert consulta.data_hora_fim == INICIO + timedelta(minutes=consulta.duracao_minutos)
+
+    with pytest.raises(HTTPException) as erro:
+        ConsultaService(db).create_consulta(ConsultaCreate(
+            paciente_id=outro.id, profissional_id=profissional.id, data_hora=INICIO + timedelta(minutes=15)
+        ))
+    assert erro.value.status_code == 409
+    assert erro.value.detail == "Profissional já possui consulta nesse horário"
+
+    consulta.duracao_minutos = 90
+    db.commit()
+    assert consulta.data_hora_fim == INICIO + timedelta(minutes=90)
+
+
+def test_verificacao_das_duas_agendas_e_uma_consulta(db, agendas):
+    (paciente, _), profissional = agendas
+    install_query_counter(engine)
+    nova = Consulta(
+        paciente_id=paciente.id, profissional_id=profissional.id, data_hora=INICIO + timedelta(days=1),
+        duracao_minutos=30, status=StatusConsulta.AGENDADA
+    )
+    with query_budget(1):
+        ConsultaService(db)._check_conflitos(nova)
@@ -0,0 +1,47 @@
+"""
+Resumo do dashboard: as contagens mantidas a cada escrita de consulta são as
+mesmas que ``reconstruir`` recalcula a partir da tabela de consultas.
+"""
+
+from datetime import datetime, timedelta
+from app.models.consulta import StatusConsulta, TipoConsulta
+from app.schemas.consulta_schemas import ConsultaCreate, ConsultaUpdate
+from app.services.consulta_service import ConsultaService
+from app.services.dashboard_service import DashboardService
+
+INICIO = (datetime.now() + timedelta(days=10)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+
+def test_resumo_incremental_igual_ao_reconstruido(db, contas):
+    pacientes = [contas.paciente()[0] for _ in range(3)]
+    profissional, _ = contas.profissional()
+    service = ConsultaService(db)
+    consultas = [
+        service.create_consulta(ConsultaCreate(
+            paciente_id=paciente.id, profissional_id=profissional.id,
+            data_hora=INICIO + timedelta(days=dia, hours=indice), tipo_consulta=tipo
+        ))
+        for indice, paciente in enumerate(pacientes)
+        for dia, tipo in ((0, TipoConsulta.PRESENCIAL), (1, TipoConsulta.TELEMEDICINA), (2, TipoConsulta.PRESENCIAL))
+    ]
+
+    # Reagendar para outro dia, confirmar, editar, cancelar, reativar e concluir
+    service.update_consulta(consultas[0].id, ConsultaUpdate(data_hora=INICIO + timedelta(days=3)))
+    service.update_consulta(consultas[1].id, ConsultaUpdate(status=StatusConsulta.CONFIRMADA))
+    service.update_consulta(consultas[2].id, ConsultaUpdate(observacoes="Trazer exames"))
+    service.update_status_consulta(consultas[3].id, StatusConsulta.CANCELADA)
+    service.update_status_consulta(consultas[4].id, StatusConsulta.CANCELADA)
+    service.update_status_consulta(consultas[4].id, StatusConsulta.AGENDADA)
+    service.update_status_consulta(consultas[5].id, StatusConsulta.CONCLUIDA)
+
+    dashboard = DashboardService(db)
+    periodo = dict(inicio=INICIO.date(), fim=INICIO.date() + timedelta(days=5), profissional_id=profissional.id)
+    antes = dashboard.get_dashboard(**periodo)
+    assert antes["total"] == 9
+    assert antes["por_status"]["cancelada"] == 1
+    assert antes["por_status"]["concluida"] == 1
+    assert antes["por_tipo"]["telemedicina"] == 3
+    assert dict(antes["por_dia"])[INICIO.date() + timedelta(days=3)] == 1
+
+    dashboard.reconstruir(periodo["inicio"], periodo["fim"])
+    assert dashboard.get_dashboard(**periodo) == antes
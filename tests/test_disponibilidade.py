@@ -0,0 +1,41 @@
+"""
+Bitmaps de horários livres: uma leitura que consultou o banco antes de uma escrita
+não pode gravar no índice o bitmap calculado com o estado antigo.
+"""
+
+from app.services.disponibilidade_service import AgendaLivre, DisponibilidadeIndex
+from app.utils.horarios import parse_horario_atendimento
+
+
+def _indice() -> DisponibilidadeIndex:
+    return DisponibilidadeIndex(slot_minutos=30, dias=7, ttl=60)
+
+
+def _agenda(indice: DisponibilidadeIndex) -> AgendaLivre:
+    return AgendaLivre(indice.janela()[0], parse_horario_atendimento(None), indice.slot_minutos, indice.dias)
+
+
+def test_set_sem_escrita_intermediaria_guarda_bitmap():
+    indice = _indice()
+    versao = indice.versao()
+    indice.set(1, _agenda(indice), versao)
+    assert indice.get(1) is not None
+
+
+def test_escrita_depois_da_leitura_descarta_bitmap():
+    indice = _indice()
+    inicio = indice.janela()[0]
+    versao = indice.versao()
+
+    # Consulta confirmada enquanto a leitura montava o bitmap: ainda não havia o que atualizar
+    indice.ocupar(1, inicio, inicio)
+    indice.set(1, _agenda(indice), versao)
+    assert indice.get(1) is None
+
+
+def test_escrita_em_outro_profissional_nao_descarta_bitmap():
+    indice = _indice()
+    versao = indice.versao()
+    indice.invalidar(2)
+    indice.set(1, _agenda(indice), versao)
+    assert indice.get(1) is not None
@@ -0,0 +1,51 @@
+"""
+Cache de perfis: uma leitura que viu a linha antes de uma escrita não a regrava
+depois da invalidação feita no commit dessa escrita.
+"""
+
+from app.config.database import SessionLocal
+from app.models.paciente import Paciente
+from app.schemas.paciente_schemas import PacienteCreate
+from app.services.paciente_service import PacienteService
+from app.utils.entity_cache import EntityCache, MemoryCacheBackend, entity_cache
+
+
+def _paciente(db, cpf: str, email: str) -> Paciente:
+    return PacienteService(db).create_paciente(PacienteCreate(cpf=cpf, nome="Paciente Cache", email=email, senha="segredo"))
+
+
+def test_set_com_geracao_anterior_a_invalidacao_e_ignorado(db):
+    paciente = _paciente(db, "600.000.000-01", "cache-unidade@teste.com")
+    cache = EntityCache(MemoryCacheBackend(maxsize=10, ttl=60))
+
+    geracao = cache.geracao()
+    cache.invalidate(Paciente, paciente.id)
+    cache.set(paciente, geracao)
+    assert cache.get(Paciente, paciente.id) is None
+
+    cache.set(paciente, cache.geracao())
+    assert cache.get(Paciente, paciente.id).cpf == paciente.cpf
+
+
+def test_escrita_durante_leitura_nao_fica_em_cache(db, monkeypatch):
+    paciente_id = _paciente(db, "600.000.000-02", "cache-corrida@teste.com").id
+    entity_cache.invalidate(Paciente, paciente_id)
+    carregar = PacienteService._load_paciente
+
+    def carregar_e_alterar(self, paciente_id):
+        # A leitura vê o telefone antigo; a escrita confirma antes de o perfil ser guardado
+        lido = carregar(self, paciente_id)
+        outra = SessionLocal()
+        outra.get(Paciente, paciente_id).telefone = "(11) 90000-0000"
+        outra.commit()
+        outra.close()
+        return lido
+
+    monkeypatch.setattr(PacienteService, "_load_paciente", carregar_e_alterar)
+    sessao = SessionLocal()
+    try:
+        PacienteService(sessao).get_paciente_by_id(paciente_id)
+    finally:
+        sessao.close()
+
+    assert entity_cache.get(Paciente, paciente_id) is None
@@ -0,0 +1,86 @@
+"""
+Revalidação com If-None-Match: o cliente com a versão atual recebe 304 sem corpo,
+qualquer alteração (inclusive do nome, guardado em users) gera outro ETag e a
+permissão é verificada antes do 304.
+"""
+
+from datetime import datetime, timedelta
+from app.schemas.consulta_schemas import ConsultaCreate
+from app.services.consulta_service import ConsultaService
+from app.utils.etag import etag_matches
+from app.utils.pagination import encode_cursor
+
+INICIO = (datetime.now() + timedelta(days=40)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+
+def test_comparacao_fraca_do_if_none_match():
+    etag = '"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"xyz", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
+
+
+def _revalidar(cliente, url: str, headers: dict, etag: str, **params):
+    return cliente.get(url, params=params, headers={**headers, "If-None-Match": etag})
+
+
+def test_paciente(cliente, contas):
+    paciente, headers = contas.paciente()
+    url = f"/api/pacientes/{paciente.id}"
+    etag = cliente.get(url, headers=headers).headers["ETag"]
+
+    resposta = _revalidar(cliente, url, headers, etag)
+    assert resposta.status_code == 304
+    assert resposta.headers["ETag"] == etag
+    assert resposta.content == b""
+
+    assert cliente.put(url, json={"nome": "Paciente Renomeado"}, headers=headers).status_code == 200
+    resposta = _revalidar(cliente, url, headers, etag)
+    assert resposta.status_code == 200
+    assert resposta.json()["nome"] == "Paciente Renomeado"
+    assert resposta.headers["ETag"] != etag
+    assert _revalidar(cliente, url, headers, resposta.headers["ETag"]).status_code == 304
+
+
+def test_consulta_verifica_acesso_antes_do_304(db, cliente, contas):
+    paciente, headers_paciente = contas.paciente()
+    _, headers_outro = contas.paciente()
+    profissional, _ = contas.profissional()
+    consulta = ConsultaService(db).create_consulta(
+        ConsultaCreate(paciente_id=paciente.id, profissional_id=profissional.id, data_hora=INICIO)
+    )
+    url = f"/api/consultas/{consulta.id}"
+    etag = cliente.get(url, headers=headers_paciente).headers["ETag"]
+
+    assert _revalidar(cliente, url, headers_paciente, etag).status_code == 304
+    assert _revalidar(cliente, url, headers_outro, etag).status_code == 403
+
+    # O nome do profissional faz parte da resposta da consulta
+    resposta = cliente.put(
+        f"/api/profissionais/{profissional.id}", json={"nome": "Profissional Renomeado"}, headers=contas.admin()
+    )
+    assert resposta.status_code == 200
+    resposta = _revalidar(cliente, url, headers_paciente, etag)
+    assert resposta.status_code == 200
+    assert resposta.json()["profissional_nome"] == "Profissional Renomeado"
+
+
+def test_pagina_de_profissionais(cliente, contas):
+    primeiro, headers = contas.profissional()
+    segundo, _ = contas.profissional()
+    # Página que começa no primeiro, independente dos profissionais dos outros testes
+    pagina = {"cursor": encode_cursor(primeiro.id - 1), "limit": 2}
+    resposta = cliente.get("/api/profissionais/", params=pagina, headers=headers)
+    assert [p["id"] for p in resposta.json()] == [primeiro.id, segundo.id]
+    etag = resposta.headers["ETag"]
+
+    assert _revalidar(cliente, "/api/profissionais/", headers, etag, **pagina).status_code == 304
+
+    resposta = cliente.put(f"/api/profissionais/{segundo.id}", json={"telefone": "(11) 3000-0000"}, headers=contas.admin())
+    assert resposta.status_code == 200
+    resposta = _revalidar(cliente, "/api/profissionais/", headers, etag, **pagina)
+    assert resposta.status_code == 200
+    assert resposta.json()[1]["telefone"] == "(11) 3000-0000"
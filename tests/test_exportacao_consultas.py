@@ -0,0 +1,97 @@
+"""
+Exportação de consultas em CSV e NDJSON: o resultado é lido e enviado em lotes,
+na ordem de horário, com os filtros de período e status.
+"""
+
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from itertools import count
+from app.models.consulta import Consulta, StatusConsulta
+from app.services.consulta_service import ConsultaService
+from app.utils.exportacao import exportar
+
+# Um dia por teste, fora das datas usadas pelos demais testes
+_DIAS = count()
+STATUS = (StatusConsulta.AGENDADA, StatusConsulta.CANCELADA, StatusConsulta.AGENDADA, StatusConsulta.CONCLUIDA, StatusConsulta.AGENDADA)
+
+
+def _consultas(db, contas):
+    """Consultas de um dia só deste teste, em ordem de horário, e o período delas"""
+    inicio = datetime(2031, 5, 5, 8) + timedelta(days=next(_DIAS))
+    paciente, _ = contas.paciente("Paciente, com \"aspas\"")
+    profissional, _ = contas.profissional()
+    consultas = [
+        Consulta(
+            paciente_id=paciente.id, profissional_id=profissional.id, status=status,
+            data_hora=inicio + timedelta(hours=indice), observacoes=f"Linha {indice}\ncom quebra"
+        )
+        for indice, status in enumerate(STATUS)
+    ]
+    # Gravadas fora de ordem: a exportação ordena pelo horário
+    db.add_all(reversed(consultas))
+    db.commit()
+    return consultas, {"inicio": inicio.isoformat(), "fim": (inicio + timedelta(days=1)).isoformat()}
+
+
+def _blocos(gerador) -> list:
+    if hasattr(gerador, "__aiter__"):
+        async def coletar():
+            return [bloco async for bloco in gerador]
+        return asyncio.run(coletar())
+    return list(gerador)
+
+
+def test_exportacao_em_lotes(db, contas):
+    consultas, _ = _consultas(db, contas)
+    ids = [c.id for c in consultas]
+    stmt = ConsultaService.export_statement(consultas[0].data_hora, consultas[-1].data_hora + timedelta(hours=1))
+
+    blocos = _blocos(exportar(stmt, "ndjson", batch_size=2))
+    # Um bloco por lote de 2 linhas, cada um com linhas inteiras
+    assert [bloco.count("\n") for bloco in blocos] == [2, 2, 1]
+    assert [json.loads(linha)["id"] for bloco in blocos for linha in bloco.splitlines()] == ids
+
+    blocos = _blocos(exportar(stmt, "csv", batch_size=2))
+    assert blocos[0].startswith("id,paciente_id,paciente_nome,")
+    assert len(blocos) == 4
+
+
+def test_endpoint_ndjson(db, cliente, contas):
+    consultas, periodo = _consultas(db, contas)
+
+    with cliente.stream("GET", "/api/consultas/exportar", params=periodo, headers=contas.admin()) as resposta:
+        assert resposta.status_code == 200
+        assert resposta.headers["content-type"] == "application/x-ndjson"
+        assert resposta.headers["content-disposition"] == 'attachment; filename="consultas.ndjson"'
+        linhas = [json.loads(linha) for linha in resposta.iter_lines() if linha]
+
+    assert [linha["id"] for linha in linhas] == [c.id for c in consultas]
+    assert linhas[0]["data_hora"] == consultas[0].data_hora.isoformat()
+    assert linhas[0]["status"] == "agendada"
+    assert linhas[0]["especialidade"] == "clinico_geral"
+    assert linhas[0]["paciente_nome"] == 'Paciente, com "aspas"'
+
+
+def test_endpoint_csv_com_filtro_de_status(db, cliente, contas):
+    consultas, periodo = _consultas(db, contas)
+    params = {**periodo, "formato": "csv", "status": "agendada"}
+
+    resposta = cliente.get("/api/consultas/exportar", params=params, headers=contas.admin())
+    assert resposta.status_code == 200
+    assert resposta.headers["content-type"] == "text/csv; charset=utf-8"
+    linhas = list(csv.DictReader(io.StringIO(resposta.text)))
+
+    assert [int(linha["id"]) for linha in linhas] == [c.id for c in consultas if c.status == StatusConsulta.AGENDADA]
+    assert {linha["status"] for linha in linhas} == {"agendada"}
+    # Vírgulas, aspas e quebras de linha ficam dentro do campo
+    assert linhas[0]["paciente_nome"] == 'Paciente, com "aspas"'
+    assert linhas[0]["observacoes"].endswith("\ncom quebra")
+
+
+def test_apenas_admin_exporta(cliente, contas):
+    _, headers = contas.profissional()
+    assert cliente.get("/api/consultas/exportar", headers=headers).status_code == 403
+    assert cliente.get("/api/consultas/exportar", params={"formato": "xml"}, headers=contas.admin()).status_code == 422
@@ -0,0 +1,72 @@
+"""
+If-Match sob concorrência: das requisições que leram a mesma versão, só uma grava;
+as demais recebem 412. O ETag devolvido pelo PUT é o mesmo que o GET passa a servir.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from app.models.profissional_saude import EspecialidadeMedica
+from app.schemas.consulta_schemas import ConsultaCreate
+from app.schemas.paciente_schemas import PacienteCreate
+from app.schemas.profissional_schemas import ProfissionalSaudeCreate
+from app.services.consulta_service import ConsultaService
+from app.services.paciente_service import PacienteService
+from app.services.profissional_service import ProfissionalSaudeService
+from main import app
+import seed_database
+
+REQUISICOES = 8
+
+
+def _consulta(db) -> int:
+    seed_database.seed_admin(db)
+    paciente = PacienteService(db).create_paciente(
+        PacienteCreate(cpf="800.000.000-01", nome="Paciente Disputa", email="disputa-paciente@teste.com", senha="segredo")
+    )
+    profissional = ProfissionalSaudeService(db).create_profissional(ProfissionalSaudeCreate(
+        crm="CRM-DISPUTA", especialidade=EspecialidadeMedica.DERMATOLOGIA, nome="Profissional Disputa",
+        email="disputa-profissional@teste.com", senha="segredo"
+    ))
+    data_hora = (datetime.now() + timedelta(days=2)).replace(hour=9, minute=0, second=0, microsecond=0)
+    consulta = ConsultaService(db).create_consulta(
+        ConsultaCreate(paciente_id=paciente.id, profissional_id=profissional.id, data_hora=data_hora)
+    )
+    return consulta.id
+
+
+def _login(client: TestClient) -> dict:
+    resposta = client.post("/api/auth/login", json={"email": "admin1@admin.com", "senha": "admin"})
+    return {"Authorization": "Bearer " + resposta.json()["access_token"]}
+
+
+def test_puts_concorrentes_com_mesmo_if_match(db):
+    consulta_id = _consulta(db)
+    client = TestClient(app)
+    headers = _login(client)
+    url = f"/api/consultas/{consulta_id}"
+    etag = client.get(url, headers=headers).headers["ETag"]
+
+    barreira = threading.Barrier(REQUISICOES)
+    respostas = [None] * REQUISICOES
+
+    def atualizar(indice: int):
+        cliente = TestClient(app)
+        barreira.wait()
+        respostas[indice] = cliente.put(
+            url, headers={**headers, "If-Match": etag}, json={"observacoes": f"requisição {indice}"}
+        )
+
+    threads = [threading.Thread(target=atualizar, args=(indice,)) for indice in range(REQUISICOES)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    codigos = sorted(resposta.status_code for resposta in respostas)
+    assert codigos == [200] + [412] * (REQUISICOES - 1)
+
+    [vencedora] = [resposta for resposta in respostas if resposta.status_code == 200]
+    atual = client.get(url, headers=headers)
+    assert atual.json()["observacoes"] == vencedora.json()["observacoes"]
+    assert vencedora.headers["ETag"] == atual.headers["ETag"]
@@ -0,0 +1,83 @@
+"""
+Importação de pacientes em CSV e NDJSON: o relatório aponta a linha de cada erro,
+e um cadastro concorrente recusa só a linha em conflito, não o lote inteiro.
+"""
+
+import json
+from itertools import count
+from app.services.paciente_service import PacienteService
+
+_SUFIXOS = count(1)
+
+
+def _importar(cliente, headers, corpo: str, content_type: str) -> dict:
+    resposta = cliente.post("/api/pacientes/importar", content=corpo.encode(), headers={**headers, "Content-Type": content_type})
+    assert resposta.status_code == 200, resposta.text
+    return resposta.json()
+
+
+def _erros(resultado: dict) -> dict:
+    return {erro["linha"]: erro["erro"] for erro in resultado["erros"]}
+
+
+def test_relatorio_de_erros_do_csv(cliente, contas):
+    n = next(_SUFIXOS)
+    existente, _ = contas.paciente()
+    corpo = "\n".join([
+        "nome,email,senha,cpf,telefone",
+        f"Ana CSV,ana-csv-{n}@teste.com,segredo,700.{n:03d}.000-01,(11) 99999-0001",
+        f"Bruno CSV,bruno-csv-{n}@teste.com,segredo,,",
+        "",
+        f"Carla CSV,carla-csv-{n}@teste.com,segredo",
+        f"Ana Repetida,ana-csv-{n}@teste.com,segredo,700.{n:03d}.000-02,",
+        f"Daniel CSV,{existente.user.email},segredo,700.{n:03d}.000-03,",
+        f"Elisa CSV,elisa-csv-{n}@teste.com,segredo,{existente.cpf},",
+        f"Fábio CSV,fabio-csv-{n}@teste.com,segredo,700.{n:03d}.000-04,",
+    ])
+
+    resultado = _importar(cliente, contas.admin(), corpo, "text/csv")
+    assert (resultado["total"], resultado["importados"]) == (7, 2)
+    erros = _erros(resultado)
+    assert sorted(erros) == [3, 5, 6, 7, 8]
+    assert erros[3].startswith("cpf:")
+    assert erros[5] == "Quantidade de colunas diferente do cabeçalho"
+    assert erros[6] == erros[7] == "Email já cadastrado no sistema"
+    assert erros[8] == "CPF já cadastrado no sistema"
+
+
+def test_relatorio_de_erros_do_ndjson(cliente, contas):
+    n = next(_SUFIXOS)
+    linhas = [
+        json.dumps({"nome": "Ana NDJSON", "email": f"ana-ndjson-{n}@teste.com", "senha": "segredo", "cpf": f"710.{n:03d}.000-01"}),
+        "{nao e json",
+        json.dumps(["lista"]),
+        json.dumps({"nome": "Sem Email", "senha": "segredo", "cpf": f"710.{n:03d}.000-02"}),
+        json.dumps({"nome": "Ana de Novo", "email": f"ana-ndjson-{n}@teste.com", "senha": "segredo", "cpf": f"710.{n:03d}.000-03"}),
+    ]
+
+    resultado = _importar(cliente, contas.admin(), "\n".join(linhas) + "\n", "application/x-ndjson")
+    assert (resultado["total"], resultado["importados"]) == (5, 1)
+    erros = _erros(resultado)
+    assert erros[2] == "JSON inválido"
+    assert erros[3] == "Cada linha deve conter um objeto JSON"
+    assert erros[4].startswith("email:")
+    assert erros[5] == "Email já cadastrado no sistema"
+
+
+def test_cadastro_concorrente_recusa_so_a_linha_em_conflito(db, cliente, contas, monkeypatch):
+    n = next(_SUFIXOS)
+    headers = contas.admin()
+    existente, _ = contas.paciente()
+    # A verificação não vê o cadastro, como se ele tivesse sido confirmado logo depois dela
+    monkeypatch.setattr(PacienteService, "find_import_conflicts", lambda self, lote: {})
+
+    linhas = [
+        json.dumps({"nome": f"Paciente Lote {i}", "email": f"lote-{n}-{i}@teste.com", "senha": "segredo", "cpf": f"720.{n:03d}.000-{i:02d}"})
+        for i in range(1, 4)
+    ]
+    linhas.insert(1, json.dumps({"nome": "Concorrente", "email": existente.user.email, "senha": "segredo", "cpf": f"720.{n:03d}.000-99"}))
+
+    resultado = _importar(cliente, headers, "\n".join(linhas), "application/x-ndjson")
+    assert (resultado["total"], resultado["importados"]) == (4, 3)
+    assert _erros(resultado) == {2: "CPF ou email cadastrado durante a importação"}
+    assert len(PacienteService(db).buscar_pacientes(f"720.{n:03d}")) == 3
@@ -0,0 +1,101 @@
+"""
+Regressão dos planos de execução das consultas de ``consultas``.
+
+Captura as instruções geradas pelo ConsultaService e verifica, com EXPLAIN QUERY
+PLAN (SQLite) ou EXPLAIN (MariaDB), que usam os índices compostos e que nenhuma
+percorre a tabela inteira.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List, Tuple
+
+import pytest
+from sqlalchemy import event
+from app.config.database import engine
+from app.models.consulta import Consulta
+from app.services.consulta_service import ConsultaService
+
+# SQLite: "SCAN consultas" sem "USING ... INDEX" é uma leitura completa da tabela
+_SCAN_COMPLETO = re.compile(r"^SCAN consultas(?! USING (COVERING )?INDEX)")
+
+
+@contextmanager
+def capturar() -> Iterator[List[Tuple[str, tuple]]]:
+    """Instruções (SQL, parâmetros) enviadas ao driver dentro do bloco"""
+    instrucoes = []
+
+    def guardar(conn, cursor, statement, parameters, context, executemany):
+        instrucoes.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", guardar)
+    try:
+        yield instrucoes
+    finally:
+        event.remove(engine, "before_cursor_execute", guardar)
+
+
+def planos(instrucoes: List[Tuple[str, tuple]]) -> List[List[Tuple[str, str]]]:
+    """Para cada instrução, os acessos à tabela consultas: ``(índice, detalhe)``"""
+    resultado = []
+    with engine.connect() as conexao:
+        for statement, parameters in instrucoes:
+            if engine.dialect.name == "sqlite":
+                linhas = conexao.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+                acessos = []
+                for linha in linhas:
+                    detalhe = linha[-1]
+                    if " consultas " in f" {detalhe} ":
+                        assert not _SCAN_COMPLETO.match(detalhe), f"leitura completa de consultas: {detalhe}"
+                        indice = re.search(r"INDEX (\w+)", detalhe)
+                        acessos.append((indice.group(1) if indice else None, detalhe))
+            else:
+                linhas = conexao.exec_driver_sql("EXPLAIN " + statement, parameters).mappings().all()
+                acessos = []
+                for linha in linhas:
+                    if linha["table"] == "consultas":
+                        assert linha["type"] != "ALL", f"leitura completa de consultas: {dict(linha)}"
+                        acessos.append((linha["key"], str(dict(linha))))
+            resultado.append(acessos)
+    return resultado
+
+
+def indices_usados(instrucoes) -> List[str]:
+    return [indice for acessos in planos(instrucoes) for indice, _ in acessos]
+
+
+def test_historico_do_paciente_usa_indice_paciente_data(db):
+    with capturar() as instrucoes:
+        ConsultaService(db).get_consultas_by_paciente(1, limit=20)
+    assert indices_usados(instrucoes) == ["ix_consultas_paciente_id_data_hora"]
+
+
+def test_agenda_do_profissional_usa_indice_profissional_data(db):
+    with capturar() as instrucoes:
+        ConsultaService(db).get_consultas_by_profissional(1, limit=20)
+    assert indices_usados(instrucoes) == ["ix_consultas_profissional_id_data_hora"]
+
+
+def test_listagem_geral_percorre_o_indice_de_data(db):
+    with capturar() as instrucoes:
+        ConsultaService(db).get_all_consultas(limit=20)
+    assert indices_usados(instrucoes) == ["ix_consultas_data_hora"]
+
+
+def test_verificacao_de_conflitos_usa_as_duas_agendas(db):
+    consulta = Consulta(paciente_id=1, profissional_id=1, data_hora=datetime(2030, 1, 7, 10), duracao_minutos=30)
+    with capturar() as instrucoes:
+        ConsultaService(db)._check_conflitos(consulta)
+    assert indices_usados(instrucoes) == [
+        "ix_consultas_profissional_id_data_hora",
+        "ix_consultas_paciente_id_data_hora",
+    ]
+
+
+def test_plano_detecta_leitura_completa(db):
+    """Sanidade do próprio teste: um filtro sem índice precisa ser reprovado"""
+    with capturar() as instrucoes:
+        db.query(Consulta.id).filter(Consulta.observacoes == "x").all()
+    with pytest.raises(AssertionError, match="leitura completa"):
+        planos(instrucoes)
@@ -0,0 +1,98 @@
+"""
+Leituras em lote (?ids=1,2,3): ordem pedida, IDs inexistentes omitidos, mesmas
+permissões da leitura individual e número de consultas que não cresce com o lote.
+"""
+
+from datetime import datetime, timedelta
+from app.config.settings import BATCH_MAX_IDS
+from app.models.paciente import Paciente
+from app.models.profissional_saude import ProfissionalSaude
+from app.schemas.consulta_schemas import ConsultaCreate
+from app.services.consulta_service import ConsultaService
+from app.utils.entity_cache import entity_cache
+from app.utils.query_stats import query_budget, track_queries
+
+INEXISTENTE = 10 ** 9
+INICIO = (datetime.now() + timedelta(days=20)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+
+def _ids(*ids) -> dict:
+    return {"ids": ",".join(str(i) for i in ids)}
+
+
+def test_pacientes_em_lote(cliente, contas):
+    (primeiro, headers_primeiro), (segundo, _) = contas.paciente(), contas.paciente()
+    headers_admin = contas.admin()
+
+    resposta = cliente.get("/api/pacientes/lote", params=_ids(segundo.id, INEXISTENTE, primeiro.id, segundo.id), headers=headers_admin)
+    assert resposta.status_code == 200
+    assert [p["id"] for p in resposta.json()] == [segundo.id, primeiro.id]
+
+    # Paciente só lê os próprios dados, mesmo que o resto do lote não exista
+    resposta = cliente.get("/api/pacientes/lote", params=_ids(primeiro.id, INEXISTENTE), headers=headers_primeiro)
+    assert resposta.status_code == 403
+    resposta = cliente.get("/api/pacientes/lote", params=_ids(primeiro.id), headers=headers_primeiro)
+    assert [p["id"] for p in resposta.json()] == [primeiro.id]
+    resposta = cliente.get("/api/pacientes/lote", params=_ids(primeiro.id, segundo.id), headers=headers_primeiro)
+    assert resposta.status_code == 403
+
+
+def test_ids_invalidos(cliente, contas):
+    headers = contas.admin()
+    assert cliente.get("/api/pacientes/lote", params={"ids": "1,a"}, headers=headers).status_code == 400
+    assert cliente.get("/api/pacientes/lote", params={"ids": ","}, headers=headers).status_code == 400
+    excesso = _ids(*range(1, BATCH_MAX_IDS + 2))
+    assert cliente.get("/api/profissionais/lote", params=excesso, headers=headers).status_code == 400
+
+
+def test_profissionais_em_lote(cliente, contas):
+    (primeiro, _), (segundo, headers) = contas.profissional(), contas.profissional()
+
+    resposta = cliente.get("/api/profissionais/lote", params=_ids(INEXISTENTE, segundo.id, primeiro.id), headers=headers)
+    assert resposta.status_code == 200
+    assert [p["id"] for p in resposta.json()] == [segundo.id, primeiro.id]
+
+
+def test_consultas_em_lote(db, cliente, contas):
+    (paciente, headers_paciente), (outro, _) = contas.paciente(), contas.paciente()
+    (profissional, headers_profissional), (colega, _) = contas.profissional(), contas.profissional()
+    service = ConsultaService(db)
+    propria, alheia, do_colega = (
+        service.create_consulta(ConsultaCreate(
+            paciente_id=p.id, profissional_id=prof.id, data_hora=INICIO + timedelta(hours=hora)
+        )).id
+        for hora, p, prof in ((0, paciente, profissional), (1, outro, profissional), (2, paciente, colega))
+    )
+
+    resposta = cliente.get("/api/consultas/lote", params=_ids(alheia, INEXISTENTE, propria), headers=headers_profissional)
+    assert resposta.status_code == 200
+    assert [c["id"] for c in resposta.json()] == [alheia, propria]
+    # Uma consulta de outro profissional nega o lote inteiro
+    assert cliente.get("/api/consultas/lote", params=_ids(propria, do_colega), headers=headers_profissional).status_code == 403
+
+    resposta = cliente.get("/api/consultas/lote", params=_ids(do_colega, propria), headers=headers_paciente)
+    assert [c["id"] for c in resposta.json()] == [do_colega, propria]
+    assert cliente.get("/api/consultas/lote", params=_ids(propria, alheia), headers=headers_paciente).status_code == 403
+
+
+def test_consultas_do_lote_nao_crescem_com_o_tamanho(cliente, contas, contador_de_consultas):
+    headers = contas.admin()
+    pacientes = [contas.paciente()[0].id for _ in range(20)]
+    profissionais = [contas.profissional()[0].id for _ in range(20)]
+
+    for url, model, ids in (
+        ("/api/pacientes/lote", Paciente, pacientes),
+        ("/api/profissionais/lote", ProfissionalSaude, profissionais),
+    ):
+        def ler(quantidade: int):
+            # Sem o cache de perfis, para que todos os IDs venham do banco
+            for entity_id in ids:
+                entity_cache.invalidate(model, entity_id)
+            resposta = cliente.get(url, params=_ids(*ids[:quantidade]), headers=headers)
+            assert len(resposta.json()) == quantidade
+
+        with track_queries() as poucos:
+            ler(2)
+        assert poucos.queries > 0
+        with query_budget(poucos.queries, limiar_n1=3):
+            ler(len(ids))
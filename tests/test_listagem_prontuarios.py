@@ -0,0 +1,84 @@
+"""
+Listagem e linha do tempo de prontuários: cada tipo de usuário vê apenas o que
+pode, o tamanho da página é limitado e o conteúdo clínico completo não é lido.
+"""
+
+import re
+from app.models.prontuario import CAMPOS_CLINICOS
+from app.schemas.prontuario_schemas import ProntuarioCreate
+from app.services.prontuario_service import ProntuarioService
+from tests.test_indices_consultas import capturar
+
+TEXTO_LONGO = "Cefaleia " * 100
+
+
+def _registrar(db, contas):
+    paciente, headers_paciente = contas.paciente()
+    outro, _ = contas.paciente()
+    autor, headers_autor = contas.profissional()
+    colega, _ = contas.profissional()
+    service = ProntuarioService(db)
+    ids = {
+        "autor_paciente": service.create_prontuario(ProntuarioCreate(
+            paciente_id=paciente.id, queixa_principal=TEXTO_LONGO, prescricao="Dipirona"
+        ), autor.id).id,
+        "autor_outro": service.create_prontuario(ProntuarioCreate(paciente_id=outro.id), autor.id).id,
+        "colega_paciente": service.create_prontuario(ProntuarioCreate(paciente_id=paciente.id), colega.id).id,
+    }
+    return paciente, outro, headers_paciente, headers_autor, ids
+
+
+def test_listagem_filtra_por_tipo_de_usuario(db, cliente, contas):
+    paciente, outro, headers_paciente, headers_autor, ids = _registrar(db, contas)
+
+    resposta = cliente.get("/api/prontuarios/", headers=headers_paciente)
+    assert resposta.status_code == 200
+    assert sorted(p["id"] for p in resposta.json()) == sorted([ids["autor_paciente"], ids["colega_paciente"]])
+
+    # Profissional lista os prontuários que registrou
+    resposta = cliente.get("/api/prontuarios/", headers=headers_autor)
+    assert sorted(p["id"] for p in resposta.json()) == sorted([ids["autor_paciente"], ids["autor_outro"]])
+
+    resposta = cliente.get("/api/prontuarios/", params={"limit": 500}, headers=contas.admin())
+    assert set(ids.values()) <= {p["id"] for p in resposta.json()}
+
+
+def test_linha_do_tempo_do_paciente(db, cliente, contas):
+    paciente, outro, headers_paciente, headers_autor, ids = _registrar(db, contas)
+
+    resposta = cliente.get(f"/api/prontuarios/paciente/{paciente.id}", headers=headers_paciente)
+    assert resposta.status_code == 200
+    assert sorted(p["id"] for p in resposta.json()) == sorted([ids["autor_paciente"], ids["colega_paciente"]])
+
+    assert cliente.get(f"/api/prontuarios/paciente/{outro.id}", headers=headers_paciente).status_code == 403
+
+    # Profissionais veem o histórico completo, inclusive o registrado por colegas
+    resposta = cliente.get(f"/api/prontuarios/paciente/{paciente.id}", headers=headers_autor)
+    assert sorted(p["id"] for p in resposta.json()) == sorted([ids["autor_paciente"], ids["colega_paciente"]])
+
+
+def test_limite_da_pagina(db, cliente, contas):
+    paciente, _, headers_paciente, _, _ = _registrar(db, contas)
+
+    for url in ("/api/prontuarios/", f"/api/prontuarios/paciente/{paciente.id}"):
+        assert cliente.get(url, params={"limit": 501}, headers=headers_paciente).status_code == 422
+        assert cliente.get(url, params={"limit": 0}, headers=headers_paciente).status_code == 422
+        assert cliente.get(url, params={"skip": -1}, headers=headers_paciente).status_code == 422
+
+        resposta = cliente.get(url, params={"limit": 1}, headers=headers_paciente)
+        assert len(resposta.json()) == 1
+        assert "X-Next-Cursor" in resposta.headers
+
+
+def test_resumos_nao_leem_o_conteudo_clinico(db, contas):
+    paciente, _, _, _, ids = _registrar(db, contas)
+
+    with capturar() as instrucoes:
+        [resumo, _] = sorted(ProntuarioService(db).get_prontuarios_by_paciente(paciente.id), key=lambda p: p.id)
+
+    # Queixa e diagnóstico só aparecem cortados em RESUMO_CARACTERES
+    sql = re.sub(r"substr\(prontuarios\.\w+", "", " ".join(statement for statement, _ in instrucoes))
+    for campo in CAMPOS_CLINICOS + ("texto_busca",):
+        assert f"prontuarios.{campo}" not in sql
+    assert resumo.id == ids["autor_paciente"]
+    assert resumo.queixa_principal_resumo == TEXTO_LONGO[:200]
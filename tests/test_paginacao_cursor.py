@@ -0,0 +1,83 @@
+"""
+Paginação por cursor (keyset): seguir X-Next-Cursor percorre a listagem inteira,
+sem repetir nem pular linhas, mesmo com empates na data e inserções no meio.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from fastapi import HTTPException
+from app.models.consulta import Consulta, StatusConsulta
+from app.utils.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor
+
+INICIO = (datetime.now() + timedelta(days=30)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+
+def test_cursor_ida_e_volta():
+    cursor = encode_cursor(INICIO, 42)
+    assert decode_cursor(cursor, datetime, int) == (INICIO, 42)
+
+    for invalido in ("@@@", encode_cursor(INICIO), encode_cursor("ontem", 42)):
+        with pytest.raises(HTTPException) as erro:
+            decode_cursor(invalido, datetime, int)
+        assert erro.value.status_code == 400
+
+
+def _consultas(db, paciente_id: int, profissional_id: int, horarios) -> None:
+    # Gravadas direto pelo ORM: canceladas podem dividir o mesmo horário
+    for data_hora in horarios:
+        db.add(Consulta(
+            paciente_id=paciente_id, profissional_id=profissional_id, data_hora=data_hora,
+            status=StatusConsulta.CANCELADA
+        ))
+    db.commit()
+
+
+def _percorrer(cliente, headers, limit: int):
+    ids, cursor, paginas = [], None, 0
+    while True:
+        params = {"limit": limit} if cursor is None else {"limit": limit, "cursor": cursor}
+        resposta = cliente.get("/api/consultas/", params=params, headers=headers)
+        assert resposta.status_code == 200
+        paginas += 1
+        ids += [c["id"] for c in resposta.json()]
+        cursor = resposta.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids, paginas
+
+
+def test_seguir_o_cursor_percorre_tudo_na_ordem(db, cliente, contas):
+    paciente, _ = contas.paciente()
+    profissional, headers = contas.profissional()
+    # Três consultas no mesmo horário: o ID desempata
+    _consultas(db, paciente.id, profissional.id, [INICIO + timedelta(hours=h) for h in (3, 1, 2, 2, 2, 0, 4)])
+
+    completa = [c["id"] for c in cliente.get("/api/consultas/", headers=headers).json()]
+    assert len(completa) == 7
+
+    assert _percorrer(cliente, headers, 3) == (completa, 3)
+    # Página cheia no fim: o cursor ainda vem e a página seguinte, vazia, encerra
+    assert _percorrer(cliente, headers, 7) == (completa, 2)
+
+
+def test_insercao_anterior_ao_cursor_nao_repete_linhas(db, cliente, contas):
+    paciente, _ = contas.paciente()
+    profissional, headers = contas.profissional()
+    _consultas(db, paciente.id, profissional.id, [INICIO + timedelta(hours=h) for h in range(1, 5)])
+
+    primeira = cliente.get("/api/consultas/", params={"limit": 2}, headers=headers)
+    cursor = primeira.headers[NEXT_CURSOR_HEADER]
+    _consultas(db, paciente.id, profissional.id, [INICIO])
+
+    segunda = cliente.get("/api/consultas/", params={"limit": 2, "cursor": cursor}, headers=headers)
+    vistos = [c["id"] for c in primeira.json() + segunda.json()]
+    assert len(set(vistos)) == 4
+    # Com offset, a mesma inserção faria a segunda página repetir uma linha da primeira
+    por_offset = cliente.get("/api/consultas/", params={"limit": 2, "skip": 2}, headers=headers).json()
+    assert por_offset[0]["id"] == vistos[1]
+
+
+def test_cursor_invalido(cliente, contas):
+    _, headers = contas.profissional()
+    resposta = cliente.get("/api/consultas/", params={"cursor": "nao-e-cursor"}, headers=headers)
+    assert resposta.status_code == 400
+    assert resposta.json()["detail"] == "Cursor de paginação inválido"
@@ -0,0 +1,71 @@
+"""
+Invalidação do cache de principais: só depois do commit, e nunca num rollback; uma
+leitura anterior à alteração não regrava o principal antigo.
+"""
+
+import asyncio
+from fastapi.security import HTTPAuthorizationCredentials
+from app.config.database import SessionLocal
+from app.models.user import User, TipoUsuario
+from app.services.async_services import AsyncUserService
+from app.utils.dependencies import get_current_user
+from app.utils.principal import Principal, principal_cache
+from app.utils.security import create_access_token
+
+
+def _usuario(db, email: str) -> User:
+    user = User(nome="Teste", email=email, senha_hash="x", tipo_usuario=TipoUsuario.PACIENTE, ativo=True)
+    db.add(user)
+    db.commit()
+    return user
+
+
+def test_desativacao_invalida_apenas_no_commit(db):
+    user = _usuario(db, "principal-commit@teste.com")
+    principal_cache.set(user.id, Principal.from_user(user))
+
+    user.ativo = False
+    db.flush()
+    # Entre o flush e o commit, uma leitura concorrente ainda veria a linha antiga:
+    # o cache não pode ser esvaziado agora, ou seria repreenchido com ela
+    assert principal_cache.get(user.id) is not None
+
+    db.commit()
+    assert principal_cache.get(user.id) is None
+
+
+def test_rollback_nao_invalida(db):
+    user = _usuario(db, "principal-rollback@teste.com")
+    principal = Principal.from_user(user)
+    principal_cache.set(user.id, principal)
+
+    user.ativo = False
+    db.flush()
+    db.rollback()
+    assert principal_cache.get(user.id) is principal
+
+
+def test_desativacao_durante_leitura_nao_fica_em_cache(db, monkeypatch):
+    user = _usuario(db, "principal-corrida@teste.com")
+    principal_cache.delete(user.id)
+    credenciais = HTTPAuthorizationCredentials(scheme="Bearer", credentials=create_access_token({"sub": str(user.id)}))
+    ler_usuario = AsyncUserService.get_active_user
+
+    async def ler_e_desativar(self, user_id):
+        # A leitura vê o usuário ativo; a desativação confirma antes de o principal ser guardado
+        lido = await ler_usuario(self, user_id)
+        outra = SessionLocal()
+        outra.get(User, user_id).ativo = False
+        outra.commit()
+        outra.close()
+        return lido
+
+    monkeypatch.setattr(AsyncUserService, "get_active_user", ler_e_desativar)
+    sessao = SessionLocal()
+    try:
+        principal = asyncio.run(get_current_user(credenciais, sessao))
+    finally:
+        sessao.close()
+
+    assert principal.ativo
+    assert principal_cache.get(user.id) is None
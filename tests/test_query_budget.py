@@ -0,0 +1,59 @@
+"""
+Orçamento de consultas: uma listagem roda um número fixo de consultas, qualquer
+que seja o tamanho da página, e ``query_budget`` falha quando ele é ultrapassado.
+"""
+
+from datetime import datetime, timedelta
+import pytest
+from app.models.consulta import Consulta, StatusConsulta
+from app.models.paciente import Paciente
+from app.services.paciente_service import PacienteService
+from app.utils.entity_cache import entity_cache
+from app.utils.query_stats import QueryBudgetExceeded, query_budget, track_queries
+
+INICIO = (datetime.now() + timedelta(days=50)).replace(hour=8, minute=0, second=0, microsecond=0)
+
+
+pytestmark = pytest.mark.usefixtures("contador_de_consultas")
+
+
+def test_listagem_dentro_do_orcamento(db, cliente, contas):
+    paciente, _ = contas.paciente()
+    profissional, headers = contas.profissional()
+    db.add_all(
+        Consulta(paciente_id=paciente.id, profissional_id=profissional.id, data_hora=INICIO + timedelta(hours=h),
+                 status=StatusConsulta.CANCELADA)
+        for h in range(10)
+    )
+    db.commit()
+    cliente.get("/api/consultas/", params={"limit": 1}, headers=headers)
+
+    with track_queries() as uma:
+        assert len(cliente.get("/api/consultas/", params={"limit": 1}, headers=headers).json()) == 1
+    # Os nomes vêm na mesma consulta: dez linhas custam o mesmo que uma
+    with query_budget(uma.queries, limiar_n1=2):
+        assert len(cliente.get("/api/consultas/", params={"limit": 10}, headers=headers).json()) == 10
+
+    with pytest.raises(QueryBudgetExceeded) as erro:
+        with query_budget(uma.queries - 1):
+            cliente.get("/api/consultas/", params={"limit": 10}, headers=headers)
+    assert f"orçamento de {uma.queries - 1} consultas: {uma.queries} consultas" in str(erro.value)
+    assert "FROM consultas" in str(erro.value)
+
+
+def test_repeticao_acusada_como_n1(db, contas):
+    ids = [contas.paciente()[0].id for _ in range(3)]
+    service = PacienteService(db)
+
+    with pytest.raises(QueryBudgetExceeded) as erro:
+        with query_budget(100, limiar_n1=3):
+            for paciente_id in ids:
+                entity_cache.invalidate(Paciente, paciente_id)
+                service.get_paciente_by_id(paciente_id)
+    assert "possível N+1 (3x, app/services/paciente_service.py" in str(erro.value)
+
+    # A mesma leitura em lote é uma consulta só
+    for paciente_id in ids:
+        entity_cache.invalidate(Paciente, paciente_id)
+    with query_budget(1):
+        assert [p.id for p in service.get_pacientes_by_ids(ids)] == ids